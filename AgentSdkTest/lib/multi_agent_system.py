@@ -5,17 +5,25 @@
 
 核心组件:
 - AgentMessage: 智能体间消息格式
+- AgentTransport: 可插拔传输层（进程内 / 多进程队列 / TCP、Unix Socket）
 - AgentCommunicationBus: 通信总线
 - AgentCoordinator: 智能体协调器
+- AgentWorker: 在工作进程或远程节点中托管智能体
 - MultiAgentSystem: 多智能体系统高层接口
 """
 
 import asyncio
+import heapq
+import itertools
+import json
+import os
 import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from dataclasses import dataclass, field
-from enum import Enum
-from typing import Any, Callable, Dict, List, Optional
+from enum import Enum, IntEnum
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
 
 from lib.multi_agent import UniversalAIAgent
 from lib.config import get_config
@@ -40,6 +48,14 @@ class AgentStatus(Enum):
     OFFLINE = "offline"    # 离线
 
 
+class TaskPriority(IntEnum):
+    """任务优先级（数值越小越先执行）"""
+    URGENT = 0     # 交互式紧急任务
+    HIGH = 1
+    NORMAL = 2
+    BULK = 3       # 批量任务，过载时让路
+
+
 @dataclass
 class AgentMessage:
     """智能体间消息"""
@@ -54,12 +70,37 @@ class AgentMessage:
     def __repr__(self):
         return f"AgentMessage({self.sender} -> {self.receiver or 'ALL'}: {self.type.value})"
 
+    def to_dict(self) -> Dict[str, Any]:
+        """序列化为可JSON编码的字典"""
+        return {
+            "id": self.id,
+            "type": self.type.value,
+            "sender": self.sender,
+            "receiver": self.receiver,
+            "content": self.content,
+            "timestamp": self.timestamp.isoformat(),
+            "metadata": self.metadata,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AgentMessage":
+        """从字典反序列化"""
+        return cls(
+            id=data["id"],
+            type=MessageType(data["type"]),
+            sender=data.get("sender", ""),
+            receiver=data.get("receiver", ""),
+            content=data.get("content"),
+            timestamp=datetime.fromisoformat(data["timestamp"]),
+            metadata=data.get("metadata", {}),
+        )
+
 
 @dataclass
 class AgentInfo:
-    """智能体信息"""
+    """智能体信息（agent 为 None 表示托管在其他进程/节点的远程智能体）"""
     id: str
-    agent: UniversalAIAgent
+    agent: Optional[UniversalAIAgent]
     status: AgentStatus = AgentStatus.IDLE
     capabilities: List[str] = field(default_factory=list)
     current_task: Optional[str] = None
@@ -76,15 +117,271 @@ class TaskResult:
     error: Optional[str] = None
     duration: float = 0.0
 
+    def to_dict(self) -> Dict[str, Any]:
+        """序列化为可JSON编码的字典"""
+        return {
+            "success": self.success,
+            "agent_id": self.agent_id,
+            "result": self.result,
+            "error": self.error,
+            "duration": self.duration,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TaskResult":
+        """从字典反序列化"""
+        return cls(
+            success=data["success"],
+            agent_id=data["agent_id"],
+            result=data.get("result"),
+            error=data.get("error"),
+            duration=data.get("duration", 0.0),
+        )
+
+
+@dataclass(order=True)
+class QueuedTask:
+    """排队中的任务 - 按 (priority, sequence) 排序，同优先级先进先出"""
+    priority: int
+    sequence: int
+    description: str = field(compare=False)
+    capability: Optional[str] = field(default=None, compare=False)
+    input_data: Optional[str] = field(default=None, compare=False)
+    deadline: Optional[float] = field(default=None, compare=False)  # 事件循环时间
+    idempotency_key: Optional[str] = field(default=None, compare=False)
+    future: Optional[asyncio.Future] = field(default=None, compare=False)
+    runner: Optional[asyncio.Task] = field(default=None, compare=False)
+
+
+def encode_message(message: AgentMessage) -> bytes:
+    """将消息编码为一行UTF-8 JSON（换行分隔，便于流式传输）"""
+    return json.dumps(message.to_dict(), ensure_ascii=False, default=str).encode("utf-8") + b"\n"
+
+
+def decode_message(data: bytes) -> AgentMessage:
+    """解码 encode_message 生成的数据"""
+    return AgentMessage.from_dict(json.loads(data.decode("utf-8")))
+
+
+# ==================== 传输层 ====================
+
+MessageHandler = Callable[[AgentMessage], Awaitable[None]]
+
+
+class AgentTransport:
+    """
+    传输层基类 - 决定消息如何到达各个通信总线
+
+    总线发布消息时调用 send()；传输层负责把消息交给本地总线，
+    并（对于跨进程实现）转发给对端。对端收到的消息只在本地投递，不再转发。
+    """
+
+    def __init__(self):
+        self._handlers: List[MessageHandler] = []
+
+    def attach(self, handler: MessageHandler):
+        """挂载本地总线的投递回调"""
+        self._handlers.append(handler)
+
+    async def _deliver_local(self, message: AgentMessage):
+        for handler in self._handlers:
+            await handler(message)
+
+    async def start(self):
+        """启动接收循环（进程内实现无需启动）"""
+
+    async def send(self, message: AgentMessage):
+        """发送消息"""
+        await self._deliver_local(message)
+
+    async def close(self):
+        """关闭传输层"""
+
+
+class InProcessTransport(AgentTransport):
+    """进程内传输 - 直接回调，消息对象不经过序列化（默认实现）"""
+
+
+class MultiprocessQueueTransport(AgentTransport):
+    """
+    多进程队列传输 - 通过一对 multiprocessing.Queue 连接两个进程
+
+    使用 create_pair() 创建互相连接的两端，其中一端可传给子进程。
+    阻塞的 Queue.get() 在传输层自己的单线程执行器中等待，不占用事件循环默认线程池
+    （to_thread / run_in_executor(None) 的其他使用者不受影响）。
+    """
+
+    _STOP = None
+
+    def __init__(self, send_queue, recv_queue):
+        super().__init__()
+        self._send_queue = send_queue
+        self._recv_queue = recv_queue
+        self._receiver: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def create_pair(cls, ctx=None):
+        """创建一对互联的传输端 (parent_side, child_side)"""
+        import multiprocessing
+        ctx = ctx or multiprocessing.get_context()
+        a_to_b, b_to_a = ctx.Queue(), ctx.Queue()
+        return cls(a_to_b, b_to_a), cls(b_to_a, a_to_b)
+
+    def __getstate__(self):
+        # 仅队列可跨进程传递，接收任务与本地回调在子进程中重新建立
+        return {"send_queue": self._send_queue, "recv_queue": self._recv_queue}
+
+    def __setstate__(self, state):
+        self.__init__(state["send_queue"], state["recv_queue"])
+
+    async def start(self):
+        if self._receiver is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="agent-transport-recv")
+            self._receiver = asyncio.create_task(self._receive_loop())
+
+    async def _receive_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            data = await loop.run_in_executor(self._executor, self._recv_queue.get)
+            if data is self._STOP:
+                break
+            try:
+                await self._deliver_local(decode_message(data))
+            except Exception as e:
+                print(f"❌ 消息接收失败: {e}")
+
+    async def send(self, message: AgentMessage):
+        await self._deliver_local(message)
+        self._send_queue.put(encode_message(message))
+
+    async def close(self):
+        if self._receiver is not None:
+            # 唤醒本端阻塞的 get()
+            self._recv_queue.put(self._STOP)
+            await self._receiver
+            self._receiver = None
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+class SocketTransport(AgentTransport):
+    """
+    Socket传输 - 基于 asyncio 流的 TCP / Unix Socket 实现
+
+    以 serve=True 启动的一端作为中心节点：接受多个连接，
+    并把任一对端的消息转发给其他对端；其余节点以客户端方式连接。
+    消息格式为换行分隔的JSON（见 encode_message）。
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        path: Optional[str] = None,
+        serve: bool = False
+    ):
+        super().__init__()
+        self.host = host
+        self.port = port
+        self.path = path
+        self.serve = serve
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: List[asyncio.StreamWriter] = []
+        self._readers: List[asyncio.Task] = []
+
+    async def start(self):
+        if self._server is not None or self._writers:
+            return
+
+        if self.serve:
+            if self.path:
+                self._server = await asyncio.start_unix_server(self._on_connection, path=self.path)
+            else:
+                self._server = await asyncio.start_server(self._on_connection, self.host, self.port)
+                # 支持 port=0 由系统分配端口
+                self.port = self._server.sockets[0].getsockname()[1]
+        else:
+            if self.path:
+                reader, writer = await asyncio.open_unix_connection(self.path)
+            else:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            self._add_peer(reader, writer)
+
+    async def _on_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._add_peer(reader, writer)
+
+    def _add_peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._writers.append(writer)
+        self._readers.append(asyncio.create_task(self._read_loop(reader, writer)))
+
+    async def _read_loop(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = decode_message(line)
+                except (ValueError, KeyError) as e:
+                    print(f"❌ 无法解析的消息: {e}")
+                    continue
+                await self._deliver_local(message)
+                if self.serve:
+                    await self._write(line, exclude=writer)
+        finally:
+            if writer in self._writers:
+                self._writers.remove(writer)
+            writer.close()
+
+    async def _write(self, data: bytes, exclude: Optional[asyncio.StreamWriter] = None):
+        for writer in list(self._writers):
+            if writer is exclude:
+                continue
+            try:
+                writer.write(data)
+                await writer.drain()
+            except (ConnectionError, RuntimeError):
+                self._writers.remove(writer)
+
+    async def send(self, message: AgentMessage):
+        await self._deliver_local(message)
+        await self._write(encode_message(message))
+
+    async def close(self):
+        for writer in self._writers:
+            writer.close()
+        for task in self._readers:
+            task.cancel()
+        await asyncio.gather(*self._readers, return_exceptions=True)
+        self._writers.clear()
+        self._readers.clear()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+            if self.path and os.path.exists(self.path):
+                os.unlink(self.path)
+
 
 # ==================== 通信总线 ====================
 
 class AgentCommunicationBus:
     """智能体通信总线 - 处理智能体间的消息传递"""
 
-    def __init__(self):
+    def __init__(self, transport: Optional[AgentTransport] = None):
         self._subscribers: Dict[str, List[Callable]] = {}
         self._message_history: List[AgentMessage] = []
+        self.transport = transport or InProcessTransport()
+        self.transport.attach(self._dispatch)
+
+    async def start(self):
+        """启动传输层（跨进程传输需要在事件循环中启动）"""
+        await self.transport.start()
+
+    async def close(self):
+        """关闭传输层"""
+        await self.transport.close()
 
     def subscribe(self, agent_id: str, callback: Callable[[AgentMessage], None]):
         """订阅消息"""
@@ -99,6 +396,10 @@ class AgentCommunicationBus:
 
     async def publish(self, message: AgentMessage):
         """发布消息"""
+        await self.transport.send(message)
+
+    async def _dispatch(self, message: AgentMessage):
+        """将消息投递给本地订阅者"""
         self._message_history.append(message)
 
         # 确定目标订阅者
@@ -141,9 +442,29 @@ class AgentCommunicationBus:
 class AgentCoordinator:
     """智能体协调器 - 管理多智能体协作"""
 
-    def __init__(self):
+    COORDINATOR_ID = "coordinator"
+
+    def __init__(
+        self,
+        transport: Optional[AgentTransport] = None,
+        remote_timeout: float = 300.0,
+        idempotency_cache_size: int = 1024
+    ):
         self.agents: Dict[str, AgentInfo] = {}
-        self.bus = AgentCommunicationBus()
+        self.bus = AgentCommunicationBus(transport)
+        self.remote_timeout = remote_timeout
+        self._pending: Dict[str, asyncio.Future] = {}
+
+        # 任务队列：没有空闲智能体时任务在此等待，而不是被丢弃（仅存在于内存中，不落盘）
+        self._task_queue: List[QueuedTask] = []
+        self._sequence = itertools.count()
+        # 幂等键 -> Future；已完成的键只保留最近 idempotency_cache_size 个
+        self._idempotent_tasks: Dict[str, asyncio.Future] = {}
+        self._completed_keys: deque = deque()
+        self.idempotency_cache_size = idempotency_cache_size
+
+        # 接收远程智能体的任务响应
+        self.bus.subscribe(self.COORDINATOR_ID, self._handle_response)
 
     def register_agent(
         self,
@@ -162,12 +483,28 @@ class AgentCoordinator:
         # 订阅消息
         self.bus.subscribe(agent_id, self._handle_message)
 
+        if self._task_queue:
+            self._dispatch_queued()
+        return info
+
+    def register_remote_agent(
+        self,
+        agent_id: str,
+        capabilities: Optional[List[str]] = None
+    ) -> AgentInfo:
+        """注册托管在其他进程/节点的智能体（由对端的 AgentWorker 执行任务）"""
+        info = AgentInfo(id=agent_id, agent=None, capabilities=capabilities or [])
+        self.agents[agent_id] = info
+
+        if self._task_queue:
+            self._dispatch_queued()
         return info
 
     def unregister_agent(self, agent_id: str):
         """注销智能体"""
         if agent_id in self.agents:
-            self.bus.unsubscribe(agent_id)
+            if self.agents[agent_id].agent is not None:
+                self.bus.unsubscribe(agent_id)
             del self.agents[agent_id]
 
     def _handle_message(self, message: AgentMessage):
@@ -177,6 +514,14 @@ class AgentCoordinator:
         if receiver:
             receiver.message_count += 1
 
+    def _handle_response(self, message: AgentMessage):
+        """处理远程智能体返回的任务结果"""
+        if message.type != MessageType.TASK_RESPONSE:
+            return
+        future = self._pending.pop(message.metadata.get("request_id", ""), None)
+        if future is not None and not future.done():
+            future.set_result(TaskResult.from_dict(message.content))
+
     async def send_message(
         self,
         sender_id: str,
@@ -236,40 +581,182 @@ class AgentCoordinator:
         self,
         task_description: str,
         required_capability: Optional[str] = None,
-        input_data: Optional[str] = None
-    ) -> Optional[TaskResult]:
-        """分发任务到合适的智能体"""
-        import time
+        input_data: Optional[str] = None,
+        priority: TaskPriority = TaskPriority.NORMAL,
+        deadline: Optional[float] = None,
+        idempotency_key: Optional[str] = None
+    ) -> TaskResult:
+        """分发任务到合适的智能体，没有空闲智能体时排队等待"""
+        return await self.submit_task(
+            task_description,
+            required_capability,
+            input_data,
+            priority=priority,
+            deadline=deadline,
+            idempotency_key=idempotency_key
+        )
 
-        agent_id = self.get_idle_agent(required_capability)
+    def submit_task(
+        self,
+        task_description: str,
+        required_capability: Optional[str] = None,
+        input_data: Optional[str] = None,
+        priority: TaskPriority = TaskPriority.NORMAL,
+        deadline: Optional[float] = None,
+        idempotency_key: Optional[str] = None
+    ) -> asyncio.Future:
+        """
+        提交任务到优先级队列
 
-        if agent_id is None:
-            print(f"⚠️ 没有可用的智能体 (需要能力: {required_capability or '通用'})")
-            return None
+        Args:
+            task_description: 任务描述
+            required_capability: 所需能力
+            input_data: 输入数据
+            priority: 任务优先级
+            deadline: 截止时间（秒，相对当前）；超时仍未开始执行的任务会被自动丢弃
+            idempotency_key: 幂等键，相同键的重复提交返回同一个 Future
+
+        Returns:
+            可取消的 Future，结果为 TaskResult。暂无具备该能力的智能体时任务保持排队，
+            直到注册了合适的智能体、被取消或超过截止时间
+        """
+        loop = asyncio.get_running_loop()
+
+        if idempotency_key:
+            existing = self._idempotent_tasks.get(idempotency_key)
+            if existing is not None and not existing.cancelled():
+                return existing
+
+        future = loop.create_future()
+
+        if not self._has_capable_agent(required_capability):
+            print(f"⏳ 暂无可用的智能体 (需要能力: {required_capability or '通用'})，任务排队等待")
+
+        item = QueuedTask(
+            priority=int(priority),
+            sequence=next(self._sequence),
+            description=task_description,
+            capability=required_capability,
+            input_data=input_data,
+            deadline=loop.time() + deadline if deadline is not None else None,
+            idempotency_key=idempotency_key,
+            future=future
+        )
+        if idempotency_key:
+            self._idempotent_tasks[idempotency_key] = future
+        future.add_done_callback(lambda f: self._on_task_done(item))
+
+        heapq.heappush(self._task_queue, item)
+        if deadline is not None:
+            loop.call_later(deadline, self._dispatch_queued)
+
+        self._dispatch_queued()
+        return future
+
+    def _has_capable_agent(self, capability: Optional[str]) -> bool:
+        """是否存在可工作的（空闲或忙碌）具备该能力的智能体"""
+        return any(
+            info.status in (AgentStatus.IDLE, AgentStatus.BUSY)
+            and (capability is None or capability in info.capabilities)
+            for info in self.agents.values()
+        )
 
-        # 更新智能体状态
-        self.agents[agent_id].status = AgentStatus.BUSY
-        self.agents[agent_id].current_task = task_description
+    def _on_task_done(self, item: QueuedTask):
+        """任务 Future 完成回调 - 处理调用方取消，并淘汰过旧的幂等记录"""
+        if item.future.cancelled():
+            if item.runner is not None and not item.runner.done():
+                item.runner.cancel()
+            if item.idempotency_key:
+                self._idempotent_tasks.pop(item.idempotency_key, None)
+        elif item.idempotency_key:
+            self._completed_keys.append(item.idempotency_key)
+            while len(self._completed_keys) > self.idempotency_cache_size:
+                key = self._completed_keys.popleft()
+                future = self._idempotent_tasks.get(key)
+                if future is not None and future.done():
+                    del self._idempotent_tasks[key]
+
+    def _dispatch_queued(self):
+        """按优先级把排队任务分配给空闲智能体，并丢弃已过期任务"""
+        now = asyncio.get_running_loop().time()
+        waiting = []
+
+        while self._task_queue:
+            item = heapq.heappop(self._task_queue)
+            if item.future.done():  # 已取消
+                continue
+
+            if item.deadline is not None and now >= item.deadline:
+                print(f"⌛ 任务已过期，放弃执行: {item.description[:50]}...")
+                item.future.set_result(TaskResult(success=False, agent_id="", error="任务在截止时间前未能开始执行"))
+                continue
+
+            agent_id = self.get_idle_agent(item.capability)
+            if agent_id is None:
+                waiting.append(item)
+                continue
+
+            # 同步标记为忙碌，避免同一轮分配中被重复选中
+            self.agents[agent_id].status = AgentStatus.BUSY
+            self.agents[agent_id].current_task = item.description
+            item.runner = asyncio.create_task(self._run_queued_task(agent_id, item))
+
+        for item in waiting:
+            heapq.heappush(self._task_queue, item)
+
+    async def _run_queued_task(self, agent_id: str, item: QueuedTask):
+        """执行已分配的任务并回填 Future（无论执行是否出错，Future 都会完成，队列都会继续分配）"""
+        import time
 
-        print(f"📋 任务分配给 {agent_id}: {task_description[:50]}...")
+        print(f"📋 任务分配给 {agent_id}: {item.description[:50]}...")
 
         # 执行任务并计时
         start_time = time.time()
-        result = await self._execute_task(agent_id, task_description, input_data)
-        duration = time.time() - start_time
+        cancelled = False
+        result = TaskResult(success=False, agent_id=agent_id, error="任务执行异常")
+        try:
+            result = await self._execute_task(agent_id, item.description, item.input_data)
+        except asyncio.CancelledError:
+            cancelled = True
+            result = TaskResult(success=False, agent_id=agent_id, error="任务已取消")
+        except Exception as e:
+            result = TaskResult(success=False, agent_id=agent_id, error=str(e))
+        finally:
+            result.duration = time.time() - start_time
+            self._finish_queued_task(agent_id, item, result, cancelled)
+
+    def _finish_queued_task(self, agent_id: str, item: QueuedTask, result: TaskResult, cancelled: bool):
+        """恢复智能体状态、回填 Future，并继续分配排队任务"""
+        info = self.agents.get(agent_id)
+        if info is not None:
+            # 恢复空闲状态；调用方取消不算智能体故障
+            info.status = AgentStatus.IDLE
+            info.current_task = None
+
+            if cancelled:
+                print(f"🚫 {agent_id} 的任务已取消")
+            elif result.success:
+                info.completed_tasks += 1
+                print(f"✅ {agent_id} 完成 (耗时: {result.duration:.2f}s)")
+            else:
+                info.status = AgentStatus.ERROR
+                print(f"❌ {agent_id} 失败: {result.error}")
 
-        # 恢复空闲状态
-        self.agents[agent_id].status = AgentStatus.IDLE
-        self.agents[agent_id].current_task = None
+        if not item.future.done():
+            item.future.set_result(result)
 
-        if result.success:
-            self.agents[agent_id].completed_tasks += 1
-            print(f"✅ {agent_id} 完成 (耗时: {duration:.2f}s)")
-        else:
-            self.agents[agent_id].status = AgentStatus.ERROR
-            print(f"❌ {agent_id} 失败: {result.error}")
+        self._dispatch_queued()
 
-        return result
+    def get_queue_status(self) -> Dict[str, Any]:
+        """获取任务队列状态"""
+        pending = [item for item in self._task_queue if not item.future.done()]
+        return {
+            "queued_tasks": len(pending),
+            "by_priority": {
+                priority.name: sum(1 for item in pending if item.priority == priority)
+                for priority in TaskPriority
+            }
+        }
 
     async def _execute_task(
         self,
@@ -277,16 +764,44 @@ class AgentCoordinator:
         task_description: str,
         input_data: Optional[str]
     ) -> TaskResult:
-        """执行任务"""
-        agent = self.agents[agent_id].agent
+        """执行任务（本地智能体的同步 chat 在线程中执行，不阻塞事件循环和其他任务）"""
+        info = self.agents.get(agent_id)
+        if info is None:
+            return TaskResult(success=False, agent_id=agent_id, error="智能体已注销")
+        if info.agent is None:
+            return await self._execute_remote_task(agent_id, task_description, input_data)
 
         try:
             prompt = f"{task_description}\n\n输入数据:\n{input_data}" if input_data else task_description
-            response = agent.chat(prompt)
+            response = await asyncio.to_thread(info.agent.chat, prompt)
             return TaskResult(success=True, agent_id=agent_id, result=response)
         except Exception as e:
             return TaskResult(success=False, agent_id=agent_id, error=str(e))
 
+    async def _execute_remote_task(
+        self,
+        agent_id: str,
+        task_description: str,
+        input_data: Optional[str]
+    ) -> TaskResult:
+        """通过通信总线把任务发送给远程智能体并等待结果"""
+        request = AgentMessage(
+            type=MessageType.TASK_REQUEST,
+            sender=self.COORDINATOR_ID,
+            receiver=agent_id,
+            content={"task": task_description, "input_data": input_data},
+        )
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request.id] = future
+
+        try:
+            await self.bus.publish(request)
+            return await asyncio.wait_for(future, timeout=self.remote_timeout)
+        except asyncio.TimeoutError:
+            return TaskResult(success=False, agent_id=agent_id, error=f"远程任务超时 ({self.remote_timeout}s)")
+        finally:
+            self._pending.pop(request.id, None)
+
     async def parallel_execute(
         self,
         tasks: List[Dict[str, Any]]
@@ -307,13 +822,97 @@ class AgentCoordinator:
         return [r for r in results if isinstance(r, TaskResult)]
 
 
+# ==================== 工作节点 ====================
+
+class AgentWorker:
+    """
+    智能体工作节点 - 在工作进程或远程节点中托管智能体
+
+    与协调器共享同一种传输层；收到 TASK_REQUEST 后在本地执行，
+    并以 TASK_RESPONSE 把序列化的 TaskResult 发回请求方。
+    每个请求在独立的任务中处理，接收循环不等待执行结果，托管的多个智能体可同时工作。
+    """
+
+    def __init__(self, transport: AgentTransport):
+        self.bus = AgentCommunicationBus(transport)
+        self.agents: Dict[str, UniversalAIAgent] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def host(self, agent_id: str, agent: UniversalAIAgent):
+        """托管智能体"""
+        self.agents[agent_id] = agent
+
+        def on_message(message: AgentMessage):
+            if message.type != MessageType.TASK_REQUEST:
+                return
+            # 保留任务引用，避免执行中被垃圾回收；关闭时统一取消
+            task = asyncio.create_task(self._handle_request(agent_id, message))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        self.bus.subscribe(agent_id, on_message)
+
+    async def _handle_request(self, agent_id: str, message: AgentMessage):
+        if message.type != MessageType.TASK_REQUEST:
+            return
+
+        import time
+
+        content = message.content or {}
+        task, input_data = content.get("task", ""), content.get("input_data")
+        prompt = f"{task}\n\n输入数据:\n{input_data}" if input_data else task
+
+        start_time = time.time()
+        try:
+            # chat() 是阻塞调用，放到线程池中避免阻塞事件循环
+            response = await asyncio.get_running_loop().run_in_executor(
+                None, self.agents[agent_id].chat, prompt
+            )
+            result = TaskResult(success=True, agent_id=agent_id, result=response)
+        except Exception as e:
+            result = TaskResult(success=False, agent_id=agent_id, error=str(e))
+        result.duration = time.time() - start_time
+
+        await self.bus.publish(AgentMessage(
+            type=MessageType.TASK_RESPONSE,
+            sender=agent_id,
+            receiver=message.sender,
+            content=result.to_dict(),
+            metadata={"request_id": message.id},
+        ))
+
+    async def serve_forever(self):
+        """启动传输层并持续处理任务，直到被取消"""
+        await self.bus.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.close()
+
+    async def close(self):
+        """取消处理中的请求并关闭传输层"""
+        tasks, self._tasks = list(self._tasks), set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.bus.close()
+
+
 # ==================== 多智能体系统 ====================
 
 class MultiAgentSystem:
     """多智能体系统 - 高层接口"""
 
-    def __init__(self):
-        self.coordinator = AgentCoordinator()
+    def __init__(self, transport: Optional[AgentTransport] = None):
+        self.coordinator = AgentCoordinator(transport)
+
+    async def start(self):
+        """启动跨进程传输（仅使用进程内传输时无需调用）"""
+        await self.coordinator.bus.start()
+
+    async def close(self):
+        """关闭传输层"""
+        await self.coordinator.bus.close()
 
     def create_agent(
         self,
@@ -440,6 +1039,7 @@ class MultiAgentSystem:
             "agents": agent_status,
             "message_count": len(message_history),
             "registered_agents": list(self.coordinator.agents.keys()),
+            "task_queue": self.coordinator.get_queue_status(),
             "total_completed_tasks": sum(
                 info.completed_tasks for info in self.coordinator.agents.values()
             )
@@ -448,9 +1048,9 @@ class MultiAgentSystem:
 
 # ==================== 便捷函数 ====================
 
-def create_multi_agent_system() -> MultiAgentSystem:
+def create_multi_agent_system(transport: Optional[AgentTransport] = None) -> MultiAgentSystem:
     """创建多智能体系统"""
-    return MultiAgentSystem()
+    return MultiAgentSystem(transport)
 
 
 async def run_simple_collaboration():
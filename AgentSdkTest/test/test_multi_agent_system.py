@@ -0,0 +1,370 @@
+"""
+多智能体协作系统测试
+
+测试协调器与传输层的行为（使用本地假智能体，不调用模型API）:
+- 消息序列化
+- 进程内、多进程队列、TCP与Unix Socket传输上的远程任务
+- 优先级任务队列（优先级、截止时间、幂等键、取消、等待可用智能体）
+- 本地智能体在线程中执行
+"""
+
+import asyncio
+import multiprocessing
+import sys
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# 添加项目路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.multi_agent_system import (
+    AgentCoordinator, AgentMessage, AgentStatus, AgentWorker, InProcessTransport, MessageType,
+    MultiprocessQueueTransport, SocketTransport, TaskPriority, TaskResult, decode_message, encode_message
+)
+
+
+def run_async_test(coro):
+    """运行异步测试的辅助函数"""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class FakeAgent:
+    """记录收到的提示词并原样返回的假智能体"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.prompts = []
+
+    def chat(self, prompt: str) -> str:
+        if self.delay:
+            time.sleep(self.delay)
+        self.prompts.append(prompt)
+        return f"done: {prompt}"
+
+
+class BarrierAgent:
+    """只有与其他智能体同时执行时才能完成的假智能体"""
+
+    def __init__(self, barrier: threading.Barrier):
+        self.barrier = barrier
+
+    def chat(self, prompt: str) -> str:
+        self.barrier.wait()
+        return f"done: {prompt}"
+
+
+def serve_in_child(transport):
+    """子进程入口：托管一个回显智能体并持续处理任务"""
+    worker = AgentWorker(transport)
+    worker.host("child", FakeAgent())
+    asyncio.run(worker.serve_forever())
+
+
+class TestMessageEncoding(unittest.TestCase):
+    """消息序列化测试"""
+
+    def test_message_round_trip(self):
+        """测试消息编码为单行JSON并可完整还原"""
+        message = AgentMessage(
+            type=MessageType.TASK_REQUEST,
+            sender="coordinator",
+            receiver="worker",
+            content={"task": "分析\n数据", "input_data": None},
+            timestamp=datetime(2024, 5, 1, 12, 30, 15, 123456),
+            metadata={"request_id": "r-1"},
+        )
+        data = encode_message(message)
+        self.assertTrue(data.endswith(b"\n"))
+        self.assertEqual(data.count(b"\n"), 1)
+        self.assertEqual(decode_message(data), message)
+
+    def test_task_result_round_trip(self):
+        """测试任务结果经消息内容传输后还原"""
+        result = TaskResult(success=False, agent_id="worker", error="超时", duration=1.5)
+        message = decode_message(encode_message(AgentMessage(content=result.to_dict())))
+        self.assertEqual(TaskResult.from_dict(message.content), result)
+
+
+class TestRemoteAgents(unittest.TestCase):
+    """远程智能体测试 - 协调器与工作节点通过传输层交换任务"""
+
+    async def _run_pair(self, coordinator_transport, worker_transport):
+        coordinator = AgentCoordinator(coordinator_transport, remote_timeout=5.0)
+        worker = AgentWorker(worker_transport)
+        barrier = threading.Barrier(2, timeout=5.0)
+        for agent_id in ("a", "b"):
+            worker.host(agent_id, BarrierAgent(barrier))
+            coordinator.register_remote_agent(agent_id, ["分析"])
+
+        await coordinator.bus.start()
+        await worker.bus.start()
+        if getattr(coordinator_transport, "serve", False):
+            # 中心节点只向已接受的连接转发：等服务端处理完工作节点的连接再发送任务
+            for _ in range(500):
+                if coordinator_transport._writers:
+                    break
+                await asyncio.sleep(0.01)
+        try:
+            # 两个任务都需要同时执行才能通过屏障：工作节点串行处理请求时会超时失败
+            return await asyncio.gather(
+                coordinator.submit_task("任务一", "分析"),
+                coordinator.submit_task("任务二", "分析", input_data="附加数据"),
+            )
+        finally:
+            await worker.close()
+            await coordinator.bus.close()
+
+    def _check(self, results):
+        self.assertTrue(all(result.success for result in results), results)
+        self.assertEqual({result.agent_id for result in results}, {"a", "b"})
+        self.assertEqual(results[0].result, "done: 任务一")
+        self.assertIn("附加数据", results[1].result)
+
+    def test_in_process_transport(self):
+        """测试共用进程内传输时远程任务往返，且同一工作节点的智能体并发执行"""
+        transport = InProcessTransport()
+        self._check(run_async_test(self._run_pair(transport, transport)))
+
+    def test_socket_transport(self):
+        """测试TCP传输上的远程任务往返"""
+        async def scenario():
+            server = SocketTransport(port=0, serve=True)
+            await server.start()
+            client = SocketTransport(port=server.port)
+            return await self._run_pair(server, client)
+
+        self._check(run_async_test(scenario()))
+
+
+    @unittest.skipUnless(hasattr(asyncio, "start_unix_server"), "平台不支持Unix Socket")
+    def test_unix_socket_transport(self):
+        """测试Unix Socket传输上的远程任务往返，关闭后删除套接字文件"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "agents.sock")
+
+            async def scenario():
+                server = SocketTransport(path=path, serve=True)
+                await server.start()
+                self.assertTrue(os.path.exists(path))
+                return await self._run_pair(server, SocketTransport(path=path))
+
+            self._check(run_async_test(scenario()))
+            self.assertFalse(os.path.exists(path))
+
+    def test_multiprocess_queue_transport(self):
+        """测试通过队列与子进程中的工作节点往返任务（spawn 启动，传输端经序列化传入），接收循环不占用默认线程池"""
+        ctx = multiprocessing.get_context("spawn")
+        parent_side, child_side = MultiprocessQueueTransport.create_pair(ctx)
+        process = ctx.Process(target=serve_in_child, args=(child_side,), daemon=True)
+        process.start()
+
+        async def scenario():
+            coordinator = AgentCoordinator(parent_side, remote_timeout=60.0)
+            coordinator.register_remote_agent("child", ["分析"])
+            # 默认线程池只有一个线程：接收循环若占用它，to_thread 会一直等待
+            asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=1))
+            await coordinator.bus.start()
+            try:
+                self.assertEqual(await asyncio.wait_for(asyncio.to_thread(lambda: "free"), timeout=5.0), "free")
+                return await asyncio.gather(
+                    coordinator.submit_task("任务一", "分析"),
+                    coordinator.submit_task("任务二", "分析", input_data="附加数据"),
+                )
+            finally:
+                await coordinator.bus.close()
+
+        try:
+            results = run_async_test(scenario())
+        finally:
+            process.terminate()
+            process.join(10)
+
+        self.assertTrue(all(result.success for result in results), results)
+        self.assertEqual({result.agent_id for result in results}, {"child"})
+        self.assertEqual(results[0].result, "done: 任务一")
+        self.assertIn("附加数据", results[1].result)
+
+
+class TestTaskQueue(unittest.TestCase):
+    """优先级任务队列测试"""
+
+    def test_priority_order(self):
+        """测试智能体忙碌时排队任务按优先级执行，同优先级先进先出"""
+        async def scenario():
+            coordinator = AgentCoordinator()
+            agent = FakeAgent()
+            coordinator.register_agent("worker", agent, ["通用"])
+
+            futures = [coordinator.submit_task("first", priority=TaskPriority.BULK)]  # 立即占用智能体
+            futures.append(coordinator.submit_task("bulk", priority=TaskPriority.BULK))
+            futures.append(coordinator.submit_task("normal-1"))
+            futures.append(coordinator.submit_task("urgent", priority=TaskPriority.URGENT))
+            futures.append(coordinator.submit_task("normal-2"))
+            self.assertEqual(coordinator.get_queue_status()["queued_tasks"], 4)
+
+            results = await asyncio.gather(*futures)
+            self.assertTrue(all(result.success for result in results))
+            return agent.prompts
+
+        order = run_async_test(scenario())
+        self.assertEqual(order, ["first", "urgent", "normal-1", "normal-2", "bulk"])
+
+    def test_expired_task_is_shed(self):
+        """测试截止时间前未能开始的任务被丢弃，且不影响智能体状态"""
+        async def scenario():
+            coordinator = AgentCoordinator()
+            agent = FakeAgent(delay=0.05)
+            coordinator.register_agent("worker", agent)
+
+            slow = coordinator.submit_task("slow")
+            expiring = coordinator.submit_task("expiring", deadline=0.01)
+            return coordinator, agent, await slow, await expiring
+
+        coordinator, agent, slow, expiring = run_async_test(scenario())
+        self.assertTrue(slow.success)
+        self.assertFalse(expiring.success)
+        self.assertIn("截止时间", expiring.error)
+        self.assertEqual(agent.prompts, ["slow"])
+        self.assertEqual(coordinator.agents["worker"].status, AgentStatus.IDLE)
+
+    def test_idempotency_key(self):
+        """测试相同幂等键返回同一个 Future，已完成的记录按容量淘汰"""
+        async def scenario():
+            coordinator = AgentCoordinator(idempotency_cache_size=1)
+            agent = FakeAgent()
+            coordinator.register_agent("worker", agent)
+
+            first = coordinator.submit_task("task", idempotency_key="a")
+            self.assertIs(coordinator.submit_task("task", idempotency_key="a"), first)
+            await first
+            self.assertIs(coordinator.submit_task("task", idempotency_key="a"), first)
+
+            await coordinator.submit_task("other", idempotency_key="b")
+            self.assertEqual(list(coordinator._idempotent_tasks), ["b"])
+            again = coordinator.submit_task("task", idempotency_key="a")
+            self.assertIsNot(again, first)
+            await again
+            return agent.prompts
+
+        self.assertEqual(run_async_test(scenario()), ["task", "other", "task"])
+
+    def test_cancel_running_task_keeps_agent_available(self):
+        """测试取消执行中的任务后智能体恢复空闲，后续任务仍可分配"""
+        async def scenario():
+            coordinator = AgentCoordinator()
+            # 远程智能体没有工作节点应答，任务会一直等待直到被取消
+            coordinator.register_remote_agent("remote", ["分析"])
+
+            running = coordinator.submit_task("hang", "分析", idempotency_key="k")
+            await asyncio.sleep(0.01)
+            self.assertEqual(coordinator.agents["remote"].status, AgentStatus.BUSY)
+
+            running.cancel()
+            await asyncio.sleep(0.01)
+            info = coordinator.agents["remote"]
+            self.assertEqual(info.status, AgentStatus.IDLE)
+            self.assertNotIn("k", coordinator._idempotent_tasks)
+
+            later = coordinator.submit_task("later", "分析")
+            self.assertFalse(later.done())
+            later.cancel()
+            await asyncio.sleep(0.01)
+            return info
+
+        info = run_async_test(scenario())
+        self.assertEqual(info.status, AgentStatus.IDLE)
+        self.assertEqual(info.completed_tasks, 0)
+
+    def test_cancel_queued_task(self):
+        """测试排队中被取消的任务不会执行，也不占用智能体"""
+        async def scenario():
+            coordinator = AgentCoordinator()
+            agent = FakeAgent()
+            coordinator.register_agent("worker", agent)
+
+            first = coordinator.submit_task("first")
+            queued = coordinator.submit_task("queued")
+            queued.cancel()
+            await first
+            result = await coordinator.submit_task("next")
+            return agent.prompts, result, coordinator.agents["worker"].status
+
+        prompts, result, status = run_async_test(scenario())
+        self.assertEqual(prompts, ["first", "next"])
+        self.assertTrue(result.success)
+        self.assertEqual(status, AgentStatus.IDLE)
+
+    def test_task_waits_for_capable_agent(self):
+        """测试没有具备该能力的智能体时任务排队，注册后立即执行"""
+        async def scenario():
+            coordinator = AgentCoordinator()
+            pending = coordinator.submit_task("translate", "翻译")
+            await asyncio.sleep(0.01)
+            self.assertFalse(pending.done())
+            self.assertEqual(coordinator.get_queue_status()["queued_tasks"], 1)
+
+            agent = FakeAgent()
+            coordinator.register_agent("translator", agent, ["翻译"])
+            return await pending, agent.prompts
+
+        result, prompts = run_async_test(scenario())
+        self.assertTrue(result.success)
+        self.assertEqual(prompts, ["translate"])
+
+    def test_agent_unregistered_before_start(self):
+        """测试任务开始前智能体被注销时返回失败结果，队列继续分配"""
+        async def scenario():
+            coordinator = AgentCoordinator()
+            coordinator.register_agent("gone", FakeAgent())
+            orphan = coordinator.submit_task("orphan")
+            queued = coordinator.submit_task("queued")
+            coordinator.unregister_agent("gone")
+
+            result = await asyncio.wait_for(orphan, timeout=1.0)
+            agent = FakeAgent()
+            coordinator.register_agent("new", agent)
+            return result, await asyncio.wait_for(queued, timeout=1.0), agent.prompts
+
+        orphan, queued, prompts = run_async_test(scenario())
+        self.assertFalse(orphan.success)
+        self.assertIn("注销", orphan.error)
+        self.assertTrue(queued.success)
+        self.assertEqual(prompts, ["queued"])
+
+    def test_local_agents_run_off_event_loop(self):
+        """测试本地智能体在线程中执行：多个智能体同时工作，执行中的任务可被取消"""
+        async def scenario():
+            coordinator = AgentCoordinator()
+            barrier = threading.Barrier(2, timeout=5.0)
+            for agent_id in ("a", "b"):
+                coordinator.register_agent(agent_id, BarrierAgent(barrier), ["分析"])
+            results = await asyncio.gather(coordinator.submit_task("一", "分析"), coordinator.submit_task("二", "分析"))
+
+            release = threading.Event()
+            blocking = FakeAgent()
+            blocking.chat = lambda prompt: release.wait(5.0) and "late"
+            coordinator.register_agent("slow", blocking, ["写作"])
+            running = coordinator.submit_task("hang", "写作")
+            await asyncio.sleep(0.01)
+            running.cancel()
+            await asyncio.sleep(0.01)
+            status = coordinator.agents["slow"].status
+            release.set()
+            return results, status
+
+        results, status = run_async_test(scenario())
+        self.assertTrue(all(result.success for result in results), results)
+        self.assertEqual(status, AgentStatus.IDLE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -15,22 +15,21 @@ async def basic_usage_example():
     """基础使用示例"""
     print("=== Research Agent 基础使用 ===\n")
 
-    agent = ResearchAgent(
+    async with ResearchAgent(
         research_domain="人工智能",
         provider="claude",
         api_key=os.getenv('ANTHROPIC_API_KEY'),
         base_url=os.getenv('ANTHROPIC_BASE_URL', 'https://open.bigmodel.cn/api/anthropic')
-    )
-
-    print(f"研究领域: {agent.research_domain}")
-    print(f"AI提供商: {agent.provider}")
-    print(f"模型: {agent.model}\n")
+    ) as agent:
+        print(f"研究领域: {agent.research_domain}")
+        print(f"AI提供商: {agent.provider}")
+        print(f"模型: {agent.model}\n")
 
-    result = await agent.conduct_research(
-        query="大语言模型的最新发展趋势",
-        max_sources=10,
-        output_format="markdown"
-    )
+        result = await agent.conduct_research(
+            query="大语言模型的最新发展趋势",
+            max_sources=10,
+            output_format="markdown"
+        )
 
     print(f"查询: {result.query}")
     print(f"时间: {result.timestamp}")
@@ -66,11 +65,10 @@ async def advanced_usage_example():
         include_blogs=False
     )
 
-    agent = ResearchAgent(research_domain=config.research_domain, provider="mock")
-
     print(f"配置: 最大来源={config.max_sources}, GitHub={config.include_github}, 论文={config.include_papers}\n")
 
-    result = await agent.conduct_research(query="DeFi智能合约安全最佳实践", max_sources=config.max_sources)
+    async with ResearchAgent(research_domain=config.research_domain, provider="mock") as agent:
+        result = await agent.conduct_research(query="DeFi智能合约安全最佳实践", max_sources=config.max_sources)
 
     print(f"查询: {result.query}")
     print(f"时间: {result.timestamp}")
@@ -100,17 +98,17 @@ async def performance_test():
     print("=== 性能测试 ===\n")
 
     import time
-    agent = ResearchAgent(provider="mock")
-
     queries = ["机器学习算法", "云计算架构", "数据隐私", "微服务实践", "DevOps工具"]
     results = []
 
-    for query in queries:
-        start = time.time()
-        result = await agent.conduct_research(query, max_sources=3)
-        elapsed = time.time() - start
-        results.append(elapsed)
-        print(f"{query[:20]}: {elapsed:.2f}s")
+    # 复用同一代理的HTTP连接池，退出时关闭
+    async with ResearchAgent(provider="mock") as agent:
+        for query in queries:
+            start = time.time()
+            result = await agent.conduct_research(query, max_sources=3)
+            elapsed = time.time() - start
+            results.append(elapsed)
+            print(f"{query[:20]}: {elapsed:.2f}s")
 
     total = sum(results)
     avg = total / len(results)
@@ -5,39 +5,83 @@ Research Agent 功能模块包
 - literature_retriever: 文献检索模块
 - data_processor: 数据处理模块
 - report_generator: 报告生成模块
+- report_templates: 基于Jinja2的报告模板（编译缓存、流式渲染）
+- report_writer: 报告文件异步缓冲写入（临时文件+原子替换）
+- pdf_writer: 纯Python文本PDF排版
+- report_store: 报告存储（ULID命名、按日期分片、SQLite索引）
+- chart_renderer: 数据统计与趋势的SVG图表渲染
+- registry: 进程级模块注册表（按需导入、共享资源）
 - quality_checker: 质量检查模块
+- relevance: 相关性评分（BM25）
+- research_memory: 历史调研向量索引
+- data_collectors: 数据收集器（GitHub、StackExchange、本地文件）
+- content_validator: LLM批量内容验证与倾向性检测
 """
 
 __version__ = "1.0.0"
 
-# 直接导入类
-from .literature_retriever.literature_retriever import LiteratureRetriever
-from .data_processor import DataProcessor
-from .report_generator import ReportGenerator
-from .quality_checker import QualityChecker
+# 导出的类按需导入（PEP 562），导入本包不会加载 pandas 等重量级依赖
+_EXPORTS = {
+    'LiteratureRetriever': 'literature_retriever.literature_retriever',
+    'DataProcessor': 'data_processor',
+    'ReportGenerator': 'report_generator',
+    'QualityChecker': 'quality_checker',
+    'IncrementalQualityScorer': 'quality_checker',
+    'RelevanceEngine': 'relevance',
+    'tokenize': 'relevance',
+    'ResearchMemory': 'research_memory',
+    'HashingEmbedder': 'research_memory',
+    'DataCollector': 'data_collectors',
+    'CollectorRunner': 'data_collectors',
+    'ContentValidator': 'content_validator',
+    'ReportStore': 'report_store',
+    'ModuleRegistry': 'registry',
+}
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
 
 # 延迟导入函数（避免循环依赖）
 def get_literature_retriever():
     """获取文献检索模块"""
-    return LiteratureRetriever
+    from .registry import registry
+    return registry.module_class('literature_retriever')
 
 def get_data_processor():
     """获取数据处理模块"""
-    return DataProcessor
+    from .registry import registry
+    return registry.module_class('data_processor')
 
 def get_report_generator():
     """获取报告生成模块"""
-    return ReportGenerator
+    from .registry import registry
+    return registry.module_class('report_generator')
 
 def get_quality_checker():
     """获取质量检查模块"""
-    return QualityChecker
+    from .registry import registry
+    return registry.module_class('quality_checker')
 
 __all__ = [
     'LiteratureRetriever',
     'DataProcessor',
     'ReportGenerator',
     'QualityChecker',
+    'IncrementalQualityScorer',
+    'RelevanceEngine',
+    'tokenize',
+    'ResearchMemory',
+    'HashingEmbedder',
+    'DataCollector',
+    'CollectorRunner',
+    'ContentValidator',
+    'ReportStore',
+    'ModuleRegistry',
     'get_literature_retriever',
     'get_data_processor',
     'get_report_generator',
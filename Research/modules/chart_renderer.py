@@ -0,0 +1,170 @@
+"""
+图表渲染 - ChartRenderer
+把 DataProcessor 的统计与趋势结果转换为SVG图表：纯字符串生成，无需图形界面或绘图库。
+每张图表只有几百字节的字符串拼接，默认在事件循环中直接渲染；阶段执行器为进程模式时才交给进程池，
+此时结果按图表数据哈希缓存，免去重复的进程间传递。
+"""
+
+import os
+import json
+import asyncio
+import hashlib
+import logging
+from html import escape
+from typing import Any, Dict, List, Optional
+from dataclasses import dataclass, field, asdict
+
+from .literature_retriever.search_cache import SearchCache
+
+logger = logging.getLogger(__name__)
+
+WIDTH = 640
+PALETTE = ('#4e79a7', '#f28e2b', '#59a14f', '#e15759', '#76b7b2', '#edc948', '#b07aa1', '#9c755f')
+QUALITY_LABELS = {'high': '高', 'medium': '中', 'low': '低'}
+MAX_BARS = 12
+MAX_METRIC_CHARTS = 4
+
+@dataclass
+class ChartSpec:
+    """图表描述（可序列化，供进程池渲染）
+
+    kind 为 'bar'（labels 与唯一序列的数值一一对应）或 'line'（各序列按 labels 给出的横轴取值）。
+    """
+    kind: str
+    title: str
+    labels: List[str] = field(default_factory=list)
+    series: Dict[str, List[float]] = field(default_factory=dict)
+
+    def digest(self) -> str:
+        payload = json.dumps(asdict(self), ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def build_chart_specs(data: Dict[str, Any]) -> List[ChartSpec]:
+    """由数据处理结果生成图表描述；缺少的统计项不生成对应图表"""
+    specs = []
+    statistics = data.get('statistics') or {}
+    for key, title in (('source_distribution', '数据来源分布'), ('type_distribution', '数据类型分布')):
+        distribution = sorted((statistics.get(key) or {}).items(), key=lambda kv: -kv[1])[:MAX_BARS]
+        if distribution:
+            specs.append(ChartSpec('bar', title, [str(k) for k, _ in distribution],
+                                   {'记录数': [float(v) for _, v in distribution]}))
+
+    quality = ((data.get('processing_summary') or {}).get('quality_metrics') or {}).get('quality_distribution')
+    if quality:
+        specs.append(ChartSpec('bar', '数据质量分布', [QUALITY_LABELS.get(k, k) for k in quality],
+                               {'记录数': [float(v) for v in quality.values()]}))
+
+    trends = data.get('trends') or {}
+    daily = (trends.get('time_trends') or {}).get('daily_counts')
+    if daily and len(daily) >= 2:
+        start = trends['time_trends'].get('start_date', '')
+        specs.append(ChartSpec('line', '每日数据量', [start] + [''] * (len(daily) - 2) + [trends['time_trends'].get('end_date', '')],
+                               {'记录数': [float(v) for v in daily]}))
+
+    weekly = (trends.get('metric_trends') or {}).get('weekly_means') or {}
+    for name, values in list(sorted(weekly.items()))[:MAX_METRIC_CHARTS]:
+        if len(values) >= 2:
+            specs.append(ChartSpec('line', f"指标周均值: {name}", [f"第{i}周" for i in range(1, len(values) + 1)],
+                                   {name: [float(v) for v in values]}))
+    return specs
+
+def render_svg(spec: ChartSpec) -> str:
+    """渲染一张SVG图表"""
+    if spec.kind == 'bar':
+        return _bar_chart(spec)
+    if spec.kind == 'line':
+        return _line_chart(spec)
+    raise ValueError(f"不支持的图表类型: {spec.kind}")
+
+def _svg(height: int, title: str, body: List[str]) -> str:
+    return "\n".join([
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{WIDTH}" height="{height}" viewBox="0 0 {WIDTH} {height}" '
+        f'font-family="sans-serif" font-size="12">',
+        f'<title>{escape(title)}</title>',
+        f'<text x="{WIDTH / 2:g}" y="20" text-anchor="middle" font-size="14" font-weight="bold">{escape(title)}</text>',
+        *body,
+        '</svg>'
+    ])
+
+def _format(value: float) -> str:
+    return f"{value:.0f}" if float(value).is_integer() or abs(value) >= 100 else f"{value:.2f}"
+
+def _bar_chart(spec: ChartSpec) -> str:
+    """横向条形图：类别标签在左侧，便于显示较长的中文名称"""
+    values = next(iter(spec.series.values()), [])
+    row, top, left, right = 24, 36, 150, 60
+    height = top + row * len(values) + 12
+    peak = max(values, default=0) or 1.0
+    body = []
+    for i, (label, value) in enumerate(zip(spec.labels, values)):
+        y = top + i * row
+        width = (WIDTH - left - right) * max(value, 0) / peak
+        body.append(f'<text x="{left - 8}" y="{y + 16}" text-anchor="end">{escape(label[:20])}</text>')
+        body.append(f'<rect x="{left}" y="{y + 4}" width="{width:.1f}" height="{row - 8}" fill="{PALETTE[0]}"/>')
+        body.append(f'<text x="{left + width + 6:.1f}" y="{y + 16}">{_format(value)}</text>')
+    return _svg(height, spec.title, body)
+
+def _line_chart(spec: ChartSpec) -> str:
+    """折线图：纵轴标注最小/最大值，横轴标注非空标签"""
+    height, top, bottom, left, right = 260, 36, 40, 60, 20
+    plot_w, plot_h = WIDTH - left - right, height - top - bottom
+    all_values = [v for values in spec.series.values() for v in values]
+    low, high = min(all_values, default=0.0), max(all_values, default=1.0)
+    span = (high - low) or 1.0
+    count = max((len(values) for values in spec.series.values()), default=0)
+    step = plot_w / max(count - 1, 1)
+
+    body = [
+        f'<line x1="{left}" y1="{top + plot_h}" x2="{left + plot_w}" y2="{top + plot_h}" stroke="#999"/>',
+        f'<line x1="{left}" y1="{top}" x2="{left}" y2="{top + plot_h}" stroke="#999"/>',
+        f'<text x="{left - 6}" y="{top + 4}" text-anchor="end">{_format(high)}</text>',
+        f'<text x="{left - 6}" y="{top + plot_h + 4}" text-anchor="end">{_format(low)}</text>',
+    ]
+    for i, label in enumerate(spec.labels[:count]):
+        if label and (count <= 12 or i in (0, count - 1)):
+            body.append(f'<text x="{left + i * step:.1f}" y="{top + plot_h + 18}" text-anchor="middle">{escape(label)}</text>')
+    for color, (name, values) in zip(PALETTE * 2, spec.series.items()):
+        points = " ".join(f"{left + i * step:.1f},{top + plot_h - (v - low) / span * plot_h:.1f}" for i, v in enumerate(values))
+        body.append(f'<polyline points="{points}" fill="none" stroke="{color}" stroke-width="2"><title>{escape(name)}</title></polyline>')
+    return _svg(height, spec.title, body)
+
+class ChartRenderer:
+    """图表渲染器 - 直接渲染；进程模式的执行器下，未命中缓存的图表交给进程池并发渲染"""
+
+    def __init__(self, cache: Optional[SearchCache] = None, cache_ttl: float = 30 * 24 * 3600.0):
+        self.cache = cache or SearchCache(os.path.join(os.getenv('RESEARCH_CACHE_DIR', 'cache'), 'charts'))
+        self.cache_ttl = cache_ttl
+        self.rendered = 0
+
+    async def render(self, data: Dict[str, Any], executor=None) -> List[Dict[str, str]]:
+        """渲染数据处理结果的全部图表，返回 [{'title', 'svg'}]；单张图表失败只跳过该图"""
+        specs = build_chart_specs(data) if isinstance(data, dict) else []
+        if executor is None or executor.config.mode != 'process':
+            # 直接渲染比读写缓存文件或交给工作池都便宜
+            return [chart for chart in map(self._render_inline, specs) if chart]
+
+        async def render_one(spec: ChartSpec) -> Optional[Dict[str, str]]:
+            key = SearchCache.make_key('chart', spec.kind, data=spec.digest())
+            entry = await asyncio.to_thread(self.cache.get, key)
+            if entry and entry.is_fresh(self.cache_ttl):
+                return {'title': spec.title, 'svg': entry.payload}
+            try:
+                svg = await executor.run(render_svg, spec)
+            except Exception as e:
+                logger.warning(f"图表渲染失败（{spec.title}）: {e}")
+                return None
+            self.rendered += 1
+            await asyncio.to_thread(self.cache.set, key, svg)
+            return {'title': spec.title, 'svg': svg}
+
+        charts = await asyncio.gather(*(render_one(spec) for spec in specs))
+        return [chart for chart in charts if chart]
+
+    def _render_inline(self, spec: ChartSpec) -> Optional[Dict[str, str]]:
+        try:
+            svg = render_svg(spec)
+        except Exception as e:
+            logger.warning(f"图表渲染失败（{spec.title}）: {e}")
+            return None
+        self.rendered += 1
+        return {'title': spec.title, 'svg': svg}
@@ -0,0 +1,155 @@
+"""
+内容验证模块 - ContentValidator
+用LLM批量验证检索来源的内容可信度和倾向性：多条来源合并为一个结构化提示，
+每条来源的结论按URL与内容哈希缓存，未变化的来源再次检查不产生调用。
+验证调用不带对话历史，结论只取决于批次内容，缓存结果可复现。
+"""
+
+import os
+import re
+import json
+import asyncio
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+from dataclasses import dataclass
+
+from .literature_retriever.search_cache import SearchCache
+from .literature_retriever.dedup import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+BIAS_LEVELS = ('none', 'low', 'medium', 'high')
+_JSON_ARRAY = re.compile(r'\[.*\]', re.DOTALL)
+
+@dataclass
+class SourceVerdict:
+    """单条来源的验证结论（未启用的检查为 None）"""
+    valid: Optional[bool] = None
+    bias: Optional[str] = None
+    note: str = ""
+    cached: bool = False
+
+class ContentValidator:
+    """批量内容验证器
+
+    checks 取 'content'（内容是否可信、与描述一致）和 'bias'（是否存在营销或立场倾向），
+    一个批次最多 batch_size 条来源，对应一次LLM调用；最多 max_concurrency 个批次同时调用。
+    """
+
+    def __init__(self, research_agent, cache: Optional[SearchCache] = None,
+                 batch_size: int = 20, cache_ttl: float = 7 * 24 * 3600.0, max_concurrency: int = 4):
+        self.research_agent = research_agent
+        self.cache = cache or SearchCache(os.path.join(os.getenv('RESEARCH_CACHE_DIR', 'cache'), 'validation'))
+        self.batch_size = max(batch_size, 1)
+        self.cache_ttl = cache_ttl
+        self.max_concurrency = max(max_concurrency, 1)
+        self.llm_calls = 0
+
+    @staticmethod
+    def source_key(item, checks: Sequence[str]) -> str:
+        """来源缓存键：规范化URL、标题与描述的内容哈希以及启用的检查项"""
+        content = f"{getattr(item, 'title', '')}\n{getattr(item, 'description', '')}"
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        return SearchCache.make_key('validation', canonicalize_url(getattr(item, 'url', '')),
+                                    content=digest, checks=sorted(checks))
+
+    async def validate(self, items: List[Any], checks: Sequence[str], query: str = "") -> List[SourceVerdict]:
+        """验证一组来源，返回与 items 一一对应的结论"""
+        if not checks or not items:
+            return [SourceVerdict() for _ in items]
+
+        verdicts: List[Optional[SourceVerdict]] = [None] * len(items)
+        keys = [self.source_key(item, checks) for item in items]
+        pending = []
+        entries = await asyncio.to_thread(lambda: [self.cache.get(key) for key in keys])
+        for position, entry in enumerate(entries):
+            if entry and entry.is_fresh(self.cache_ttl):
+                verdicts[position] = SourceVerdict(**entry.payload, cached=True)
+            else:
+                pending.append(position)
+
+        batches = [pending[start:start + self.batch_size] for start in range(0, len(pending), self.batch_size)]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(batch: List[int]) -> Dict[int, SourceVerdict]:
+            async with semaphore:
+                return await self._validate_batch([items[p] for p in batch], checks, query)
+
+        judged = []
+        for batch, parsed in zip(batches, await asyncio.gather(*(run(batch) for batch in batches))):
+            for offset, position in enumerate(batch):
+                verdict = parsed.get(offset)
+                if verdict is None:
+                    verdicts[position] = SourceVerdict(note="未获得验证结论")
+                    continue
+                verdicts[position] = verdict
+                judged.append(position)
+
+        def store():
+            for position in judged:
+                verdict = verdicts[position]
+                self.cache.set(keys[position], {'valid': verdict.valid, 'bias': verdict.bias, 'note': verdict.note})
+
+        if judged:
+            await asyncio.to_thread(store)
+
+        return verdicts
+
+    async def _validate_batch(self, items: List[Any], checks: Sequence[str], query: str) -> Dict[int, SourceVerdict]:
+        self.llm_calls += 1
+        try:
+            # acomplete 只带系统提示，不随对话历史增加开销；旧的代理对象只提供 achat
+            complete = getattr(self.research_agent, 'acomplete', None) or self.research_agent.achat
+            response = await complete(self._build_prompt(items, checks, query))
+        except Exception as e:
+            logger.warning(f"内容验证调用失败: {e}")
+            return {}
+        return self._parse_response(response, len(items), checks)
+
+    @staticmethod
+    def _build_prompt(items: List[Any], checks: Sequence[str], query: str) -> str:
+        fields = ['"id": 编号']
+        if 'content' in checks:
+            fields.append('"valid": true/false（内容可信且与标题一致）')
+        if 'bias' in checks:
+            fields.append(f'"bias": {"/".join(BIAS_LEVELS)}（营销或立场倾向程度）')
+        fields.append('"note": 不超过30字的理由')
+
+        sources = "\n".join(
+            f"[{i}] {getattr(item, 'title', '')} | {getattr(item, 'source', '')} | {getattr(item, 'url', '')}\n"
+            f"    {(getattr(item, 'description', '') or '')[:300]}"
+            for i, item in enumerate(items)
+        )
+        return f"""逐条评估以下调研来源（主题：{query}）:
+
+{sources}
+
+只输出一个JSON数组，每条来源一个对象，字段: {', '.join(fields)}"""
+
+    @staticmethod
+    def _parse_response(response: str, count: int, checks: Sequence[str]) -> Dict[int, SourceVerdict]:
+        match = _JSON_ARRAY.search(response or '')
+        if not match:
+            logger.warning("内容验证响应不是JSON数组，已忽略")
+            return {}
+        try:
+            rows = json.loads(match.group(0))
+        except ValueError:
+            logger.warning("内容验证响应JSON解析失败，已忽略")
+            return {}
+
+        # 启用的检查缺少合法结论（如 valid 不是JSON布尔值）的条目视为未判定：不采用也不缓存
+        verdicts = {}
+        for row in rows if isinstance(rows, list) else []:
+            if not isinstance(row, dict) or not isinstance(row.get('id'), int) or not 0 <= row['id'] < count:
+                continue
+            valid, bias = row.get('valid'), str(row.get('bias', '')).lower()
+            if ('content' in checks and not isinstance(valid, bool)) or ('bias' in checks and bias not in BIAS_LEVELS):
+                continue
+            verdicts[row['id']] = SourceVerdict(
+                valid=valid if 'content' in checks else None,
+                bias=bias if 'bias' in checks else None,
+                note=str(row.get('note', ''))[:200]
+            )
+        return verdicts
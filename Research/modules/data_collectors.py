@@ -0,0 +1,302 @@
+"""
+数据收集器 - DataCollector
+为 DataProcessor 提供可插拔的真实数据源（GitHub仓库统计、StackExchange问答、本地CSV/JSON文件），
+所有收集器并发运行，各自有超时和结果缓存，输出与 DataProcessor 相同的记录结构。
+收集器逐页产出记录，运行器经有界队列把各收集器的记录页交给调用方，内存占用与数据源大小无关
+（JSON 数组文件需整体解析，大文件使用 JSONL）。
+"""
+
+import os
+import csv
+import json
+import time
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .literature_retriever.search_cache import SearchCache
+
+logger = logging.getLogger(__name__)
+
+class DataCollector:
+    """数据收集器基类 - 子类把 fetch 实现为异步生成器，逐页产出记录列表"""
+
+    name = "base"
+    cacheable = True  # 远程数据源的结果写入缓存
+
+    def __init__(self, timeout: float = 10.0, cache_ttl: float = 3600.0, max_items: int = 30):
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.max_items = max_items
+
+    def cache_params(self) -> Dict[str, Any]:
+        """影响结果的参数，参与缓存键"""
+        return {'max_items': self.max_items}
+
+    def fetch(self, query: str, session) -> AsyncIterator[List[Dict[str, Any]]]:
+        raise NotImplementedError
+
+    @staticmethod
+    def _record(source: str, record_type: str, content: str, timestamp: str,
+                metrics: Dict[str, Any], metadata: Dict[str, Any]) -> Dict[str, Any]:
+        return {'source': source, 'type': record_type, 'content': content, 'timestamp': timestamp,
+                'metrics': metrics, 'metadata': metadata}
+
+class GitHubRepoCollector(DataCollector):
+    """GitHub仓库统计：星标、派生、关注者、未解决问题"""
+
+    name = "GitHub"
+
+    def __init__(self, base_url: str = 'https://api.github.com', token: Optional[str] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url.rstrip('/')
+        self.token = token
+
+    async def fetch(self, query: str, session) -> AsyncIterator[List[Dict[str, Any]]]:
+        headers = {'Accept': 'application/vnd.github.v3+json'}
+        if self.token:
+            headers['Authorization'] = f'token {self.token}'
+        params = {'q': query, 'sort': 'stars', 'order': 'desc', 'per_page': min(self.max_items, 100)}
+
+        async with session.get(f"{self.base_url}/search/repositories", params=params, headers=headers) as response:
+            response.raise_for_status()
+            payload = await response.json()
+
+        yield [self._record(
+            'GitHub', 'repository_stats', f"{repo['full_name']}: {repo.get('description') or ''}".strip(),
+            repo.get('pushed_at') or repo.get('updated_at'),
+            {'stars': repo.get('stargazers_count', 0), 'forks': repo.get('forks_count', 0),
+             'watchers': repo.get('watchers_count', 0), 'open_issues': repo.get('open_issues_count', 0)},
+            {'query': query, 'url': repo.get('html_url'), 'language': repo.get('language'),
+             'created_at': repo.get('created_at')}
+        ) for repo in payload.get('items', [])[:self.max_items]]
+
+class StackExchangeCollector(DataCollector):
+    """StackExchange问答：得分、回答数、浏览量、是否已解决"""
+
+    name = "StackExchange"
+
+    def __init__(self, base_url: str = 'https://api.stackexchange.com/2.3', key: Optional[str] = None,
+                 site: str = 'stackoverflow', **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url.rstrip('/')
+        self.key = key
+        self.site = site
+
+    def cache_params(self) -> Dict[str, Any]:
+        return {**super().cache_params(), 'site': self.site}
+
+    async def fetch(self, query: str, session) -> AsyncIterator[List[Dict[str, Any]]]:
+        params = {'q': query, 'site': self.site, 'order': 'desc', 'sort': 'relevance',
+                  'pagesize': min(self.max_items, 100)}
+        if self.key:
+            params['key'] = self.key
+
+        async with session.get(f"{self.base_url}/search/advanced", params=params) as response:
+            response.raise_for_status()
+            payload = await response.json()
+
+        if payload.get('quota_remaining') is not None and payload['quota_remaining'] < 10:
+            logger.warning(f"StackExchange API 配额即将用尽: 剩余 {payload['quota_remaining']}")
+
+        yield [self._record(
+            'StackExchange', 'qa_thread', item.get('title', ''),
+            datetime.fromtimestamp(item.get('last_activity_date') or item.get('creation_date', 0), timezone.utc).isoformat(),
+            {'score': item.get('score', 0), 'answer_count': item.get('answer_count', 0),
+             'view_count': item.get('view_count', 0), 'is_answered': int(bool(item.get('is_answered')))},
+            {'query': query, 'url': item.get('link'), 'tags': item.get('tags', []), 'site': self.site}
+        ) for item in payload.get('items', [])[:self.max_items]]
+
+class LocalFileCollector(DataCollector):
+    """本地数据文件（CSV/JSON/JSONL）
+
+    CSV 的 source/type/content/timestamp 列直接映射，其余可转为数值的列作为指标；
+    JSON/JSONL 中的对象需已符合记录结构。CSV 和 JSONL 逐行读取、每 page_size 条产出一页；
+    JSON 文件需要整体解析，大文件请使用 JSONL。
+    """
+
+    name = "LocalFile"
+    cacheable = False
+
+    RECORD_FIELDS = ('source', 'type', 'content', 'timestamp')
+
+    def __init__(self, paths: List[str], page_size: int = 1000, **kwargs):
+        super().__init__(**kwargs)
+        self.paths = [Path(p) for p in paths]
+        self.page_size = max(page_size, 1)
+
+    async def fetch(self, query: str, session) -> AsyncIterator[List[Dict[str, Any]]]:
+        # 文件读取在线程中进行，每次读取一页
+        pages = self._iter_pages(query)
+        try:
+            while (page := await asyncio.to_thread(next, pages, None)) is not None:
+                yield page
+        finally:
+            try:
+                pages.close()
+            except ValueError:
+                pass  # 取消时线程仍在读取，文件随生成器回收关闭
+
+    def _iter_pages(self, query: str) -> Iterator[List[Dict[str, Any]]]:
+        page = []
+        for path in self.paths:
+            try:
+                for record in self._iter_file(path, query):
+                    page.append(record)
+                    if len(page) >= self.page_size:
+                        yield page
+                        page = []
+            except (OSError, ValueError) as e:
+                logger.warning(f"读取数据文件失败: {path} ({e})")
+        if page:
+            yield page
+
+    def _iter_file(self, path: Path, query: str) -> Iterator[Dict[str, Any]]:
+        suffix = path.suffix.lower()
+        if suffix == '.csv':
+            return self._read_csv(path, query)
+        if suffix in ('.json', '.jsonl'):
+            return self._read_json(path)
+        logger.warning(f"不支持的数据文件类型: {path}")
+        return iter(())
+
+    def _read_csv(self, path: Path, query: str) -> Iterator[Dict[str, Any]]:
+        with path.open(encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                metrics = {}
+                for key, value in row.items():
+                    if key in self.RECORD_FIELDS or key is None or value in (None, ''):
+                        continue
+                    try:
+                        metrics[key] = float(value)
+                    except ValueError:
+                        pass
+                yield self._record(
+                    row.get('source') or path.stem, row.get('type') or 'local_data', row.get('content') or '',
+                    row.get('timestamp') or datetime.now().isoformat(), metrics,
+                    {'query': query, 'file': str(path)}
+                )
+
+    @staticmethod
+    def _read_json(path: Path) -> Iterator[Dict[str, Any]]:
+        with path.open(encoding='utf-8') as f:
+            if path.suffix.lower() == '.jsonl':
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+                return
+            data = json.load(f)
+        yield from data if isinstance(data, list) else data.get('records', [])
+
+class CollectorRunner:
+    """并发运行收集器：每个收集器独立超时，失败或超时只影响自身，远程结果按TTL缓存"""
+
+    def __init__(self, collectors: List[DataCollector], cache: Optional[SearchCache] = None, use_cache: bool = True):
+        self.collectors = collectors
+        self.cache = cache or SearchCache(os.path.join(os.getenv('RESEARCH_CACHE_DIR', 'cache'), 'collectors'))
+        self.use_cache = use_cache
+
+    async def collect(self, query: str, session=None) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        """收集全部数据源并合并为一个列表（全部记录留在内存中，适合小数据量；DataProcessor 使用 stream）
+
+        Returns:
+            (records, status): 合并后的记录，以及各收集器的状态（status、count、cached、elapsed）
+        """
+        records, status = [], {}
+        async for _, page in self.stream(query, session, status):
+            records.extend(page)
+        return records, status
+
+    async def stream(self, query: str, session=None,
+                     status: Optional[Dict[str, Dict[str, Any]]] = None) -> AsyncIterator[Tuple[str, List[Dict[str, Any]]]]:
+        """按到达顺序逐页产出 (收集器名称, 记录页)，各收集器结束时把状态写入 status
+
+        队列容量与收集器数相同：调用方处理较慢时收集器暂停读取，同时在内存中的记录页数有上限。
+        """
+        if not self.collectors:
+            return
+        status = status if status is not None else {}
+
+        own_session = session is None
+        if own_session:
+            import aiohttp
+            session = aiohttp.ClientSession()
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=len(self.collectors))
+
+        async def pump(collector: DataCollector):
+            async def emit(page: List[Dict[str, Any]]):
+                await queue.put((collector.name, page))
+            try:
+                status[collector.name] = await self._run(collector, query, session, emit)
+            except Exception as e:
+                logger.warning(f"数据收集器 {collector.name} 失败: {e}")
+                status[collector.name] = {'status': 'failed', 'error': str(e), 'count': 0, 'cached': False, 'elapsed': 0.0}
+            await queue.put((collector.name, None))  # 结束标记
+
+        tasks = [asyncio.create_task(pump(c)) for c in self.collectors]
+        try:
+            running = len(tasks)
+            while running:
+                name, page = await queue.get()
+                if page is None:
+                    running -= 1
+                elif page:
+                    yield name, page
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if own_session:
+                await session.close()
+
+    async def _run(self, collector: DataCollector, query: str, session, emit) -> Dict[str, Any]:
+        """运行一个收集器，每页交给 emit，返回状态
+
+        超时只计等待数据源的时间（不含调用方处理记录页的时间），超时或失败前已产出的记录保留；
+        可缓存的结果边产出边写入缓存文件，完整收集后才提交。
+        """
+        start = time.perf_counter()
+        key = SearchCache.make_key(collector.name, query, **collector.cache_params())
+        cacheable = self.use_cache and collector.cacheable
+
+        if cacheable:
+            entry = await asyncio.to_thread(self.cache.get, key)
+            if entry and entry.is_fresh(collector.cache_ttl):
+                # 只有远程数据源写入缓存，条目数不超过 max_items
+                await emit(entry.payload)
+                return {'status': 'ok', 'count': len(entry.payload), 'cached': True, 'elapsed': 0.0}
+
+        loop = asyncio.get_running_loop()
+        writer = await asyncio.to_thread(self.cache.writer, key) if cacheable else None
+        pages = collector.fetch(query, session)
+        remaining, count = collector.timeout, 0
+        state: Dict[str, Any] = {'status': 'ok'}
+        try:
+            while True:
+                waited_from = loop.time()
+                try:
+                    page = await asyncio.wait_for(pages.__anext__(), timeout=max(remaining, 0.0))
+                except StopAsyncIteration:
+                    break
+                remaining -= loop.time() - waited_from
+                if writer:
+                    await asyncio.to_thread(writer.extend, page)
+                count += len(page)
+                await emit(page)
+            if writer:
+                await asyncio.to_thread(writer.commit)
+        except asyncio.TimeoutError:
+            logger.warning(f"数据收集器 {collector.name} 超时（{collector.timeout}s）")
+            state = {'status': 'timeout'}
+        except Exception as e:
+            logger.warning(f"数据收集器 {collector.name} 失败: {e}")
+            state = {'status': 'failed', 'error': str(e)}
+        finally:
+            await pages.aclose()
+            if writer:
+                writer.abort()  # 未提交（超时、失败或被取消）时不缓存不完整的结果
+
+        return {**state, 'count': count, 'cached': False, 'elapsed': round(time.perf_counter() - start, 3)}
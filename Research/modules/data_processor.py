@@ -8,11 +8,16 @@ import asyncio
 import pandas as pd
 import numpy as np
 import logging
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, Tuple, AsyncIterator
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from collections import Counter, defaultdict
 import random
+from itertools import chain
+
+from .stage_executor import ProcessSafeModule, StageExecutor
+from .data_collectors import (DataCollector, CollectorRunner, GitHubRepoCollector,
+                              StackExchangeCollector, LocalFileCollector)
+from .record_stream import RecordAggregator, achunks, chunks
 
 logger = logging.getLogger(__name__)
 
@@ -34,48 +39,70 @@ class ProcessingConfig:
     enable_categorization: bool = True
     time_window_days: int = 30
     min_data_points: int = 5
-
-class DataProcessor:
+    collector_timeout: float = 10.0  # 单个数据源的超时（秒）
+    use_cache: bool = True
+    # StackExchange 无密钥也可访问，因此默认只在配置了 STACKEXCHANGE_KEY 时启用，其余情况需显式开启
+    enable_stackexchange: bool = field(default_factory=lambda: bool(os.getenv('STACKEXCHANGE_KEY')))
+    simulate_when_empty: bool = True  # 真实数据源均无结果时用模拟数据演示
+    chunk_size: int = 10000  # 流式处理的数据块大小
+    sample_size: int = 20  # 结果中保留的样本记录数
+
+class DataProcessor(ProcessSafeModule):
     """数据处理器 - 负责数据收集、清洗和分析"""
 
-    def __init__(self, research_agent):
+    def __init__(self, research_agent, executor: Optional[StageExecutor] = None,
+                 collectors: Optional[List[DataCollector]] = None, config: Optional[ProcessingConfig] = None):
         self.research_agent = research_agent
-        self.config = ProcessingConfig()
+        self.executor = executor or StageExecutor()
+        self.config = config or ProcessingConfig()
         self.apis = {
             'github': {'base_url': 'https://api.github.com', 'token': os.getenv('GITHUB_TOKEN')},
             'stackoverflow': {'base_url': 'https://api.stackexchange.com/2.3', 'key': os.getenv('STACKEXCHANGE_KEY')}
         }
-        logger.info("DataProcessor 初始化完成")
+        self.collectors = collectors if collectors is not None else self._default_collectors()
+        logger.info(f"DataProcessor 初始化完成 - 数据源: {', '.join(c.name for c in self.collectors) or '无'}")
+
+    def _default_collectors(self) -> List[DataCollector]:
+        """按已配置的API和 RESEARCH_DATA_FILES（路径分隔符分隔的CSV/JSON文件）创建收集器"""
+        timeout = self.config.collector_timeout
+        collectors: List[DataCollector] = []
+        if self.apis['github']['token']:
+            collectors.append(GitHubRepoCollector(self.apis['github']['base_url'], self.apis['github']['token'],
+                                                  timeout=timeout))
+        if self.config.enable_stackexchange:
+            collectors.append(StackExchangeCollector(self.apis['stackoverflow']['base_url'],
+                                                     self.apis['stackoverflow']['key'], timeout=timeout))
+        data_files = [p for p in os.getenv('RESEARCH_DATA_FILES', '').split(os.pathsep) if p]
+        if data_files:
+            collectors.append(LocalFileCollector(data_files, timeout=timeout))
+        return collectors
 
     async def process(self, query: str, config: Optional[ProcessingConfig] = None) -> Dict[str, Any]:
-        """执行完整的数据处理流程"""
+        """执行完整的数据处理流程
+
+        收集、清洗、评分和去重按数据块流式进行，统计量在线聚合，内存占用与记录总数无关。
+        """
         if config:
             self.config = config
 
         logger.info(f"开始数据处理: {query}")
 
         try:
-            raw_data = await self._collect_data(query)
-            cleaned_data = self._clean_data(raw_data)
-            analysis_results = self._analyze_data(cleaned_data, query)
-            trend_results = self._analyze_trends(cleaned_data) if self.config.enable_trend_analysis else {}
-
-            result = {
-                'query': query,
-                'processing_summary': {
-                    'total_records': len(cleaned_data),
-                    'processing_time': datetime.now().isoformat(),
-                    'data_sources': list(set(d.get('source', 'unknown') for d in cleaned_data)),
-                    'quality_metrics': self._calculate_quality_metrics(cleaned_data)
-                },
-                'statistics': analysis_results.get('statistics', {}),
-                'trends': trend_results,
-                'recommendations': analysis_results.get('recommendations', []),
-                'raw_insights': self._extract_insights(cleaned_data),
-                'report': self._generate_processing_report(query, raw_data, cleaned_data, analysis_results, trend_results)
-            }
+            aggregator = RecordAggregator(self.config.sample_size)
+            collection_status: Dict[str, Dict[str, Any]] = {}
+            raw_count = 0
+
+            async for chunk in achunks(self._stream_records(query, collection_status), self.config.chunk_size):
+                raw_count += len(chunk)
+                # 清洗与评分为CPU密集步骤，交给阶段执行器
+                frame, metrics = await self.executor.run(self._prepare_chunk, chunk)
+                if len(frame):
+                    aggregator.update(frame, metrics)
 
-            logger.info(f"数据处理完成: {query} - 处理了 {len(cleaned_data)} 条记录")
+            result = self._summarize(aggregator, query, raw_count)
+            result['processing_summary']['collectors'] = collection_status
+
+            logger.info(f"数据处理完成: {query} - 处理了 {result['processing_summary']['total_records']} 条记录")
             return result
 
         except Exception as e:
@@ -85,37 +112,90 @@ class DataProcessor:
                 'statistics': {}, 'trends': {}, 'recommendations': [], 'report': f"数据处理失败: {e}"
             }
 
-    async def _collect_data(self, query: str) -> List[Dict[str, Any]]:
-        """收集多源数据"""
+    def _process_records(self, raw_data: List[Dict[str, Any]], query: str) -> Dict[str, Any]:
+        """清洗并分析已收集的数据（纯计算，可在子进程中执行）"""
+        aggregator = RecordAggregator(self.config.sample_size)
+        for chunk in chunks(raw_data, self.config.chunk_size):
+            frame, metrics = self._prepare_chunk(chunk)
+            if len(frame):
+                aggregator.update(frame, metrics)
+        return self._summarize(aggregator, query, len(raw_data))
+
+    def _prepare_chunk(self, chunk: List[Dict[str, Any]]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """清洗一个数据块并转换为列式表示"""
+        return self._to_frame(self._clean_data(chunk))
+
+    def _summarize(self, aggregator: RecordAggregator, query: str, raw_count: int) -> Dict[str, Any]:
+        """由聚合结果生成处理结果"""
+        logger.info(f"数据清洗完成: {raw_count} -> {aggregator.total} 条记录")
+        analysis_results = self._analyze_data(aggregator, query)
+        trend_results = self._analyze_trends(aggregator) if self.config.enable_trend_analysis else {}
+
+        return {
+            'query': query,
+            'processing_summary': {
+                'total_records': aggregator.total,
+                'duplicates_removed': aggregator.duplicates,
+                'processing_time': datetime.now().isoformat(),
+                'data_sources': list(aggregator.sources),
+                'quality_metrics': self._calculate_quality_metrics(aggregator)
+            },
+            'statistics': analysis_results.get('statistics', {}),
+            'trends': trend_results,
+            'recommendations': analysis_results.get('recommendations', []),
+            'raw_insights': analysis_results.get('insights', []),
+            'samples': aggregator.samples.items,
+            'report': self._generate_processing_report(query, raw_count, aggregator.total, analysis_results, trend_results),
+            'status': 'completed'
+        }
+
+    async def _stream_records(self, query: str, status: Dict[str, Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """按到达顺序逐页产出各数据源的记录（AI建议与各收集器并发进行），各源状态写入 status"""
+        suggestion_task = asyncio.create_task(self._collect_ai_suggestion(query))
+        runner = CollectorRunner(self.collectors, use_cache=self.config.use_cache)
+        collected = 0
+
         try:
-            data = []
-
-            # AI建议
-            try:
-                response = self.research_agent.chat(f"为'{query}'提供数据收集建议（领域：{self.research_agent.research_domain}）")
-                data.append({
-                    'source': 'AI建议', 'type': 'data_collection_strategy', 'content': response,
-                    'timestamp': datetime.now().isoformat(), 'metadata': {'query': query, 'domain': self.research_agent.research_domain}
-                })
-            except Exception as e:
-                logger.warning(f"AI建议获取失败: {e}")
-
-            # GitHub数据
-            if self.apis['github']['token']:
-                data.append({
-                    'source': 'GitHub', 'type': 'repository_stats', 'content': f'GitHub repositories for {query}',
-                    'timestamp': datetime.now().isoformat(), 'metadata': {'query': query, 'api_endpoint': 'search/repositories'}
-                })
-
-            # 模拟数据
-            data.extend(self._generate_simulated_data(query))
-
-            logger.info(f"收集到 {len(data)} 条数据记录")
-            return data
+            session = await self._http_session() if self.collectors else None
+            async for _, records in runner.stream(query, session, status):
+                collected += sum(map(self._is_valid, records))
+                for record in records:
+                    yield record
+
+            suggestion = await suggestion_task
+            if suggestion:
+                yield suggestion
+        finally:
+            suggestion_task.cancel()
+
+        if not collected and self.config.simulate_when_empty:
+            simulated = self._generate_simulated_data(query)
+            status['Simulated'] = {'status': 'ok', 'count': len(simulated), 'cached': False, 'elapsed': 0.0}
+            for record in simulated:
+                yield record
+
+    async def _http_session(self):
+        """代理的HTTP连接池（外部传入的会话或文献检索模块的会话）；代理快照没有会话，由收集器运行器临时创建"""
+        get_session = getattr(self.research_agent, 'get_http_session', None)
+        if get_session is None:
+            return None
+        try:
+            return await get_session()
+        except Exception as e:
+            logger.warning(f"获取共享HTTP会话失败: {e}")
+            return None
 
+    async def _collect_ai_suggestion(self, query: str) -> Optional[Dict[str, Any]]:
+        """AI数据收集建议"""
+        try:
+            response = await self.research_agent.achat(f"为'{query}'提供数据收集建议（领域：{self.research_agent.research_domain}）")
+            return {
+                'source': 'AI建议', 'type': 'data_collection_strategy', 'content': response,
+                'timestamp': datetime.now().isoformat(), 'metadata': {'query': query, 'domain': self.research_agent.research_domain}
+            }
         except Exception as e:
-            logger.error(f"数据收集失败: {e}")
-            return []
+            logger.warning(f"AI建议获取失败: {e}")
+            return None
 
     def _generate_simulated_data(self, query: str) -> List[Dict[str, Any]]:
         """生成模拟数据用于演示"""
@@ -148,171 +228,141 @@ class DataProcessor:
                 'source': source, 'type': data_type, 'content': f'{data_type} for {query}',
                 'timestamp': (datetime.now() - timedelta(days=random.randint(0, 30))).isoformat(),
                 'metrics': metrics,
-                'metadata': {'query': query, 'simulation_id': f"sim_{i}", 'confidence': random.uniform(0.7, 0.9)}
+                'metadata': {'query': query, 'simulation_id': f"sim_{i}", 'confidence': random.uniform(0.7, 0.9),
+                             'simulated': True}
             })
 
         return data
 
     def _clean_data(self, raw_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """清洗和标准化数据"""
-        cleaned_data = []
-
-        for item in raw_data:
-            try:
-                if not item or not isinstance(item, dict):
-                    continue
-
-                if 'timestamp' not in item or 'source' not in item:
-                    continue
-
-                # 时间戳标准化
-                if isinstance(item['timestamp'], str):
-                    try:
-                        item['timestamp'] = datetime.fromisoformat(item['timestamp'].replace('Z', '+00:00'))
-                    except:
-                        item['timestamp'] = datetime.now()
-
-                if 'metrics' in item and not isinstance(item['metrics'], dict):
-                    item['metrics'] = {}
-
-                item['quality_score'] = self._calculate_record_quality(item)
-                cleaned_data.append(item)
-
-            except Exception as e:
-                logger.warning(f"清洗数据记录失败: {e}")
-                continue
-
-        # 去重和排序
-        cleaned_data = self._remove_duplicates(cleaned_data)
-        cleaned_data.sort(key=lambda x: x['timestamp'], reverse=True)
-
-        logger.info(f"数据清洗完成: {len(raw_data)} -> {len(cleaned_data)} 条记录")
-        return cleaned_data
-
-    def _calculate_record_quality(self, record: Dict[str, Any]) -> float:
-        """计算数据记录质量分数"""
-        score = 5.0
-
-        if isinstance(record.get('timestamp'), datetime):
-            days_old = (datetime.now() - record['timestamp']).days
-            if days_old <= 7:
-                score += 2.0
-            elif days_old <= 30:
-                score += 1.0
-            elif days_old <= 90:
-                score += 0.5
-
-        for field in ['source', 'type', 'content']:
-            if field not in record:
-                score -= 0.5
-
-        metrics = record.get('metrics', {})
-        if metrics:
-            score += min(len(metrics) * 0.3, 2.0)
-
-        metadata = record.get('metadata', {})
-        if metadata:
-            score += min(len(metadata) * 0.1, 1.0)
-
-        return max(0.0, min(10.0, score))
-
-    def _remove_duplicates(self, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """去除重复数据"""
-        seen = set()
-        unique_data = []
-
-        for item in data:
-            identifier = (
-                item.get('source', ''),
-                item.get('type', ''),
-                item.get('content', ''),
-                item.get('timestamp').isoformat() if isinstance(item.get('timestamp'), datetime) else ''
-            )
-
-            if identifier not in seen:
-                seen.add(identifier)
-                unique_data.append(item)
-
-        return unique_data
-
-    def _analyze_data(self, data: List[Dict[str, Any]], query: str) -> Dict[str, Any]:
+        """过滤无效记录（缺少时间戳或来源），标准化、去重和评分在列式表示上完成"""
+        return [item for item in raw_data if self._is_valid(item)]
+
+    @staticmethod
+    def _is_valid(item: Any) -> bool:
+        return bool(item) and isinstance(item, dict) and 'timestamp' in item and 'source' in item
+
+    def _to_frame(self, records: List[Dict[str, Any]]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """转换为列式表示（记录字典只在此处读取一次，后续分析全部基于列运算）
+
+        Returns:
+            (frame, metrics): 每条记录一行的主表（已标准化时间戳并评分，key 为去重用的记录哈希），
+            以及数值指标的长表（record_index, metric, value）
+        """
+        metrics_list = [m if isinstance(m := item.get('metrics'), dict) else {} for item in records]
+        frame = pd.DataFrame({
+            'source': [item['source'] for item in records],
+            'type': [item.get('type') for item in records],
+            'content': [item.get('content') for item in records],
+            'timestamp': [item['timestamp'] for item in records],
+            'metric_count': np.fromiter(map(len, metrics_list), dtype=np.int64, count=len(records)),
+            'metadata_count': [len(m) if isinstance(m := item.get('metadata'), dict) else 0 for item in records],
+            'has_type': np.fromiter(('type' in item for item in records), dtype=bool, count=len(records)),
+            'has_content': np.fromiter(('content' in item for item in records), dtype=bool, count=len(records)),
+        })
+        frame['record_index'] = np.arange(len(frame))
+
+        # 带时区的时间统一换算为UTC后去掉时区；无法解析的按当前时间处理
+        frame['timestamp'] = pd.to_datetime(frame['timestamp'], errors='coerce', utc=True, format='ISO8601') \
+            .dt.tz_localize(None).fillna(pd.Timestamp(datetime.now()))
+        frame['quality_score'] = self._score_records(frame)
+        frame['key'] = pd.util.hash_pandas_object(
+            frame[['source', 'type', 'content', 'timestamp']].astype({'content': str}), index=False).to_numpy()
+
+        return frame, self._metrics_long(metrics_list)
+
+    @staticmethod
+    def _metrics_long(metrics_list: List[Dict[str, Any]]) -> pd.DataFrame:
+        """把各记录的 metrics 字典展开为长表，非数值指标丢弃"""
+        counts = np.fromiter(map(len, metrics_list), dtype=np.int64, count=len(metrics_list))
+        names = list(chain.from_iterable(metrics_list))
+        values = list(chain.from_iterable(m.values() for m in metrics_list))
+        try:
+            numeric = np.asarray(values, dtype=float)
+        except (TypeError, ValueError):
+            numeric = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=float)
+
+        metrics = pd.DataFrame({'record_index': np.repeat(np.arange(len(metrics_list)), counts),
+                                'metric': names, 'value': numeric})
+        return metrics.dropna(subset=['value'])
+
+    def _score_records(self, frame: pd.DataFrame) -> np.ndarray:
+        """向量化计算记录质量分数（时效性、字段完整性、指标和元数据数量）"""
+        days_old = (pd.Timestamp(datetime.now()) - frame['timestamp']).dt.days.to_numpy()
+        score = 5.0 + np.select([days_old <= 7, days_old <= 30, days_old <= 90], [2.0, 1.0, 0.5], 0.0)
+        score -= 0.5 * ((~frame['has_type'].to_numpy()).astype(float) + (~frame['has_content'].to_numpy()).astype(float))
+        score += np.minimum(frame['metric_count'].to_numpy() * 0.3, 2.0)
+        score += np.minimum(frame['metadata_count'].to_numpy() * 0.1, 1.0)
+        return np.clip(score, 0.0, 10.0)
+
+    def _analyze_data(self, aggregator: RecordAggregator, query: str) -> Dict[str, Any]:
         """分析数据"""
         analysis = {'statistics': {}, 'patterns': [], 'recommendations': [], 'insights': []}
 
-        if not data:
+        if not aggregator.total:
             return analysis
 
         try:
-            analysis['statistics'] = self._calculate_basic_statistics(data)
-            analysis['patterns'] = self._identify_patterns(data)
-            analysis['recommendations'] = self._generate_recommendations(data, query)
-            analysis['insights'] = self._extract_key_insights(data, query)
+            analysis['statistics'] = self._calculate_basic_statistics(aggregator)
+            analysis['patterns'] = self._identify_patterns(aggregator)
+            analysis['recommendations'] = self._generate_recommendations(aggregator, query)
+            analysis['insights'] = self._extract_key_insights(aggregator, query)
             return analysis
         except Exception as e:
             logger.error(f"数据分析失败: {e}")
             return analysis
 
-    def _calculate_basic_statistics(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _calculate_basic_statistics(self, aggregator: RecordAggregator) -> Dict[str, Any]:
         """计算基本统计数据"""
         stats = {
-            'total_records': len(data),
+            'total_records': aggregator.total,
             'date_range': {},
             'source_distribution': {},
             'type_distribution': {},
             'quality_metrics': {}
         }
 
-        if not data:
+        if not aggregator.total:
             return stats
 
-        timestamps = [item['timestamp'] for item in data if isinstance(item.get('timestamp'), datetime)]
-        if timestamps:
-            stats['date_range'] = {
-                'earliest': min(timestamps).isoformat(),
-                'latest': max(timestamps).isoformat(),
-                'span_days': (max(timestamps) - min(timestamps)).days
-            }
-
-        stats['source_distribution'] = dict(Counter(item.get('source', 'unknown') for item in data))
-        stats['type_distribution'] = dict(Counter(item.get('type', 'unknown') for item in data))
-
-        quality_scores = [item.get('quality_score', 0) for item in data]
-        if quality_scores:
-            stats['quality_metrics'] = {
-                'average_quality': np.mean(quality_scores),
-                'min_quality': min(quality_scores),
-                'max_quality': max(quality_scores),
-                'high_quality_ratio': sum(1 for s in quality_scores if s >= 8) / len(quality_scores)
-            }
+        stats['date_range'] = {
+            'earliest': aggregator.earliest.isoformat(),
+            'latest': aggregator.latest.isoformat(),
+            'span_days': aggregator.span_days
+        }
+        stats['source_distribution'] = dict(aggregator.sources)
+        stats['type_distribution'] = dict(aggregator.types)
+
+        quality = aggregator.quality
+        stats['quality_metrics'] = {
+            'average_quality': quality.mean,
+            'std_quality': quality.std,
+            'min_quality': quality.min,
+            'max_quality': quality.max,
+            'high_quality_ratio': aggregator.quality_bins['high'] / quality.count
+        }
 
         return stats
 
-    def _identify_patterns(self, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _identify_patterns(self, aggregator: RecordAggregator) -> List[Dict[str, Any]]:
         """识别数据模式"""
         patterns = []
 
         try:
-            # 时间趋势模式
-            time_groups = defaultdict(list)
-            for item in data:
-                if isinstance(item.get('timestamp'), datetime):
-                    time_groups[item['timestamp'].date()].append(item)
-
-            if len(time_groups) > 1:
-                dates = sorted(time_groups.keys())
-                counts = [len(time_groups[date]) for date in dates]
-
-                if len(counts) >= 3:
-                    recent_counts = counts[-3:]
-                    if all(recent_counts[i] > recent_counts[i-1] for i in range(1, len(recent_counts))):
-                        patterns.append({'type': 'increasing_trend', 'description': '数据量呈现上升趋势', 'confidence': 0.7})
-                    elif all(recent_counts[i] < recent_counts[i-1] for i in range(1, len(recent_counts))):
-                        patterns.append({'type': 'decreasing_trend', 'description': '数据量呈现下降趋势', 'confidence': 0.7})
+            # 时间趋势模式：最近三个有数据的日期
+            counts = aggregator.daily_counts()
+            counts = counts[counts > 0]
+            if len(counts) >= 3:
+                steps = np.diff(counts[-3:])
+                if (steps > 0).all():
+                    patterns.append({'type': 'increasing_trend', 'description': '数据量呈现上升趋势', 'confidence': 0.7})
+                elif (steps < 0).all():
+                    patterns.append({'type': 'decreasing_trend', 'description': '数据量呈现下降趋势', 'confidence': 0.7})
 
             # 来源多样性
-            sources = set(item.get('source', 'unknown') for item in data)
-            if len(sources) > 3:
-                patterns.append({'type': 'diverse_sources', 'description': f'数据来源多样化（{len(sources)}个来源）', 'confidence': 0.8})
+            source_count = len(aggregator.sources)
+            if source_count > 3:
+                patterns.append({'type': 'diverse_sources', 'description': f'数据来源多样化（{source_count}个来源）', 'confidence': 0.8})
 
             return patterns
 
@@ -320,81 +370,94 @@ class DataProcessor:
             logger.error(f"模式识别失败: {e}")
             return []
 
-    def _generate_recommendations(self, data: List[Dict[str, Any]], query: str) -> List[str]:
+    def _generate_recommendations(self, aggregator: RecordAggregator, query: str) -> List[str]:
         """生成数据改进建议"""
         recommendations = []
+        if not aggregator.total:
+            return recommendations
 
-        quality_scores = [item.get('quality_score', 0) for item in data]
-        if quality_scores and np.mean(quality_scores) < 7.0:
+        if aggregator.quality.mean < 7.0:
             recommendations.append("建议提高数据收集标准，重点关注数据来源的权威性和时间新鲜度")
 
-        sources = set(item.get('source', 'unknown') for item in data)
-        if len(sources) < 3:
+        if len(aggregator.sources) < 3:
             recommendations.append("建议扩展数据来源，增加数据多样性和代表性")
 
-        timestamps = [item['timestamp'] for item in data if isinstance(item.get('timestamp'), datetime)]
-        if timestamps and (max(timestamps) - min(timestamps)).days < 7:
+        if aggregator.span_days < 7:
             recommendations.append("建议收集更长时间跨度的数据，以识别长期趋势")
 
-        metrics_count = sum(1 for item in data if item.get('metrics'))
-        if metrics_count / len(data) < 0.5:
+        if aggregator.with_metrics / aggregator.total < 0.5:
             recommendations.append("建议为更多数据记录添加量化指标，以支持深度分析")
 
         return recommendations
 
-    def _extract_key_insights(self, data: List[Dict[str, Any]], query: str) -> List[str]:
+    def _extract_key_insights(self, aggregator: RecordAggregator, query: str) -> List[str]:
         """提取关键洞察"""
-        if not data:
+        if not aggregator.total:
             return []
 
-        insights = [f"收集到{len(data)}条相关数据记录"]
-
-        timestamps = [item['timestamp'] for item in data if isinstance(item.get('timestamp'), datetime)]
-        if timestamps:
-            time_span = (max(timestamps) - min(timestamps)).days
-            insights.append(f"数据时间跨度为{time_span}天")
+        insights = [f"收集到{aggregator.total}条相关数据记录"]
+        insights.append(f"数据时间跨度为{aggregator.span_days}天")
 
-        sources = Counter(item.get('source', 'unknown') for item in data)
-        if sources:
-            top_source = sources.most_common(1)[0]
-            insights.append(f"主要数据来源是{top_source[0]}，占{top_source[1]/len(data):.1%}")
-
-        quality_scores = [item.get('quality_score', 0) for item in data if 'quality_score' in item]
-        if quality_scores:
-            insights.append(f"数据质量平均分为{np.mean(quality_scores):.1f}/10")
+        top_source, top_count = aggregator.sources.most_common(1)[0]
+        insights.append(f"主要数据来源是{top_source}，占{top_count/aggregator.total:.1%}")
+        insights.append(f"数据质量平均分为{aggregator.quality.mean:.1f}/10")
 
         return insights
 
-    def _analyze_trends(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """分析数据趋势"""
-        return {
-            'time_trends': {'data_volume_trend': 'stable', 'confidence': 0.6},
+    def _analyze_trends(self, aggregator: RecordAggregator) -> Dict[str, Any]:
+        """分析数据趋势：日数据量的线性趋势，以及各数值指标按周均值的趋势"""
+        trends = {
+            'time_trends': {'data_volume_trend': 'insufficient_data', 'confidence': 0.5},
             'metric_trends': {'overall_trend': 'insufficient_data', 'confidence': 0.5}
         }
-
-    def _calculate_quality_metrics(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if not aggregator.total or aggregator.total < self.config.min_data_points:
+            return trends
+
+        daily = aggregator.daily_counts()
+        direction, confidence, slope = self._linear_trend(daily)
+        # 序列数据供图表阶段使用
+        trends['time_trends'] = {'data_volume_trend': direction, 'confidence': confidence,
+                                 'slope_per_day': slope, 'days': len(daily),
+                                 'daily_counts': daily.astype(int).tolist(),
+                                 'start_date': str(np.datetime64(min(aggregator.daily), 'D')),
+                                 'end_date': str(np.datetime64(max(aggregator.daily), 'D'))}
+
+        weekly = {name: values for name, values in sorted(aggregator.weekly_metric_means().items()) if len(values) >= 2}
+        per_metric = {name: self._linear_trend(values)[0] for name, values in weekly.items()}
+        if per_metric:
+            votes = pd.Series(per_metric).value_counts()
+            trends['metric_trends'] = {'overall_trend': votes.index[0],
+                                       'confidence': round(float(votes.iloc[0] / len(per_metric)), 2),
+                                       'metrics': per_metric,
+                                       'weekly_means': {name: np.round(values, 4).tolist() for name, values in weekly.items()}}
+
+        return trends
+
+    @staticmethod
+    def _linear_trend(values: np.ndarray, tolerance: float = 0.05):
+        """最小二乘拟合趋势；斜率相对均值小于容差视为平稳。返回 (方向, 置信度R², 斜率)"""
+        if len(values) < 2 or not np.isfinite(values).all():
+            return 'insufficient_data', 0.5, 0.0
+        x = np.arange(len(values), dtype=float)
+        slope, intercept = np.polyfit(x, values, 1)
+        residual = values - (slope * x + intercept)
+        total = ((values - values.mean()) ** 2).sum()
+        r_squared = 1.0 - (residual ** 2).sum() / total if total > 0 else 0.0
+
+        relative = slope * len(values) / (abs(values.mean()) or 1.0)
+        direction = 'stable' if abs(relative) < tolerance else ('increasing' if slope > 0 else 'decreasing')
+        return direction, round(float(r_squared), 2), round(float(slope), 4)
+
+    def _calculate_quality_metrics(self, aggregator: RecordAggregator) -> Dict[str, Any]:
         """计算数据质量指标"""
-        if not data:
-            return {}
-
-        quality_scores = [item.get('quality_score', 0) for item in data if 'quality_score' in item]
-
-        if not quality_scores:
+        if not aggregator.total:
             return {}
 
         return {
-            'average_quality': np.mean(quality_scores),
-            'quality_distribution': {
-                'high': sum(1 for s in quality_scores if s >= 8),
-                'medium': sum(1 for s in quality_scores if 5 <= s < 8),
-                'low': sum(1 for s in quality_scores if s < 5)
-            }
+            'average_quality': aggregator.quality.mean,
+            'quality_distribution': dict(aggregator.quality_bins)
         }
 
-    def _extract_insights(self, data: List[Dict[str, Any]]) -> List[str]:
-        """提取数据洞察"""
-        return self._extract_key_insights(data, "")
-
     def _generate_processing_report(self, query: str, raw_count: int, cleaned_count: int,
                                    analysis: Dict[str, Any], trends: Dict[str, Any]) -> str:
         """生成数据处理报告"""
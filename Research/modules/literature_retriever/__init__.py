@@ -9,5 +9,7 @@
 """
 
 from .literature_retriever import LiteratureRetriever
+from .search_cache import SearchCache
+from .dedup import ResultDeduplicator, canonicalize_url
 
-__all__ = ['LiteratureRetriever']
\ No newline at end of file
+__all__ = ['LiteratureRetriever', 'SearchCache', 'ResultDeduplicator', 'canonicalize_url']
\ No newline at end of file
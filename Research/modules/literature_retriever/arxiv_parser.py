@@ -0,0 +1,77 @@
+"""
+arXiv Atom 增量解析器 - ArxivAtomParser
+按数据块消费响应体，每解析完一个 entry 即产出并释放其元素。
+"""
+
+import logging
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+ENTRY_TAG = f'{ATOM_NS}entry'
+MAX_AUTHORS = 5
+
+class ArxivAtomParser:
+    """arXiv Atom 增量解析器，内存占用与单个 entry 大小相关，与结果总数无关"""
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=('start', 'end'))
+        self._root = None
+
+    def feed(self, data) -> List[Dict[str, Any]]:
+        """输入一个数据块，返回其中已完整解析的条目"""
+        self._parser.feed(data)
+        return list(self._drain())
+
+    def close(self) -> List[Dict[str, Any]]:
+        """结束输入，返回剩余条目"""
+        self._parser.close()
+        return list(self._drain())
+
+    def _drain(self) -> Iterator[Dict[str, Any]]:
+        for event, elem in self._parser.read_events():
+            if event == 'start':
+                if self._root is None:
+                    self._root = elem
+                continue
+            if elem.tag != ENTRY_TAG:
+                continue
+            try:
+                yield self._entry_to_dict(elem)
+            except Exception as e:
+                logger.error(f"处理arXiv条目失败: {e}")
+            finally:
+                # 释放已处理的元素，避免整棵树常驻内存
+                elem.clear()
+                if self._root is not None:
+                    self._root.remove(elem)
+
+    @staticmethod
+    def _entry_to_dict(entry: ET.Element) -> Dict[str, Any]:
+        """单次遍历子元素提取字段"""
+        fields: Dict[str, Any] = {'authors': []}
+        for child in entry:
+            tag = child.tag[len(ATOM_NS):] if child.tag.startswith(ATOM_NS) else child.tag
+            if tag in ('title', 'summary'):
+                fields[tag] = " ".join((child.text or '').split())
+            elif tag in ('id', 'published'):
+                fields[tag] = (child.text or '').strip()
+            elif tag == 'author' and len(fields['authors']) < MAX_AUTHORS:
+                name = child.find(f'{ATOM_NS}name')
+                if name is not None and name.text:
+                    fields['authors'].append(name.text.strip())
+
+        return {
+            'title': fields['title'],
+            'arxiv_id': fields['id'].split('/')[-1],
+            'summary': fields.get('summary', ''),
+            'published': fields['published'],
+            'authors': fields['authors']
+        }
+
+def parse_arxiv_entries(xml_content) -> List[Dict[str, Any]]:
+    """一次性解析完整的 Atom 文档"""
+    parser = ArxivAtomParser()
+    return parser.feed(xml_content) + parser.close()
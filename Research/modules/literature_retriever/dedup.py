@@ -0,0 +1,141 @@
+"""
+检索结果去重 - ResultDeduplicator
+规范化URL并用MinHash识别跨来源的近似重复结果，合并为一条。
+"""
+
+import re
+import hashlib
+import logging
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from ..relevance import tokenize
+
+logger = logging.getLogger(__name__)
+
+MINHASH_PERMUTATIONS = 64
+MINHASH_BANDS = 16  # 每段4行，Jaccard约0.5以上的结果大概率成为候选
+_MERSENNE_PRIME = (1 << 61) - 1
+_PERMUTATIONS = [
+    (int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), 'big') % _MERSENNE_PRIME | 1,
+     int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), 'big') % _MERSENNE_PRIME)
+    for i in range(MINHASH_PERMUTATIONS)
+]
+_TRACKING_PARAMS = {'ref', 'source', 'fbclid', 'gclid'}
+_ARXIV_PATH = re.compile(r'^/(?:abs|pdf)/(.+?)(?:v\d+)?(?:\.pdf)?$')
+
+def canonicalize_url(url: str) -> str:
+    """规范化URL：统一协议与主机、去掉跟踪参数和锚点；GitHub保留 owner/repo，arXiv去掉版本号"""
+    if not url:
+        return ''
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    path = parts.path.rstrip('/')
+
+    if host == 'github.com':
+        path = '/'.join(path.lower().split('/')[:3])
+    elif host in ('arxiv.org', 'export.arxiv.org'):
+        host = 'arxiv.org'
+        match = _ARXIV_PATH.match(path)
+        if match:
+            path = f"/abs/{match.group(1)}"
+
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query)
+        if not k.lower().startswith('utm_') and k.lower() not in _TRACKING_PARAMS
+    ))
+    return urlunsplit(('https', host, path, query, ''))
+
+def minhash(tokens: List[str]) -> tuple:
+    """词项集合的MinHash签名"""
+    hashes = {int.from_bytes(hashlib.blake2b(t.encode('utf-8'), digest_size=8).digest(), 'big')
+              for t in tokens}
+    return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+def estimate_jaccard(a: tuple, b: tuple) -> float:
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+class ResultDeduplicator:
+    """检索结果去重器 - 相同规范化URL或估计Jaccard相似度不低于阈值的结果视为重复
+
+    对签名分段建立LSH桶索引，每条结果只与共享分段的候选比较，避免两两比较。
+    去重范围是一次检索：同一次检索中来自缓存和实时请求的页面一起去重；
+    索引不跨检索保留，历史调研中出现过的结果在新报告中照常保留。
+    """
+
+    def __init__(self, threshold: float = 0.8, min_tokens: int = 4):
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold 必须在 (0, 1] 范围内")
+        self.threshold = threshold
+        self.min_tokens = min_tokens  # 过短的文本指纹不可靠，只按URL去重
+        self._by_url: Dict[str, object] = {}
+        self._fingerprints: List[tuple] = []
+        self._bands: Dict[tuple, List[int]] = {}
+        self.duplicates = 0
+
+    def add(self, result) -> Optional[object]:
+        """加入一条结果；新结果原样返回，重复结果并入已有结果并返回 None"""
+        url = canonicalize_url(result.url)
+        existing = self._by_url.get(url) if url else None
+
+        fingerprint = None
+        tokens = tokenize(f"{result.title} {result.description}")
+        if existing is None and len(tokens) >= self.min_tokens:
+            fingerprint = minhash(tokens)
+            existing = self._find_near_duplicate(fingerprint)
+
+        if existing is not None:
+            self._merge(existing, result, url)
+            self.duplicates += 1
+            return None
+
+        result.metadata.setdefault('canonical_url', url)
+        if url:
+            self._by_url[url] = result
+        if fingerprint is not None:
+            self._index(fingerprint, result)
+        return result
+
+    def deduplicate(self, results: List) -> List:
+        """按顺序去重（排在前面的结果作为保留项）"""
+        return [r for r in results if self.add(r) is not None]
+
+    def _band_keys(self, fingerprint: tuple):
+        rows = MINHASH_PERMUTATIONS // MINHASH_BANDS
+        return [(band, fingerprint[band * rows:(band + 1) * rows]) for band in range(MINHASH_BANDS)]
+
+    def _index(self, fingerprint: tuple, result):
+        position = len(self._fingerprints)
+        self._fingerprints.append((fingerprint, result))
+        for key in self._band_keys(fingerprint):
+            self._bands.setdefault(key, []).append(position)
+
+    def _find_near_duplicate(self, fingerprint: tuple):
+        seen = set()
+        for key in self._band_keys(fingerprint):
+            for position in self._bands.get(key, ()):
+                if position in seen:
+                    continue
+                seen.add(position)
+                candidate, result = self._fingerprints[position]
+                if estimate_jaccard(candidate, fingerprint) >= self.threshold:
+                    return result
+        return None
+
+    def _merge(self, kept, duplicate, url: str):
+        """合并重复项：保留较高相关性，记录所有来源和URL"""
+        kept.relevance_score = max(kept.relevance_score, duplicate.relevance_score)
+        sources = kept.metadata.setdefault('sources', [kept.source])
+        if duplicate.source not in sources:
+            sources.append(duplicate.source)
+        kept.metadata.setdefault('duplicate_urls', [])
+        if duplicate.url != kept.url and duplicate.url not in kept.metadata['duplicate_urls']:
+            kept.metadata['duplicate_urls'].append(duplicate.url)
+        if url and url not in self._by_url:
+            self._by_url[url] = kept
@@ -4,12 +4,19 @@
 """
 
 import os
+import math
+import time
 import asyncio
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, AsyncIterator, Callable, Tuple
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 
+from .search_cache import SearchCache, ttl_for_time_range
+from .arxiv_parser import ArxivAtomParser, parse_arxiv_entries
+from .dedup import ResultDeduplicator
+from ..relevance import RelevanceEngine
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -33,23 +40,142 @@ class LiteratureConfig:
     include_papers: bool = True
     include_blogs: bool = True
     time_range_days: int = 180
+    use_cache: bool = True
+    github_page_size: int = 100  # GitHub单页上限100，搜索API最多返回1000条
+    arxiv_page_size: int = 100
+    max_concurrent_pages: int = 4
+    arxiv_page_delay: float = 3.0  # arXiv API 要求连续请求间隔约3秒
+    max_rate_limit_wait: float = 60.0  # 触发限流时最长等待（秒），超过则停止翻页
+    deduplicate: bool = True
+    dedup_threshold: float = 0.8  # 标题+描述的Jaccard相似度阈值（MinHash估计）
+
+    @classmethod
+    def from_research_config(cls, config) -> 'LiteratureConfig':
+        """由 ResearchConfig 推导检索配置（按 max_sources 分配各来源数量）"""
+        max_sources = max(getattr(config, 'max_sources', 20), 1)
+        return cls(
+            max_github_results=max(max_sources // 2, 1),
+            max_paper_results=max(max_sources // 4, 1),
+            max_blog_results=max(max_sources // 4, 1),
+            include_github=getattr(config, 'include_github', True),
+            include_papers=getattr(config, 'include_papers', True),
+            include_blogs=getattr(config, 'include_blogs', True),
+            use_cache=getattr(config, 'cache_results', True)
+        )
+
+class RateLimitError(Exception):
+    """API限流且等待时间超过配置上限"""
+
+async def merge_async_iterators(iterators: List[AsyncIterator[Any]]) -> AsyncIterator[Any]:
+    """并发消费多个异步迭代器，按到达顺序产出元素"""
+    queue: asyncio.Queue = asyncio.Queue()
+    done = object()
+
+    async def drain(iterator):
+        try:
+            async for item in iterator:
+                await queue.put(item)
+        except Exception as e:
+            logger.error(f"检索流失败: {e}")
+        finally:
+            await queue.put(done)
+
+    tasks = [asyncio.create_task(drain(iterator)) for iterator in iterators]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            item = await queue.get()
+            if item is done:
+                remaining -= 1
+            else:
+                yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+
+@dataclass
+class ConnectionConfig:
+    """HTTP连接池配置"""
+    limit: int = 20  # 连接池总连接数
+    limit_per_host: int = 8
+    dns_cache_ttl: int = 300  # 秒
+    keepalive_timeout: float = 30.0  # 秒
+    request_timeout: float = 30.0  # 单次请求总超时（秒）
 
 class LiteratureRetriever:
     """文献检索器 - 集成多种数据源"""
 
-    def __init__(self, research_agent):
+    def __init__(self, research_agent, session=None, connection_config: Optional[ConnectionConfig] = None,
+                 cache: Optional[SearchCache] = None):
         self.research_agent = research_agent
         self.config = LiteratureConfig()
+        self.connection_config = connection_config or ConnectionConfig()
+        self.cache = cache or SearchCache()
+        self.relevance_engine = RelevanceEngine()
         self.github_token = os.getenv('GITHUB_TOKEN')
         self.github_api_base = 'https://api.github.com'
         self.arxiv_api_base = 'http://export.arxiv.org/api/query'
         self.search_history = []
+
+        # 长连接会话：外部注入的会话由注入方负责关闭
+        self._session = session
+        self._owns_session = session is None
+        self._session_loop = None
+
+        # GitHub限流恢复时间（epoch秒），由响应头更新
+        self._github_rate_reset = 0.0
         logger.info("LiteratureRetriever 初始化完成")
 
-    async def search(self, query: str, config: Optional[LiteratureConfig] = None) -> Dict[str, Any]:
-        """执行多源文献检索"""
+    async def get_session(self):
+        """获取复用的HTTP会话，按需创建（会话绑定事件循环，循环变化时重建）；数据收集器经由代理的 get_http_session 共用"""
+        import aiohttp
+
+        if not self._owns_session:
+            return self._session
+
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            if self._session is not None and not self._session.closed and self._session_loop is not None \
+                    and not self._session_loop.is_closed():
+                await self._session.close()
+            cfg = self.connection_config
+            connector = aiohttp.TCPConnector(
+                limit=cfg.limit,
+                limit_per_host=cfg.limit_per_host,
+                ttl_dns_cache=cfg.dns_cache_ttl,
+                keepalive_timeout=cfg.keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=cfg.request_timeout)
+            )
+            self._session_loop = loop
+        return self._session
+
+    async def close(self):
+        """关闭自有的HTTP会话"""
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+        if self._owns_session:
+            self._session = None
+            self._session_loop = None
+
+    async def __aenter__(self) -> 'LiteratureRetriever':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def search(self, query: str, config: Optional[LiteratureConfig] = None,
+                     stop_when: Optional[Callable[[SearchResult], bool]] = None) -> Dict[str, Any]:
+        """执行多源文献检索
+
+        Args:
+            stop_when: 可选回调，按到达顺序传入每条GitHub/arXiv结果，返回True时停止翻页
+                （结果中 stopped_early 为True，且不再生成博客推荐）
+        """
         if config:
-            self.config = config
+            self.config = config if isinstance(config, LiteratureConfig) else LiteratureConfig.from_research_config(config)
 
         logger.info(f"开始文献检索: {query}")
 
@@ -60,37 +186,23 @@ class LiteratureRetriever:
             'paper_results': [],
             'blog_results': [],
             'total_results': 0,
-            'search_summary': {}
+            'search_summary': {},
+            'status': 'completed'
         }
 
         try:
-            # 并行检索
-            tasks = []
-            if self.config.include_github:
-                tasks.append(self._search_github(query))
-            if self.config.include_papers:
-                tasks.append(self._search_arxiv(query))
-            if self.config.include_blogs:
-                tasks.append(self._search_tech_blogs(query))
-
-            if tasks:
-                search_results = await asyncio.gather(*tasks, return_exceptions=True)
-
-                idx = 0
-                if self.config.include_github and idx < len(search_results):
-                    if not isinstance(search_results[idx], Exception):
-                        results['github_results'] = search_results[idx]
-                    idx += 1
-
-                if self.config.include_papers and idx < len(search_results):
-                    if not isinstance(search_results[idx], Exception):
-                        results['paper_results'] = search_results[idx]
-                    idx += 1
-
-                if self.config.include_blogs and idx < len(search_results):
-                    if not isinstance(search_results[idx], Exception):
-                        results['blog_results'] = search_results[idx]
-                    idx += 1
+            if stop_when is not None:
+                await self._search_until(query, results, stop_when)
+            else:
+                await self._search_all(query, results)
+
+            if self.config.deduplicate:
+                self._deduplicate_results(results)
+
+            # 分页评分只基于单页统计，汇总后用全部结果构建的索引重新评分
+            self._rescore_results(results['github_results'] + results['paper_results'], query)
+            results['github_results'].sort(key=lambda x: x.relevance_score, reverse=True)
+            results['paper_results'].sort(key=lambda x: x.relevance_score, reverse=True)
 
             results['total_results'] = sum(len(results[k]) for k in ['github_results', 'paper_results', 'blog_results'])
             results['search_summary'] = self._generate_search_summary(results, query)
@@ -106,35 +218,217 @@ class LiteratureRetriever:
         except Exception as e:
             logger.error(f"文献检索失败: {e}")
             return {'query': query, 'error': str(e), 'timestamp': datetime.now().isoformat(),
-                   'github_results': [], 'paper_results': [], 'blog_results': [], 'total_results': 0}
+                   'github_results': [], 'paper_results': [], 'blog_results': [], 'total_results': 0,
+                   'status': 'failed'}
+
+    async def _search_all(self, query: str, results: Dict[str, Any]):
+        """并行检索各来源的全部结果"""
+        tasks = []
+        if self.config.include_github:
+            tasks.append(self._search_github(query))
+        if self.config.include_papers:
+            tasks.append(self._search_arxiv(query))
+        if self.config.include_blogs:
+            tasks.append(self._search_tech_blogs(query))
+
+        if tasks:
+            search_results = await asyncio.gather(*tasks, return_exceptions=True)
+
+            idx = 0
+            if self.config.include_github and idx < len(search_results):
+                if not isinstance(search_results[idx], Exception):
+                    results['github_results'] = search_results[idx]
+                idx += 1
+
+            if self.config.include_papers and idx < len(search_results):
+                if not isinstance(search_results[idx], Exception):
+                    results['paper_results'] = search_results[idx]
+                idx += 1
+
+            if self.config.include_blogs and idx < len(search_results):
+                if not isinstance(search_results[idx], Exception):
+                    results['blog_results'] = search_results[idx]
+                idx += 1
+
+    async def _search_until(self, query: str, results: Dict[str, Any], stop_when: Callable[[SearchResult], bool]):
+        """流式检索GitHub与arXiv，stop_when 返回True时取消剩余翻页"""
+        keys = {'GitHub': 'github_results', 'arXiv': 'paper_results'}
+        stream = self.iter_search(query)
+        try:
+            async for result in stream:
+                results[keys.get(result.source, 'blog_results')].append(result)
+                if stop_when(result):
+                    results['stopped_early'] = True
+                    logger.info(f"检索质量已达标，提前停止: {query} ({sum(len(results[k]) for k in keys.values())} 条)")
+                    break
+        finally:
+            await stream.aclose()
+
+        if self.config.include_blogs and not results.get('stopped_early'):
+            results['blog_results'] = await self._search_tech_blogs(query)
+
+    async def iter_search(self, query: str, config: Optional[LiteratureConfig] = None) -> AsyncIterator[SearchResult]:
+        """流式多页检索 - 并发翻页GitHub与arXiv，结果到达即产出
+
+        下游可以在首页结果到达后立即开始评分和质量检查，后续页面仍在加载。
+        """
+        if config:
+            self.config = config if isinstance(config, LiteratureConfig) else LiteratureConfig.from_research_config(config)
+
+        streams = []
+        if self.config.include_github:
+            streams.append(self._iter_github_pages(query, self.config.max_github_results))
+        if self.config.include_papers:
+            streams.append(self._iter_arxiv_pages(query, self.config.max_paper_results))
+
+        deduplicator = ResultDeduplicator(self.config.dedup_threshold) if self.config.deduplicate else None
+        merged = merge_async_iterators(streams)
+        try:
+            async for result in merged:
+                # 重复项并入先到达的结果，不再产出
+                if deduplicator is None or deduplicator.add(result) is not None:
+                    yield result
+        finally:
+            # 调用方提前停止时立即取消仍在加载的页面
+            await merged.aclose()
+
+    def _deduplicate_results(self, results: Dict[str, Any]):
+        """跨来源去重：相关性高的结果优先保留，重复项的来源和URL记入其元数据"""
+        keys = {'GitHub': 'github_results', 'arXiv': 'paper_results'}
+        all_results = results['github_results'] + results['paper_results'] + results['blog_results']
+        all_results.sort(key=lambda x: x.relevance_score, reverse=True)
+
+        deduplicator = ResultDeduplicator(self.config.dedup_threshold)
+        kept = deduplicator.deduplicate(all_results)
+
+        for key in ('github_results', 'paper_results', 'blog_results'):
+            results[key] = []
+        for result in kept:
+            results[keys.get(result.source, 'blog_results')].append(result)
+        results['duplicates_removed'] = deduplicator.duplicates
+        if deduplicator.duplicates:
+            logger.info(f"跨来源去重合并了 {deduplicator.duplicates} 个重复结果")
 
     async def _search_github(self, query: str) -> List[SearchResult]:
         """搜索GitHub仓库"""
         try:
-            if not self.github_token:
-                logger.warning("未配置GitHub token")
-                return []
-
-            import aiohttp
-            github_query = self._build_github_query(query)
-
-            async with aiohttp.ClientSession() as session:
-                headers = {'Authorization': f'token {self.github_token}', 'Accept': 'application/vnd.github.v3+json'}
-                url = f"{self.github_api_base}/search/repositories"
-                params = {'q': github_query, 'sort': 'stars', 'order': 'desc', 'per_page': min(self.config.max_github_results, 30)}
-
-                async with session.get(url, headers=headers, params=params) as response:
-                    if response.status == 200:
-                        repos_data = await response.json()
-                        return self._process_github_repos(repos_data.get('items', []), query)
-                    else:
-                        logger.error(f"GitHub API错误: {response.status}")
-                        return []
-
+            results = [r async for r in self._iter_github_pages(query, self.config.max_github_results)]
+            return sorted(results, key=lambda x: x.relevance_score, reverse=True)
         except Exception as e:
             logger.error(f"GitHub搜索失败: {e}")
             return []
 
+    async def _iter_github_pages(self, query: str, max_results: int) -> AsyncIterator[SearchResult]:
+        """逐页产出GitHub结果：先取首页获知总数，其余页面并发获取"""
+        if not self.github_token:
+            logger.warning("未配置GitHub token")
+            return
+
+        per_page = min(max_results, self.config.github_page_size, 100)
+        first_page, total_count = await self._fetch_github_page(query, 1, per_page)
+
+        yielded = 0
+        for result in first_page[:max_results]:
+            yield result
+            yielded += 1
+
+        last_page = math.ceil(min(total_count, max_results, 1000) / per_page)
+        if last_page <= 1 or len(first_page) < per_page:
+            return
+
+        semaphore = asyncio.Semaphore(self.config.max_concurrent_pages)
+
+        async def fetch(page: int):
+            async with semaphore:
+                return await self._fetch_github_page(query, page, per_page)
+
+        tasks = [asyncio.create_task(fetch(page)) for page in range(2, last_page + 1)]
+        try:
+            for next_page in asyncio.as_completed(tasks):
+                try:
+                    page_results, _ = await next_page
+                except RateLimitError as e:
+                    logger.warning(f"GitHub翻页中止: {e}")
+                    break
+                except Exception as e:
+                    logger.error(f"GitHub分页获取失败: {e}")
+                    continue
+                for result in page_results:
+                    if yielded >= max_results:
+                        return
+                    yield result
+                    yielded += 1
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _fetch_github_page(self, query: str, page: int, per_page: int,
+                                 retried: bool = False) -> Tuple[List[SearchResult], int]:
+        """获取一页GitHub搜索结果，返回 (结果, 匹配总数)；被限流时等待恢复后重试一次"""
+        cache_key, cached = await self._lookup_cache('github', query, per_page=per_page, page=page)
+        if cached and cached.is_fresh(ttl_for_time_range(self.config.time_range_days)):
+            repos_data = cached.payload
+            return self._process_github_repos(repos_data.get('items', []), query), repos_data.get('total_count', 0)
+
+        github_query = self._build_github_query(query)
+        await self._wait_for_github_quota()
+        session = await self.get_session()
+
+        headers = {'Authorization': f'token {self.github_token}', 'Accept': 'application/vnd.github.v3+json'}
+        if cached and cached.etag:
+            # 条件请求：未变化时GitHub返回304且不消耗配额
+            headers['If-None-Match'] = cached.etag
+        url = f"{self.github_api_base}/search/repositories"
+        params = {'q': github_query, 'sort': 'stars', 'order': 'desc', 'per_page': per_page, 'page': page}
+
+        async with session.get(url, headers=headers, params=params) as response:
+            self._update_github_rate_limit(response.headers)
+            if response.status == 304 and cached:
+                await asyncio.to_thread(self.cache.touch, cache_key, cached)
+                repos_data = cached.payload
+            elif response.status == 200:
+                repos_data = await response.json()
+                if cache_key:
+                    await asyncio.to_thread(self.cache.set, cache_key, repos_data, etag=response.headers.get('ETag'))
+            elif response.status in (403, 429) and not retried and self._github_rate_reset > time.time():
+                logger.warning(f"GitHub API限流: {response.status}")
+                repos_data = None
+            else:
+                logger.error(f"GitHub API错误: {response.status}")
+                return [], 0
+
+        if repos_data is None:
+            await self._wait_for_github_quota()
+            return await self._fetch_github_page(query, page, per_page, retried=True)
+
+        return self._process_github_repos(repos_data.get('items', []), query), repos_data.get('total_count', 0)
+
+    def _update_github_rate_limit(self, headers):
+        """根据响应头记录限流恢复时间"""
+        retry_after = headers.get('Retry-After')
+        if retry_after:
+            self._github_rate_reset = max(self._github_rate_reset, time.time() + float(retry_after))
+        elif headers.get('X-RateLimit-Remaining') == '0' and headers.get('X-RateLimit-Reset'):
+            self._github_rate_reset = max(self._github_rate_reset, float(headers['X-RateLimit-Reset']))
+
+    async def _wait_for_github_quota(self):
+        """配额耗尽时等待恢复；等待过长则抛出 RateLimitError"""
+        wait = self._github_rate_reset - time.time()
+        if wait <= 0:
+            return
+        if wait > self.config.max_rate_limit_wait:
+            raise RateLimitError(f"GitHub配额将在{wait:.0f}秒后恢复，超过等待上限")
+        logger.info(f"GitHub配额耗尽，等待 {wait:.1f} 秒")
+        await asyncio.sleep(wait)
+
+    async def _lookup_cache(self, source: str, query: str, **params):
+        """查找缓存条目（在线程中读取文件）；禁用缓存时返回 (None, None)"""
+        if not self.config.use_cache:
+            return None, None
+        key = SearchCache.make_key(source, query, domain=self.research_agent.research_domain,
+                                   time_range_days=self.config.time_range_days, **params)
+        return key, await asyncio.to_thread(self.cache.get, key)
+
     def _build_github_query(self, query: str) -> str:
         """构建GitHub搜索查询"""
         time_limit = (datetime.now() - timedelta(days=self.config.time_range_days)).strftime('%Y-%m-%d')
@@ -145,26 +439,35 @@ class LiteratureRetriever:
 
         return github_query
 
+    # BM25文本相关性（0-1）在各来源总分中的权重，其余分数来自来源特有的加成
+    TEXT_WEIGHTS = {'GitHub': 5.0, 'arXiv': 6.0}
+
     def _process_github_repos(self, repos: List[Dict], query: str) -> List[SearchResult]:
         """处理GitHub仓库结果"""
         results = []
+        repos = repos[:self.config.max_github_results]
+        text_scores = self.relevance_engine.score_texts(
+            query, [(repo.get('full_name') or '', self._github_body(repo.get('description'), repo.get('topics', [])))
+                    for repo in repos]
+        )
 
-        for repo in repos[:self.config.max_github_results]:
+        for repo, text_score in zip(repos, text_scores):
             try:
-                relevance_score = self._calculate_github_relevance(repo, query)
+                boost = self._github_relevance_boost(repo, query)
                 results.append(SearchResult(
                     title=repo['full_name'],
                     url=repo['html_url'],
                     description=repo['description'] or '无描述',
                     source='GitHub',
-                    relevance_score=relevance_score,
+                    relevance_score=min(text_score * self.TEXT_WEIGHTS['GitHub'] + boost, 10.0),
                     timestamp=datetime.fromisoformat(repo['updated_at'].replace('Z', '+00:00')),
                     metadata={
                         'stars': repo['stargazers_count'],
                         'forks': repo['forks_count'],
                         'language': repo['language'],
                         'topics': repo.get('topics', []),
-                        'license': repo.get('license', {}).get('name') if repo.get('license') else None
+                        'license': repo.get('license', {}).get('name') if repo.get('license') else None,
+                        'relevance_boost': boost
                     }
                 ))
             except Exception as e:
@@ -173,23 +476,20 @@ class LiteratureRetriever:
 
         return sorted(results, key=lambda x: x.relevance_score, reverse=True)
 
-    def _calculate_github_relevance(self, repo: Dict, query: str) -> float:
-        """计算GitHub仓库相关性分数"""
+    @staticmethod
+    def _github_body(description: Optional[str], topics: List[str]) -> str:
+        return f"{description or ''} {' '.join(topics)}"
+
+    def _github_relevance_boost(self, repo: Dict, query: str) -> float:
+        """GitHub仓库加成：仓库名包含完整查询、主题匹配、星标数"""
         score = 0.0
         query_lower = query.lower()
 
-        if repo['name'] and query_lower in repo['name'].lower():
-            score += 3.0
-
-        if repo['description']:
-            desc_lower = repo['description'].lower()
-            query_words = query_lower.split()
-            matches = sum(1 for word in query_words if word in desc_lower)
-            score += matches * 1.5
+        if repo.get('name') and query_lower in repo['name'].lower():
+            score += 2.0
 
-        topics = repo.get('topics', [])
-        topic_matches = sum(1 for topic in topics if query_lower in topic.lower())
-        score += topic_matches * 2.0
+        topic_matches = sum(1 for topic in repo.get('topics', []) if query_lower in topic.lower())
+        score += min(topic_matches * 2.0, 2.0)
 
         stars = repo.get('stargazers_count', 0)
         if stars > 1000:
@@ -197,91 +497,134 @@ class LiteratureRetriever:
         elif stars > 100:
             score += 1.0
 
-        return min(score, 10.0)
+        return score
+
+    def _rescore_results(self, results: List[SearchResult], query: str):
+        """用全部结果构建的倒排索引重新计算相关性（保留来源加成）"""
+        scored = [r for r in results if r.source in self.TEXT_WEIGHTS]
+        if not scored:
+            return
+
+        text_scores = self.relevance_engine.score_texts(query, [
+            (r.title, self._github_body(r.description, r.metadata.get('topics', [])) if r.source == 'GitHub' else r.description)
+            for r in scored
+        ])
+        for result, text_score in zip(scored, text_scores):
+            boost = result.metadata.get('relevance_boost', 0.0)
+            result.relevance_score = min(text_score * self.TEXT_WEIGHTS[result.source] + boost, 10.0)
 
     async def _search_arxiv(self, query: str) -> List[SearchResult]:
         """搜索arXiv学术论文"""
         try:
-            import aiohttp
-            arxiv_query = f'all:"{query}"'
-
-            async with aiohttp.ClientSession() as session:
-                params = {
-                    'search_query': arxiv_query, 'start': 0,
-                    'max_results': min(self.config.max_paper_results, 20),
-                    'sortBy': 'relevance', 'sortOrder': 'descending'
-                }
-
-                async with session.get(self.arxiv_api_base, params=params) as response:
-                    if response.status == 200:
-                        xml_content = await response.text()
-                        return self._parse_arxiv_xml(xml_content, query)
-                    else:
-                        logger.error(f"arXiv API错误: {response.status}")
-                        return []
-
+            return [r async for r in self._iter_arxiv_pages(query, self.config.max_paper_results)]
         except Exception as e:
             logger.error(f"arXiv搜索失败: {e}")
             return []
 
-    def _parse_arxiv_xml(self, xml_content: str, query: str) -> List[SearchResult]:
-        """解析arXiv XML响应"""
+    ARXIV_CHUNK_SIZE = 64 * 1024
+
+    async def _iter_arxiv_pages(self, query: str, max_results: int) -> AsyncIterator[SearchResult]:
+        """逐页产出arXiv结果；按API使用要求顺序翻页并保持请求间隔"""
+        page_size = min(max_results, self.config.arxiv_page_size)
+        for start in range(0, max_results, page_size):
+            if start:
+                await asyncio.sleep(self.config.arxiv_page_delay)
+            count = 0
+            async for result in self._iter_arxiv_page(query, start, min(page_size, max_results - start)):
+                yield result
+                count += 1
+            if count < page_size:
+                break
+
+    async def _iter_arxiv_page(self, query: str, start: int, max_results: int) -> AsyncIterator[SearchResult]:
+        """获取一页arXiv结果，边接收响应边解析产出"""
+        cache_key, cached = await self._lookup_cache('arxiv', query, max_results=max_results, start=start)
+        if cached and cached.is_fresh(ttl_for_time_range(self.config.time_range_days)):
+            for result in self._arxiv_results_from_payload(cached.payload, query):
+                yield result
+            return
+
+        arxiv_query = f'all:"{query}"'
+        session = await self.get_session()
+
+        params = {
+            'search_query': arxiv_query, 'start': start,
+            'max_results': max_results,
+            'sortBy': 'relevance', 'sortOrder': 'descending'
+        }
+        headers = {'If-None-Match': cached.etag} if cached and cached.etag else {}
+
+        async with session.get(self.arxiv_api_base, params=params, headers=headers) as response:
+            if response.status == 304 and cached:
+                await asyncio.to_thread(self.cache.touch, cache_key, cached)
+                for result in self._arxiv_results_from_payload(cached.payload, query):
+                    yield result
+                return
+            if response.status != 200:
+                logger.error(f"arXiv API错误: {response.status}")
+                return
+
+            # 缓存解析后的精简条目而非原始XML；条目边解析边写入缓存文件，不在内存中累积
+            parser = ArxivAtomParser()
+            writer = self.cache.writer(cache_key, etag=response.headers.get('ETag')) if cache_key else None
+            try:
+                async for chunk in response.content.iter_chunked(self.ARXIV_CHUNK_SIZE):
+                    for entry in parser.feed(chunk):
+                        if writer:
+                            writer.add(entry)
+                        result = self._arxiv_entry_to_result(entry, query)
+                        if result:
+                            yield result
+                for entry in parser.close():
+                    if writer:
+                        writer.add(entry)
+                    result = self._arxiv_entry_to_result(entry, query)
+                    if result:
+                        yield result
+                if writer:
+                    await asyncio.to_thread(writer.commit)
+            finally:
+                # 调用方提前停止（如增量质量评分达标）时不缓存不完整的页
+                if writer:
+                    writer.abort()
+
+    def _arxiv_results_from_payload(self, payload, query: str) -> List[SearchResult]:
+        """由缓存内容构建结果（兼容旧版缓存中的原始XML）"""
+        if isinstance(payload, str):
+            return self._parse_arxiv_xml(payload, query)
+        return [r for r in (self._arxiv_entry_to_result(entry, query) for entry in payload) if r]
+
+    def _arxiv_entry_to_result(self, entry: Dict[str, Any], query: str) -> Optional[SearchResult]:
+        """将解析出的arXiv条目转换为搜索结果"""
         try:
-            import xml.etree.ElementTree as ET
-            root = ET.fromstring(xml_content)
-            namespace = {'atom': 'http://www.w3.org/2005/Atom'}
-            results = []
-
-            for entry in root.findall('atom:entry', namespace):
-                try:
-                    title = entry.find('atom:title', namespace).text.strip()
-                    arxiv_id = entry.find('atom:id', namespace).text.split('/')[-1]
-                    url = f"https://arxiv.org/abs/{arxiv_id}"
-                    summary = entry.find('atom:summary', namespace).text.strip().replace('\s+', ' ')
-                    published = entry.find('atom:published', namespace).text
-                    timestamp = datetime.fromisoformat(published.replace('Z', '+00:00'))
-
-                    authors = [author.find('atom:name', namespace).text for author in entry.findall('atom:author', namespace)][:5]
-
-                    relevance_score = self._calculate_arxiv_relevance(title, summary, query)
-
-                    results.append(SearchResult(
-                        title=title,
-                        url=url,
-                        description=summary[:300] + "..." if len(summary) > 300 else summary,
-                        source='arXiv',
-                        relevance_score=relevance_score,
-                        timestamp=timestamp,
-                        metadata={'arxiv_id': arxiv_id, 'authors': authors}
-                    ))
-                except Exception as e:
-                    logger.error(f"处理arXiv条目失败: {e}")
-                    continue
-
-            return results[:self.config.max_paper_results]
+            title, summary = entry['title'], entry['summary']
+            text_score = self.relevance_engine.score_texts(query, [(title, summary)])[0]
+            boost = self._arxiv_relevance_boost(title, query)
+            return SearchResult(
+                title=title,
+                url=f"https://arxiv.org/abs/{entry['arxiv_id']}",
+                description=summary[:300] + "..." if len(summary) > 300 else summary,
+                source='arXiv',
+                relevance_score=min(text_score * self.TEXT_WEIGHTS['arXiv'] + boost, 10.0),
+                timestamp=datetime.fromisoformat(entry['published'].replace('Z', '+00:00')),
+                metadata={'arxiv_id': entry['arxiv_id'], 'authors': entry['authors'], 'relevance_boost': boost}
+            )
+        except Exception as e:
+            logger.error(f"处理arXiv条目失败: {e}")
+            return None
 
+    def _parse_arxiv_xml(self, xml_content: str, query: str) -> List[SearchResult]:
+        """解析完整的arXiv XML响应"""
+        try:
+            return [r for r in (self._arxiv_entry_to_result(entry, query)
+                                for entry in parse_arxiv_entries(xml_content)) if r]
         except Exception as e:
             logger.error(f"解析arXiv XML失败: {e}")
             return []
 
-    def _calculate_arxiv_relevance(self, title: str, summary: str, query: str) -> float:
-        """计算arXiv论文相关性分数"""
-        score = 0.0
-        query_lower = query.lower()
-
-        title_lower = title.lower()
-        if query_lower in title_lower:
-            score += 4.0
-
-        query_words = query_lower.split()
-        title_matches = sum(1 for word in query_words if word in title_lower)
-        score += title_matches * 2.0
-
-        summary_lower = summary.lower()
-        summary_matches = sum(1 for word in query_words if word in summary_lower)
-        score += summary_matches * 1.0
-
-        return min(score, 10.0)
+    def _arxiv_relevance_boost(self, title: str, query: str) -> float:
+        """arXiv论文加成：标题包含完整查询"""
+        return 4.0 if query.lower() in title.lower() else 0.0
 
     async def _search_tech_blogs(self, query: str) -> List[SearchResult]:
         """搜索技术博客"""
@@ -294,7 +637,7 @@ class LiteratureRetriever:
 推荐: 技术博客、在线教程、开源项目、技术会议
 格式: 标题、URL、描述、相关性(1-10)"""
 
-            response = self.research_agent.chat(prompt)
+            response = await self.research_agent.achat(prompt)
 
             return [SearchResult(
                 title="AI推荐的技术博客",
@@ -0,0 +1,145 @@
+"""
+检索结果缓存 - SearchCache
+将GitHub/arXiv的原始API响应持久化到磁盘，并保存ETag以便发送条件请求。
+get/set 是同步文件读写，异步调用方通过 asyncio.to_thread 调用，不阻塞事件循环。
+"""
+
+import os
+import json
+import time
+import uuid
+import hashlib
+import logging
+from typing import Any, Optional
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CacheEntry:
+    """缓存条目"""
+    payload: Any
+    stored_at: float
+    etag: Optional[str] = None
+
+    def is_fresh(self, ttl_seconds: float) -> bool:
+        return time.time() - self.stored_at < ttl_seconds
+
+class CacheWriter:
+    """流式写入列表型缓存条目：逐项写入临时文件，commit 时原子替换，内存占用与条目数无关
+
+    写入失败只记录警告并放弃本次缓存；未 commit 的写入由 abort 清理（commit 后调用 abort 无效果）。
+    """
+
+    def __init__(self, path: Path, etag: Optional[str] = None):
+        self.path = path
+        self.etag = etag
+        self.count = 0
+        self._tmp_path = path.with_suffix(f".{os.getpid()}.{id(self):x}.tmp")
+        self._file = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self._tmp_path, 'w', encoding='utf-8')
+            self._file.write('{"payload": [')
+        except OSError as e:
+            self._fail(e)
+
+    def add(self, item: Any):
+        if self._file is None:
+            return
+        try:
+            self._file.write((',' if self.count else '') + json.dumps(item, ensure_ascii=False))
+            self.count += 1
+        except OSError as e:
+            self._fail(e)
+
+    def extend(self, items):
+        for item in items:
+            self.add(item)
+
+    def commit(self):
+        if self._file is None:
+            return
+        try:
+            self._file.write(f'], "stored_at": {json.dumps(time.time())}, "etag": {json.dumps(self.etag)}}}')
+            self._file.close()
+            self._file = None
+            os.replace(self._tmp_path, self.path)
+        except OSError as e:
+            self._fail(e)
+
+    def abort(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._tmp_path.unlink(missing_ok=True)
+
+    def _fail(self, error: OSError):
+        logger.warning(f"写入检索缓存失败: {error}")
+        self.abort()
+        self._tmp_path.unlink(missing_ok=True)
+
+def normalize_query(query: str) -> str:
+    """规范化查询：小写并折叠空白"""
+    return " ".join(query.lower().split())
+
+def ttl_for_time_range(time_range_days: int) -> float:
+    """缓存有效期随检索时间窗口变化：窗口越长结果变化越慢（180天窗口对应12小时）"""
+    return max(time_range_days // 15, 1) * 3600.0
+
+class SearchCache:
+    """磁盘检索缓存 - 每个键一个JSON文件，写入采用临时文件后原子替换"""
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = Path(cache_dir or os.path.join(os.getenv('RESEARCH_CACHE_DIR', 'cache'), 'literature'))
+
+    @staticmethod
+    def make_key(source: str, query: str, **params) -> str:
+        """由来源、规范化查询和影响结果的配置生成缓存键"""
+        raw = json.dumps({'source': source, 'query': normalize_query(query), 'params': params},
+                         sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """读取缓存条目（不检查是否过期）"""
+        path = self._path(key)
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+            return CacheEntry(payload=data['payload'], stored_at=data['stored_at'], etag=data.get('etag'))
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError) as e:
+            logger.warning(f"缓存文件损坏，已忽略: {path} ({e})")
+            return None
+
+    def set(self, key: str, payload: Any, etag: Optional[str] = None):
+        """写入缓存条目"""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            # 同一进程内的多个线程可能同时写同一个键，临时文件名不能只用进程号
+            tmp_path = path.with_suffix(f".{os.getpid()}.{uuid.uuid4().hex}.tmp")
+            tmp_path.write_text(json.dumps({'payload': payload, 'stored_at': time.time(), 'etag': etag},
+                                           ensure_ascii=False), encoding='utf-8')
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"写入检索缓存失败: {e}")
+
+    def writer(self, key: str, etag: Optional[str] = None) -> CacheWriter:
+        """流式写入列表型缓存条目（读取方式与 set 写入的相同）"""
+        return CacheWriter(self._path(key), etag)
+
+    def touch(self, key: str, entry: CacheEntry):
+        """服务端确认未变化（304）时刷新缓存时间"""
+        self.set(key, entry.payload, entry.etag)
+
+    def clear(self):
+        """清空缓存"""
+        if self.cache_dir.exists():
+            for path in self.cache_dir.glob('*.json'):
+                path.unlink(missing_ok=True)
+            logger.info("检索缓存已清空")
@@ -0,0 +1,115 @@
+"""
+PDF写入器 - PDFDocument
+纯Python生成文本PDF：使用PDF阅读器内置的 STSong-Light 中文字体（Adobe-GB1，无需嵌入字体文件），
+按页宽自动换行、分页，页面内容流用 zlib 压缩。
+"""
+
+import zlib
+import logging
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = (595.0, 842.0)  # A4，单位pt
+MARGIN = 56.0
+
+class PDFDocument:
+    """逐行排版的文本PDF文档
+
+    add_text 追加文本（可多次调用），heading=True 的行使用较大字号；build 输出完整的PDF字节。
+    字符宽度按可打印ASCII半角、其余全角估算（与字体中1-95号CID的宽度声明一致）。
+    """
+
+    def __init__(self, title: str = "", font_size: float = 10.5, page_size: Tuple[float, float] = PAGE_SIZE,
+                 margin: float = MARGIN):
+        self.title = title
+        self.font_size = font_size
+        self.page_width, self.page_height = page_size
+        self.margin = margin
+        self._lines: List[Tuple[str, float]] = []
+
+    def add_text(self, text: str, heading: bool = False):
+        size = self.font_size * 1.4 if heading else self.font_size
+        for line in text.expandtabs(4).splitlines() or [""]:
+            self._lines.extend((part, size) for part in self._wrap(line, size))
+
+    def _wrap(self, line: str, size: float) -> List[str]:
+        limit = (self.page_width - 2 * self.margin) / size
+        parts, start, width = [], 0, 0.0
+        for i, ch in enumerate(line):
+            advance = char_width(ch)
+            if width + advance > limit and i > start:
+                parts.append(line[start:i])
+                start, width = i, 0.0
+            width += advance
+        parts.append(line[start:])
+        return parts
+
+    def _pages(self) -> List[List[Tuple[str, float]]]:
+        pages, current, used = [], [], 0.0
+        height = self.page_height - 2 * self.margin
+        for text, size in self._lines:
+            leading = size * 1.45
+            if current and used + leading > height:
+                pages.append(current)
+                current, used = [], 0.0
+            current.append((text, size))
+            used += leading
+        pages.append(current)
+        return pages
+
+    def _content_stream(self, lines: List[Tuple[str, float]]) -> bytes:
+        ops = ["BT", f"{self.margin:.2f} {self.page_height - self.margin:.2f} Td"]
+        for text, size in lines:
+            ops.append(f"/F1 {size:.2f} Tf 0 {-size * 1.45:.2f} Td {encode_text(text)} Tj")
+        ops.append("ET")
+        return "\n".join(ops).encode('ascii')
+
+    def build(self) -> bytes:
+        """输出PDF文件内容"""
+        pages = self._pages()
+        # 对象编号: 1 Catalog, 2 Pages, 3 Type0字体, 4 CID字体, 5 字体描述, 6 Info, 之后每页 [Page, 内容流]
+        first_page = 7
+        page_ids = [first_page + 2 * i for i in range(len(pages))]
+        objects = {
+            1: b"<< /Type /Catalog /Pages 2 0 R >>",
+            2: f"<< /Type /Pages /Kids [{' '.join(f'{pid} 0 R' for pid in page_ids)}] /Count {len(pages)} >>".encode('ascii'),
+            3: b"<< /Type /Font /Subtype /Type0 /BaseFont /STSong-Light /Encoding /UniGB-UCS2-H "
+               b"/DescendantFonts [4 0 R] >>",
+            4: b"<< /Type /Font /Subtype /CIDFontType0 /BaseFont /STSong-Light "
+               b"/CIDSystemInfo << /Registry (Adobe) /Ordering (GB1) /Supplement 2 >> "
+               b"/FontDescriptor 5 0 R /DW 1000 /W [1 95 500] >>",
+            5: b"<< /Type /FontDescriptor /FontName /STSong-Light /Flags 6 /FontBBox [-25 -254 1000 880] "
+               b"/ItalicAngle 0 /Ascent 880 /Descent -120 /CapHeight 880 /StemV 93 >>",
+            6: f"<< /Title {encode_text(self.title, bom=True)} /Producer (Research Agent) >>".encode('ascii'),
+        }
+        for pid, lines in zip(page_ids, pages):
+            stream = zlib.compress(self._content_stream(lines))
+            objects[pid] = (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {self.page_width:g} {self.page_height:g}] "
+                            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {pid + 1} 0 R >>").encode('ascii')
+            objects[pid + 1] = (f"<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n".encode('ascii')
+                                + stream + b"\nendstream")
+
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = {}
+        for number in sorted(objects):
+            offsets[number] = len(out)
+            out += f"{number} 0 obj\n".encode('ascii') + objects[number] + b"\nendobj\n"
+
+        xref = len(out)
+        size = max(objects) + 1
+        out += f"xref\n0 {size}\n0000000000 65535 f \n".encode('ascii')
+        for number in range(1, size):
+            out += f"{offsets[number]:010d} 00000 n \n".encode('ascii')
+        out += f"trailer\n<< /Size {size} /Root 1 0 R /Info 6 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode('ascii')
+        return bytes(out)
+
+def char_width(ch: str) -> float:
+    """字符宽度（以字号为单位）"""
+    return 0.5 if 0x20 <= ord(ch) <= 0x7E else 1.0
+
+def encode_text(text: str, bom: bool = False) -> str:
+    """编码为UCS-2（UTF-16BE，仅基本多文种平面）十六进制字符串，平面外字符替换为问号"""
+    text = "".join(ch if ord(ch) <= 0xFFFF else "?" for ch in text)
+    data = text.encode('utf-16-be')
+    return f"<{'feff' if bom else ''}{data.hex()}>"
@@ -7,9 +7,14 @@ import os
 import asyncio
 import logging
 from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from collections import defaultdict
+
+import numpy as np
+
+from .stage_executor import ProcessSafeModule, StageExecutor
+from .relevance import RelevanceEngine, text_relevance
+from .content_validator import ContentValidator
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +27,12 @@ class QualityConfig:
     enable_content_validation: bool = True
     enable_consistency_check: bool = True
     enable_bias_detection: bool = True
+    max_validated_sources: int = 50  # 内容验证/倾向性检测只检查相关性最高的若干来源
+    validation_batch_size: int = 20  # 每次LLM调用验证的来源数
+    # 增量评分提前停止检索的阈值：这些维度全部达到后停止翻页
+    early_stop_thresholds: Dict[str, float] = field(default_factory=lambda: {
+        'completeness': 8.0, 'freshness': 7.0, 'relevance': 7.0
+    })
 
 @dataclass
 class QualityScore:
@@ -31,13 +42,171 @@ class QualityScore:
     issues: List[str]
     recommendations: List[str]
     confidence: float
+    validation: Dict[str, Any] = field(default_factory=dict)  # LLM内容验证与倾向性检测汇总
+
+SOURCE_KEYS = ('github_results', 'paper_results', 'blog_results')
+SOURCE_OF = {'GitHub': 0, 'arXiv': 1}  # 其余来源归入 blog_results
+FRESHNESS_BUCKETS = ((7, 1.0), (30, 0.8), (90, 0.6), (180, 0.4))  # (最大天数, 时效分)
+STALE_FRESHNESS = 0.2
+
+def freshness_weights(days_old: np.ndarray) -> np.ndarray:
+    """按距今天数分档的时效分"""
+    return np.select([days_old <= days for days, _ in FRESHNESS_BUCKETS],
+                     [weight for _, weight in FRESHNESS_BUCKETS], STALE_FRESHNESS)
 
-class QualityChecker:
+def freshness_weight(days_old: float) -> float:
+    return next((weight for days, weight in FRESHNESS_BUCKETS if days_old <= days), STALE_FRESHNESS)
+
+@dataclass
+class LiteratureStats:
+    """质量评分所用的汇总量 - 列式视图一次算出，增量评分逐条累加"""
+    source_counts: List[int] = field(default_factory=lambda: [0] * len(SOURCE_KEYS))
+    starred_github: int = 0  # 星标超过100的GitHub结果数
+    relevance_sum: float = 0.0
+    freshness_sum: float = 0.0
+    dated: int = 0  # 带时间戳的条目数
+
+    @property
+    def total(self) -> int:
+        return sum(self.source_counts)
+
+    @property
+    def source_count(self) -> int:
+        return sum(1 for count in self.source_counts if count)
+
+@dataclass
+class LiteratureView:
+    """检索结果的列式视图 - 所有结果只遍历一次，各质量维度在数组上向量化计算"""
+    source_codes: np.ndarray  # SOURCE_KEYS 中的下标
+    timestamps: np.ndarray  # POSIX秒，缺失为 NaN
+    stars: np.ndarray
+    relevance: np.ndarray  # BM25文本相关性 0-1
+
+    @classmethod
+    def build(cls, literature: Any, query: str, engine: RelevanceEngine) -> 'LiteratureView':
+        codes, timestamps, stars, pairs = [], [], [], []
+        if isinstance(literature, dict):
+            for code, key in enumerate(SOURCE_KEYS):
+                for item in literature.get(key, []):
+                    codes.append(code)
+                    timestamp = getattr(item, 'timestamp', None)
+                    timestamps.append(timestamp.timestamp() if isinstance(timestamp, datetime) else np.nan)
+                    metadata = getattr(item, 'metadata', None)
+                    stars.append(metadata.get('stars', 0) or 0 if isinstance(metadata, dict) else 0)
+                    pairs.append((getattr(item, 'title', '') or '', getattr(item, 'description', '') or ''))
+
+        return cls(
+            source_codes=np.asarray(codes, dtype=np.int8),
+            timestamps=np.asarray(timestamps, dtype=float),
+            stars=np.asarray(stars, dtype=float),
+            relevance=np.asarray(engine.score_texts(query, pairs) if query else [0.0] * len(pairs), dtype=float)
+        )
+
+    def stats(self) -> LiteratureStats:
+        github = self.source_codes == SOURCE_OF['GitHub']
+        timestamps = self.timestamps[~np.isnan(self.timestamps)]
+        days_old = np.floor((datetime.now().timestamp() - timestamps) / 86400)
+        return LiteratureStats(
+            source_counts=np.bincount(self.source_codes, minlength=len(SOURCE_KEYS)).tolist(),
+            starred_github=int((self.stars[github] > 100).sum()),
+            relevance_sum=float(self.relevance.sum()),
+            freshness_sum=float(freshness_weights(days_old).sum()),
+            dated=len(timestamps)
+        )
+
+class IncrementalQualityScorer:
+    """增量质量评分 - 每条检索结果或数据记录O(1)更新汇总量，可随时取当前分数
+
+    相关性与 QualityChecker.check 一样使用整批BM25（需要整批文档的词频统计）：逐条只保存分词结果，
+    取分数时重新计算；提前停止检查先看其余维度，都达标后才计算相关性，
+    未达标时等结果数增长 RELEVANCE_RECHECK_GROWTH 倍后再算，总代价与结果数成线性。
+    数据记录的时间戳计入时效性。
+    """
+
+    RELEVANCE_RECHECK_GROWTH = 1.25
+
+    def __init__(self, checker: 'QualityChecker', query: str, thresholds: Optional[Dict[str, float]] = None):
+        self.checker = checker
+        self.query = query.lower()
+        self.thresholds = thresholds if thresholds is not None else checker.config.early_stop_thresholds
+        self.stats = LiteratureStats()
+        self.records = 0
+        self._documents: List[List[str]] = []
+        self._scored_documents = 0
+        self._next_relevance_check = 0
+
+    def add_result(self, result) -> 'IncrementalQualityScorer':
+        """加入一条检索结果"""
+        code = SOURCE_OF.get(getattr(result, 'source', None), len(SOURCE_KEYS) - 1)
+        self.stats.source_counts[code] += 1
+        metadata = getattr(result, 'metadata', None)
+        if code == SOURCE_OF['GitHub'] and isinstance(metadata, dict) and (metadata.get('stars', 0) or 0) > 100:
+            self.stats.starred_github += 1
+        if self.query:
+            self._documents.append(self.checker.relevance_engine.document_tokens(
+                getattr(result, 'title', '') or '', getattr(result, 'description', '') or ''))
+        self._add_timestamp(getattr(result, 'timestamp', None))
+        return self
+
+    def add_record(self, record: Dict[str, Any]) -> 'IncrementalQualityScorer':
+        """加入一条数据记录（DataProcessor 记录结构）"""
+        self.records += 1
+        timestamp = record.get('timestamp')
+        if isinstance(timestamp, str):
+            try:
+                timestamp = datetime.fromisoformat(timestamp)
+            except ValueError:
+                timestamp = None
+        self._add_timestamp(timestamp)
+        return self
+
+    def _add_timestamp(self, timestamp):
+        if isinstance(timestamp, datetime):
+            if timestamp.tzinfo is not None:
+                timestamp = timestamp.astimezone().replace(tzinfo=None)
+            self.stats.freshness_sum += freshness_weight((datetime.now() - timestamp).days)
+            self.stats.dated += 1
+
+    def _refresh_relevance(self):
+        if self._scored_documents != len(self._documents):
+            self.stats.relevance_sum = float(sum(self.checker.relevance_engine.score(self.query, self._documents)))
+            self._scored_documents = len(self._documents)
+
+    def dimension_scores(self) -> Dict[str, float]:
+        self._refresh_relevance()
+        return self.checker._assess_dimensions(self.stats, {'query': self.query})
+
+    def current_score(self) -> QualityScore:
+        """当前分数（与 QualityChecker.check 的结果结构相同）"""
+        self._refresh_relevance()
+        return self.checker._score(self.stats, {'query': self.query})
+
+    def thresholds_met(self) -> bool:
+        # 相关性可能尚未按最新结果重算，先只检查其余维度
+        scores = self.checker._assess_dimensions(self.stats, {'query': self.query})
+        if not all(scores.get(dimension, 0.0) >= threshold
+                   for dimension, threshold in self.thresholds.items() if dimension != 'relevance'):
+            return False
+        if 'relevance' in self.thresholds:
+            if len(self._documents) < self._next_relevance_check:
+                return False
+            self._next_relevance_check = int(len(self._documents) * self.RELEVANCE_RECHECK_GROWTH) + 1
+            scores = self.dimension_scores()
+        return all(scores.get(dimension, 0.0) >= threshold for dimension, threshold in self.thresholds.items())
+
+    def update_and_check(self, result) -> bool:
+        """加入一条检索结果并返回是否可以停止检索（可直接作为检索的 stop_when 回调）"""
+        return self.add_result(result).thresholds_met()
+
+class QualityChecker(ProcessSafeModule):
     """质量检查器 - 评估研究数据的可靠性和完整性"""
 
-    def __init__(self, research_agent):
+    def __init__(self, research_agent, executor: Optional[StageExecutor] = None):
         self.research_agent = research_agent
+        self.executor = executor or StageExecutor()
         self.config = QualityConfig()
+        self.relevance_engine = RelevanceEngine()
+        self.validator = ContentValidator(research_agent, batch_size=self.config.validation_batch_size)
 
         # 质量维度权重
         self.dimension_weights = {
@@ -51,34 +220,30 @@ class QualityChecker:
         self.check_history = []
         logger.info("QualityChecker 初始化完成")
 
+    def __getstate__(self):
+        # LLM验证在主进程完成，子进程只做纯计算
+        state = super().__getstate__()
+        state['validator'] = None
+        return state
+
     async def check(self, research_data: Dict[str, Any]) -> QualityScore:
         """执行全面的质量检查"""
         try:
             logger.info("开始执行质量检查")
 
-            # 执行各项检查
-            dimension_scores = self._assess_dimensions(research_data)
-            issues = self._identify_issues(research_data, dimension_scores)
-            recommendations = self._generate_recommendations(issues, dimension_scores)
-            overall_score = self._calculate_overall_score(dimension_scores)
-            confidence = self._calculate_confidence(research_data, overall_score)
-
-            quality_score = QualityScore(
-                overall_score=overall_score,
-                dimension_scores=dimension_scores,
-                issues=issues,
-                recommendations=recommendations,
-                confidence=confidence
-            )
+            validation = await self._validate_sources(research_data)
+
+            # 各维度评估为CPU密集步骤，交给阶段执行器
+            quality_score = await self.executor.run(self._evaluate, research_data, validation)
 
             self.check_history.append({
                 'timestamp': datetime.now(),
-                'overall_score': overall_score,
-                'issues_count': len(issues),
-                'confidence': confidence
+                'overall_score': quality_score.overall_score,
+                'issues_count': len(quality_score.issues),
+                'confidence': quality_score.confidence
             })
 
-            logger.info(f"质量检查完成 - 总分: {overall_score:.2f}, 置信度: {confidence:.2f}")
+            logger.info(f"质量检查完成 - 总分: {quality_score.overall_score:.2f}, 置信度: {quality_score.confidence:.2f}")
             return quality_score
 
         except Exception as e:
@@ -88,35 +253,106 @@ class QualityChecker:
                 recommendations=["请检查数据格式和完整性"], confidence=0.0
             )
 
-    def _assess_dimensions(self, research_data: Dict[str, Any]) -> Dict[str, float]:
+    async def _validate_sources(self, research_data: Dict[str, Any]) -> Dict[str, Any]:
+        """LLM内容验证与倾向性检测（按配置启用），返回汇总"""
+        checks = [name for name, enabled in (('content', self.config.enable_content_validation),
+                                             ('bias', self.config.enable_bias_detection)) if enabled]
+        literature = research_data.get('literature', {})
+        if not checks or self.validator is None or not isinstance(literature, dict):
+            return {}
+
+        items = [item for key in SOURCE_KEYS for item in literature.get(key, []) if hasattr(item, 'url')]
+        items.sort(key=lambda x: getattr(x, 'relevance_score', 0.0), reverse=True)
+        items = items[:self.config.max_validated_sources]
+        if not items:
+            return {}
+
+        llm_calls = self.validator.llm_calls
+        verdicts = await self.validator.validate(items, checks, research_data.get('query', ''))
+        content_judged = [v for v in verdicts if v.valid is not None]
+        bias_judged = [v for v in verdicts if v.bias is not None]
+
+        return {
+            'checks': checks,
+            'checked': len(items),
+            'cached': sum(1 for v in verdicts if v.cached),
+            'llm_calls': self.validator.llm_calls - llm_calls,
+            'validated': len(content_judged),
+            'invalid': sum(1 for v in content_judged if not v.valid),
+            'bias_judged': len(bias_judged),
+            'biased': sum(1 for v in bias_judged if v.bias in ('medium', 'high')),
+            'flagged': [{'url': item.url, 'valid': v.valid, 'bias': v.bias, 'note': v.note}
+                        for item, v in zip(items, verdicts) if v.valid is False or v.bias in ('medium', 'high')]
+        }
+
+    def _evaluate(self, research_data: Dict[str, Any], validation: Optional[Dict[str, Any]] = None) -> QualityScore:
+        """执行各项检查（纯计算，可在子进程中执行）"""
+        view = LiteratureView.build(research_data.get('literature', {}),
+                                    research_data.get('query', '').lower(), self.relevance_engine)
+        return self._score(view.stats(), research_data, validation)
+
+    def incremental(self, query: str, thresholds: Optional[Dict[str, float]] = None) -> IncrementalQualityScorer:
+        """创建随检索结果到达而更新的增量评分器"""
+        return IncrementalQualityScorer(self, query, thresholds)
+
+    def _score(self, stats: LiteratureStats, research_data: Dict[str, Any],
+               validation: Optional[Dict[str, Any]] = None) -> QualityScore:
+        dimension_scores = self._assess_dimensions(stats, research_data)
+        validation_issues = self._apply_validation(dimension_scores, validation or {})
+        issues = self._identify_issues(stats, research_data, dimension_scores) + validation_issues
+        recommendations = self._generate_recommendations(issues, dimension_scores)
+        overall_score = self._calculate_overall_score(dimension_scores)
+        confidence = self._calculate_confidence(stats, overall_score)
+
+        return QualityScore(
+            overall_score=overall_score,
+            dimension_scores=dimension_scores,
+            issues=issues,
+            recommendations=recommendations,
+            confidence=confidence,
+            validation=validation or {}
+        )
+
+    def _apply_validation(self, dimension_scores: Dict[str, float], validation: Dict[str, Any]) -> List[str]:
+        """按验证结论下调可靠性（未通过验证）和一致性（倾向性来源），返回发现的问题"""
+        issues = []
+        if validation.get('validated'):
+            invalid_share = validation['invalid'] / validation['validated']
+            dimension_scores['reliability'] = max(dimension_scores['reliability'] - invalid_share * 3.0, 0.0)
+            if validation['invalid']:
+                issues.append(f"{validation['invalid']}条来源未通过内容验证")
+        if validation.get('bias_judged'):
+            biased_share = validation['biased'] / validation['bias_judged']
+            dimension_scores['consistency'] = max(dimension_scores['consistency'] - biased_share * 3.0, 0.0)
+            if validation['biased']:
+                issues.append(f"{validation['biased']}条来源存在明显倾向性")
+        return issues
+
+    def _assess_dimensions(self, stats: LiteratureStats, research_data: Dict[str, Any]) -> Dict[str, float]:
         """多维度质量评估"""
         return {
-            'completeness': self._assess_completeness(research_data),
-            'reliability': self._assess_reliability(research_data),
-            'relevance': self._assess_relevance(research_data),
-            'freshness': self._assess_freshness(research_data),
-            'consistency': self._assess_consistency(research_data)
+            'completeness': self._assess_completeness(stats, research_data),
+            'reliability': self._assess_reliability(stats, research_data),
+            'relevance': self._assess_relevance(stats, research_data),
+            'freshness': self._assess_freshness(stats),
+            'consistency': self._assess_consistency(stats, research_data)
         }
 
-    def _assess_completeness(self, research_data: Dict[str, Any]) -> float:
+    def _assess_completeness(self, stats: LiteratureStats, research_data: Dict[str, Any]) -> float:
         """评估数据完整性"""
         score = 5.0
-        literature = research_data.get('literature', {})
 
-        if isinstance(literature, dict):
-            source_count = sum(1 for k in ['github_results', 'paper_results', 'blog_results'] if literature.get(k))
-            if source_count >= 3:
-                score += 2.0
-            elif source_count >= 2:
-                score += 1.0
-
-            total_results = sum(len(literature.get(k, [])) for k in ['github_results', 'paper_results', 'blog_results'])
-            if total_results >= 20:
-                score += 2.0
-            elif total_results >= 10:
-                score += 1.0
-            elif total_results >= 5:
-                score += 0.5
+        if stats.source_count >= 3:
+            score += 2.0
+        elif stats.source_count >= 2:
+            score += 1.0
+
+        if stats.total >= 20:
+            score += 2.0
+        elif stats.total >= 10:
+            score += 1.0
+        elif stats.total >= 5:
+            score += 0.5
 
         analysis = research_data.get('analysis', {})
         if isinstance(analysis, dict):
@@ -127,21 +363,17 @@ class QualityChecker:
 
         return min(max(score, 0.0), 10.0)
 
-    def _assess_reliability(self, research_data: Dict[str, Any]) -> float:
+    def _assess_reliability(self, stats: LiteratureStats, research_data: Dict[str, Any]) -> float:
         """评估数据可靠性"""
         score = 5.0
-        literature = research_data.get('literature', {})
 
-        if isinstance(literature, dict):
-            github_results = literature.get('github_results', [])
-            if github_results:
-                high_quality = sum(1 for r in github_results if hasattr(r, 'metadata') and r.metadata.get('stars', 0) > 100)
-                if github_results:
-                    score += (high_quality / len(github_results)) * 2.0
+        github_count = stats.source_counts[SOURCE_OF['GitHub']]
+        if github_count:
+            score += stats.starred_github / github_count * 2.0
 
-            paper_results = literature.get('paper_results', [])
-            if paper_results:
-                score += min(len(paper_results) * 0.5, 2.0)
+        paper_count = stats.source_counts[SOURCE_OF['arXiv']]
+        if paper_count:
+            score += min(paper_count * 0.5, 2.0)
 
         provider = research_data.get('metadata', {}).get('provider', '').lower()
         if provider in ['claude', 'openai', 'anthropic']:
@@ -151,26 +383,15 @@ class QualityChecker:
 
         return min(max(score, 0.0), 10.0)
 
-    def _assess_relevance(self, research_data: Dict[str, Any]) -> float:
+    def _assess_relevance(self, stats: LiteratureStats, research_data: Dict[str, Any]) -> float:
         """评估数据相关性"""
         score = 5.0
         query = research_data.get('query', '').lower()
         if not query:
             return 0.0
 
-        literature = research_data.get('literature', {})
-        if isinstance(literature, dict):
-            relevance_scores = []
-
-            for result_type in ['github_results', 'paper_results', 'blog_results']:
-                for item in literature.get(result_type, []):
-                    if hasattr(item, 'title') and hasattr(item, 'description'):
-                        text = f"{item.title} {item.description}".lower()
-                        relevance = self._calculate_text_relevance(query, text)
-                        relevance_scores.append(relevance)
-
-            if relevance_scores:
-                score += (sum(relevance_scores) / len(relevance_scores)) * 3.0
+        if stats.total:
+            score += stats.relevance_sum / stats.total * 3.0
 
         analysis = research_data.get('analysis', {})
         if isinstance(analysis, dict):
@@ -180,50 +401,23 @@ class QualityChecker:
 
         return min(max(score, 0.0), 10.0)
 
-    def _assess_freshness(self, research_data: Dict[str, Any]) -> float:
+    def _assess_freshness(self, stats: LiteratureStats) -> float:
         """评估数据时效性"""
         score = 5.0
-        literature = research_data.get('literature', {})
 
-        if isinstance(literature, dict):
-            timestamps = []
-            for result_type in ['github_results', 'paper_results', 'blog_results']:
-                for item in literature.get(result_type, []):
-                    if hasattr(item, 'timestamp') and isinstance(item.timestamp, datetime):
-                        timestamps.append(item.timestamp)
-
-            if timestamps:
-                now = datetime.now()
-                freshness_scores = []
-                for ts in timestamps:
-                    days_old = (now - ts).days
-                    if days_old <= 7:
-                        freshness_scores.append(1.0)
-                    elif days_old <= 30:
-                        freshness_scores.append(0.8)
-                    elif days_old <= 90:
-                        freshness_scores.append(0.6)
-                    elif days_old <= 180:
-                        freshness_scores.append(0.4)
-                    else:
-                        freshness_scores.append(0.2)
-
-                if freshness_scores:
-                    score += (sum(freshness_scores) / len(freshness_scores)) * 3.0
+        if stats.dated:
+            score += stats.freshness_sum / stats.dated * 3.0
 
         return min(max(score, 0.0), 10.0)
 
-    def _assess_consistency(self, research_data: Dict[str, Any]) -> float:
+    def _assess_consistency(self, stats: LiteratureStats, research_data: Dict[str, Any]) -> float:
         """评估数据一致性"""
         score = 7.0
 
-        literature = research_data.get('literature', {})
-        if isinstance(literature, dict):
-            sources = [k for k in ['github_results', 'paper_results', 'blog_results'] if literature.get(k)]
-            if len(sources) >= 3:
-                score += 1.0
-            elif len(sources) >= 2:
-                score += 0.5
+        if stats.source_count >= 3:
+            score += 1.0
+        elif stats.source_count >= 2:
+            score += 0.5
 
         analysis = research_data.get('analysis', {})
         if isinstance(analysis, dict) and analysis.get('analysis_report'):
@@ -233,19 +427,10 @@ class QualityChecker:
 
     def _calculate_text_relevance(self, query: str, text: str) -> float:
         """计算文本相关性"""
-        query_words = set(query.split())
-        text_words = set(text.split())
-
-        if not query_words:
-            return 0.0
-
-        intersection = query_words.intersection(text_words)
-        overlap_ratio = len(intersection) / len(query_words)
-        length_factor = min(len(text) / 1000, 1.0)
-
-        return min(overlap_ratio * (1 + length_factor), 1.0)
+        return text_relevance(query, text)
 
-    def _identify_issues(self, research_data: Dict[str, Any], dimension_scores: Dict[str, float]) -> List[str]:
+    def _identify_issues(self, stats: LiteratureStats, research_data: Dict[str, Any],
+                         dimension_scores: Dict[str, float]) -> List[str]:
         """识别质量问题"""
         issues = []
 
@@ -262,11 +447,8 @@ class QualityChecker:
                 issues.append(dimension_names.get(dimension, f"{dimension}分数较低"))
 
         # 检查数据源数量
-        literature = research_data.get('literature', {})
-        if isinstance(literature, dict):
-            total_sources = sum(len(literature.get(k, [])) for k in ['github_results', 'paper_results', 'blog_results'])
-            if total_sources < self.config.min_sources_required:
-                issues.append(f"数据源数量不足，至少需要{self.config.min_sources_required}个来源")
+        if stats.total < self.config.min_sources_required:
+            issues.append(f"数据源数量不足，至少需要{self.config.min_sources_required}个来源")
 
         # 检查分析深度
         analysis = research_data.get('analysis', {})
@@ -286,7 +468,9 @@ class QualityChecker:
             "数据不完整": ["扩展数据收集范围", "补充关键指标", "完善元数据"],
             "可靠性较低": ["选择同行评议论文", "增加企业报告", "验证项目影响力"],
             "相关性不够强": ["优化搜索关键词", "使用专业数据库", "增加专家推荐"],
-            "时效性较差": ["收集最近6个月数据", "设置时间过滤器", "关注最新动态"]
+            "时效性较差": ["收集最近6个月数据", "设置时间过滤器", "关注最新动态"],
+            "未通过内容验证": ["剔除未通过验证的来源", "补充一手资料"],
+            "倾向性": ["交叉验证不同立场的来源", "优先选择中立评测"]
         }
 
         for issue in issues:
@@ -317,20 +501,16 @@ class QualityChecker:
 
         return min(max(weighted_sum, 0.0), 10.0)
 
-    def _calculate_confidence(self, research_data: Dict[str, Any], overall_score: float) -> float:
+    def _calculate_confidence(self, stats: LiteratureStats, overall_score: float) -> float:
         """计算评估置信度"""
         confidence = 0.5
 
-        literature = research_data.get('literature', {})
-        if isinstance(literature, dict):
-            total_sources = sum(len(literature.get(k, [])) for k in ['github_results', 'paper_results', 'blog_results'])
-
-            if total_sources >= 20:
-                confidence += 0.3
-            elif total_sources >= 10:
-                confidence += 0.2
-            elif total_sources >= 5:
-                confidence += 0.1
+        if stats.total >= 20:
+            confidence += 0.3
+        elif stats.total >= 10:
+            confidence += 0.2
+        elif stats.total >= 5:
+            confidence += 0.1
 
         if overall_score >= 8.0:
             confidence += 0.1
@@ -352,6 +532,11 @@ class QualityChecker:
             display_name = dimension_names.get(dimension, dimension)
             summary += f"- **{display_name}**: {score:.2f}/10.0\n"
 
+        validation = quality_score.validation
+        if validation:
+            summary += f"\n**内容验证**: 检查 {validation['checked']} 个来源，未通过 {validation['invalid']} 个，"
+            summary += f"明显倾向性 {validation['biased']} 个\n"
+
         if quality_score.issues:
             summary += "\n### 发现的问题\n\n"
             for issue in quality_score.issues:
@@ -0,0 +1,194 @@
+"""
+流式记录聚合 - RecordAggregator
+按数据块更新的单遍在线统计（计数、Welford均值/方差、蓄水池抽样、日/周分桶），
+除去重用的记录哈希外，内存占用与记录总数无关。
+"""
+
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+class RunningStats:
+    """Welford 在线均值/方差，按块合并时使用 Chan 并行公式"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def add_many(self, values: np.ndarray):
+        if len(values) == 0:
+            return
+        n_b, mean_b = len(values), float(values.mean())
+        m2_b = float(((values - mean_b) ** 2).sum())
+        total = self.count + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / total
+        self.m2 += m2_b + delta ** 2 * self.count * n_b / total
+        self.count = total
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return self.variance ** 0.5
+
+class Reservoir:
+    """蓄水池抽样（Algorithm R），保留k个均匀样本"""
+
+    def __init__(self, k: int = 20, seed: Optional[int] = None):
+        self.k = k
+        self.seen = 0
+        self.items: List[Any] = []
+        self._rng = np.random.default_rng(seed)
+
+    def add_many(self, count: int, get_item: Callable[[int], Any]):
+        """提供一批 count 个元素；只对被选入样本的元素调用 get_item(批内序号)"""
+        if count <= 0:
+            return
+        fill = min(max(self.k - len(self.items), 0), count)
+        self.items.extend(get_item(i) for i in range(fill))
+        if count > fill:
+            # 全局序号为 j 的元素以 k/(j+1) 的概率替换随机位置
+            slots = self._rng.integers(0, np.arange(self.seen + fill, self.seen + count) + 1)
+            for offset in np.flatnonzero(slots < self.k):
+                self.items[slots[offset]] = get_item(fill + int(offset))
+        self.seen += count
+
+async def achunks(records: AsyncIterator[Dict[str, Any]], size: int) -> AsyncIterator[List[Dict[str, Any]]]:
+    """把记录流切分为数据块"""
+    chunk = []
+    async for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def chunks(records: Iterable[Dict[str, Any]], size: int) -> Iterable[List[Dict[str, Any]]]:
+    """同步版本的分块"""
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+class RecordAggregator:
+    """记录流聚合器 - 对已清洗、评分的数据块去重后更新在线统计
+
+    状态大小只取决于来源/类型数、时间跨度（天）和指标数；
+    去重需要记住已见记录，只保存每条记录键的64位哈希。
+    """
+
+    def __init__(self, sample_size: int = 20, seed: Optional[int] = None):
+        self.total = 0
+        self.duplicates = 0
+        self.sources: Counter = Counter()
+        self.types: Counter = Counter()
+        self.quality = RunningStats()
+        self.quality_bins = {'high': 0, 'medium': 0, 'low': 0}
+        self.with_metrics = 0
+        self.earliest: Optional[pd.Timestamp] = None
+        self.latest: Optional[pd.Timestamp] = None
+        self.daily: Counter = Counter()  # 日序号 -> 记录数
+        self.weekly_metrics: Dict[Tuple[str, int], List[float]] = {}  # (指标, 周序号) -> [和, 数量]
+        self.samples = Reservoir(sample_size, seed)
+        self._seen_keys = set()
+
+    def update(self, frame: pd.DataFrame, metrics: pd.DataFrame):
+        """合并一个数据块
+
+        Args:
+            frame: 每条记录一行，需包含 key、source、type、timestamp、quality_score、metric_count 列
+            metrics: 数值指标长表（record_index 对应 frame 的行号）
+        """
+        keys = frame['key'].to_numpy()
+        keep = ~pd.Series(keys).duplicated().to_numpy()
+        keep &= np.fromiter((key not in self._seen_keys for key in keys.tolist()), dtype=bool, count=len(keys))
+        self._seen_keys.update(keys[keep].tolist())
+        self.duplicates += int(len(keys) - keep.sum())
+        if not keep.any():
+            return
+
+        metrics = metrics[keep[metrics['record_index'].to_numpy()]] if len(metrics) else metrics
+        frame = frame[keep]
+        self.total += len(frame)
+
+        self.sources.update(frame['source'].value_counts(sort=False).to_dict())
+        self.types.update(frame['type'].fillna('unknown').value_counts(sort=False).to_dict())
+
+        quality = frame['quality_score'].to_numpy(dtype=float)
+        self.quality.add_many(quality)
+        self.quality_bins['high'] += int((quality >= 8).sum())
+        self.quality_bins['low'] += int((quality < 5).sum())
+        self.quality_bins['medium'] = self.quality.count - self.quality_bins['high'] - self.quality_bins['low']
+        self.with_metrics += int((frame['metric_count'] > 0).sum())
+
+        timestamps = frame['timestamp']
+        chunk_min, chunk_max = timestamps.min(), timestamps.max()
+        self.earliest = chunk_min if self.earliest is None else min(self.earliest, chunk_min)
+        self.latest = chunk_max if self.latest is None else max(self.latest, chunk_max)
+
+        days = (timestamps.to_numpy(dtype='datetime64[D]').astype(np.int64))
+        unique_days, day_counts = np.unique(days, return_counts=True)
+        self.daily.update(dict(zip(unique_days.tolist(), day_counts.tolist())))
+
+        if len(metrics):
+            day_of_row = pd.Series(days, index=frame.index)
+            weeks = day_of_row.loc[metrics['record_index'].to_numpy()].to_numpy() // 7
+            grouped = metrics.assign(week=weeks).groupby(['metric', 'week'])['value'].agg(['sum', 'count'])
+            for (name, week), (total, count) in zip(grouped.index, grouped.to_numpy()):
+                bucket = self.weekly_metrics.setdefault((name, int(week)), [0.0, 0])
+                bucket[0] += float(total)
+                bucket[1] += int(count)
+
+        self.samples.add_many(len(frame), lambda i: self._sample(frame.iloc[i]))
+
+    @staticmethod
+    def _sample(row: pd.Series) -> Dict[str, Any]:
+        return {'source': row['source'], 'type': row['type'], 'content': str(row['content'])[:200],
+                'timestamp': row['timestamp'].isoformat(), 'quality_score': float(row['quality_score'])}
+
+    @property
+    def span_days(self) -> int:
+        return int((self.latest - self.earliest).days) if self.total else 0
+
+    def daily_counts(self) -> np.ndarray:
+        """从最早到最晚日期的逐日记录数（包含没有数据的日期）"""
+        if not self.daily:
+            return np.zeros(0)
+        first, last = min(self.daily), max(self.daily)
+        counts = np.zeros(last - first + 1)
+        for day, count in self.daily.items():
+            counts[day - first] = count
+        return counts
+
+    def weekly_metric_means(self) -> Dict[str, np.ndarray]:
+        """各指标按周（时间顺序）的均值序列"""
+        series: Dict[str, List[Tuple[int, float]]] = {}
+        for (name, week), (total, count) in self.weekly_metrics.items():
+            series.setdefault(name, []).append((week, total / count))
+        return {name: np.array([mean for _, mean in sorted(values)]) for name, values in series.items()}
@@ -0,0 +1,88 @@
+"""
+模块注册表 - ModuleRegistry
+进程级注册表：功能模块在第一次用到时才导入（每个进程只导入一次），
+与代理无关的资源（阶段执行器工作池、调研记忆索引、报告存储）按参数共享，供所有 ResearchAgent 实例复用。
+"""
+
+import os
+import atexit
+import logging
+import importlib
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 模块名 -> (包内模块路径, 类名)；导入 data_processor 会引入 pandas，只在数据处理阶段用到时导入
+MODULES = {
+    'literature_retriever': ('literature_retriever.literature_retriever', 'LiteratureRetriever'),
+    'data_processor': ('data_processor', 'DataProcessor'),
+    'report_generator': ('report_generator', 'ReportGenerator'),
+    'quality_checker': ('quality_checker', 'QualityChecker'),
+    'memory': ('research_memory', 'ResearchMemory'),
+    'report_store': ('report_store', 'ReportStore'),
+}
+
+class ModuleRegistry:
+    """功能模块注册表
+
+    module_class 返回模块类（首次调用时导入）；shared 按键缓存与代理无关的共享实例。
+    功能模块本身持有代理引用和逐次调用的配置，仍由各代理按阶段构建。
+    """
+
+    def __init__(self):
+        self._classes: Dict[str, type] = {}
+        self._shared: Dict[Hashable, Any] = {}
+        self._lock = threading.RLock()
+
+    def module_class(self, name: str) -> type:
+        cls = self._classes.get(name)
+        if cls is not None:
+            return cls
+        if name not in MODULES:
+            raise KeyError(f"未注册的功能模块: {name}")
+        with self._lock:
+            if name not in self._classes:
+                module_path, class_name = MODULES[name]
+                module = importlib.import_module(f".{module_path}", __package__)
+                self._classes[name] = getattr(module, class_name)
+                logger.debug(f"功能模块已导入: {name}")
+            return self._classes[name]
+
+    def shared(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """取键对应的共享实例，不存在时由 factory 创建"""
+        with self._lock:
+            if key not in self._shared:
+                self._shared[key] = factory()
+            return self._shared[key]
+
+    def executor(self, mode: str = "inline", max_workers: Optional[int] = None):
+        """相同执行模式和工作者数的代理共用一个阶段执行器（工作池只启动一次）"""
+        from .stage_executor import StageExecutor, ExecutorConfig
+        return self.shared(('executor', mode, max_workers),
+                           lambda: StageExecutor(ExecutorConfig(mode=mode, max_workers=max_workers)))
+
+    def memory(self, memory_dir: Optional[str] = None):
+        """同一目录的调研记忆共用一份内存索引"""
+        base_dir = os.path.abspath(memory_dir or os.path.join(os.getenv('RESEARCH_CACHE_DIR', 'cache'), 'memory'))
+        return self.shared(('memory', base_dir), lambda: self.module_class('memory')(base_dir))
+
+    def report_store(self, reports_dir: str = "reports"):
+        """同一目录的报告存储"""
+        root = os.path.abspath(reports_dir)
+        return self.shared(('report_store', root), lambda: self.module_class('report_store')(root))
+
+    def loaded(self) -> List[str]:
+        """已导入的功能模块"""
+        return sorted(self._classes)
+
+    def shutdown(self):
+        """关闭共享的执行器工作池并清空共享实例"""
+        with self._lock:
+            shared, self._shared = self._shared, {}
+        for key, value in shared.items():
+            if isinstance(key, tuple) and key[0] == 'executor':
+                value.shutdown()
+
+registry = ModuleRegistry()
+atexit.register(registry.shutdown)
@@ -0,0 +1,99 @@
+"""
+相关性评分模块 - RelevanceEngine
+文献检索与质量检查共用的分词器和BM25相关性评分。
+"""
+
+import re
+import math
+import logging
+from typing import Dict, List, Sequence
+from collections import Counter, defaultdict
+
+logger = logging.getLogger(__name__)
+
+# 英文/数字词（允许 c++、node.js、gpt-4 之类的连接符）与连续中日韩汉字
+_TOKEN_PATTERN = re.compile(r'[a-z0-9]+(?:[.+#-][a-z0-9]+)*\+*|[㐀-䶿一-鿿]+')
+_CJK_PATTERN = re.compile(r'[㐀-䶿一-鿿]')
+
+def tokenize(text: str) -> List[str]:
+    """中英文分词：英文按词切分，中文按字二元组切分（单字保留为单字）"""
+    if not text:
+        return []
+
+    tokens = []
+    for match in _TOKEN_PATTERN.findall(text.lower()):
+        if _CJK_PATTERN.match(match):
+            if len(match) == 1:
+                tokens.append(match)
+            else:
+                tokens.extend(match[i:i + 2] for i in range(len(match) - 1))
+        else:
+            tokens.append(match)
+    return tokens
+
+def text_relevance(query: str, text: str) -> float:
+    """单文本相关性（0-1）：查询词覆盖率，较长文本略有加成"""
+    query_terms = set(tokenize(query))
+    if not query_terms:
+        return 0.0
+
+    overlap_ratio = len(query_terms & set(tokenize(text))) / len(query_terms)
+    length_factor = min(len(text) / 1000, 1.0)
+    return min(overlap_ratio * (1 + length_factor), 1.0)
+
+class RelevanceIndex:
+    """倒排索引 - 对一批文档构建词项到 (文档, 词频) 的映射"""
+
+    def __init__(self, documents: Sequence[List[str]]):
+        self.doc_count = len(documents)
+        self.doc_lengths = [len(doc) for doc in documents]
+        self.avg_length = (sum(self.doc_lengths) / self.doc_count) if self.doc_count else 0.0
+        self.postings: Dict[str, List] = defaultdict(list)
+        for doc_id, tokens in enumerate(documents):
+            for term, tf in Counter(tokens).items():
+                self.postings[term].append((doc_id, tf))
+
+    def idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+
+class RelevanceEngine:
+    """BM25相关性引擎 - 评分代价与命中的倒排表长度成正比"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, title_weight: int = 2):
+        self.k1 = k1
+        self.b = b
+        self.title_weight = title_weight
+
+    def document_tokens(self, title: str, body: str = "") -> List[str]:
+        """标题词重复 title_weight 次以提高权重"""
+        return tokenize(title) * self.title_weight + tokenize(body)
+
+    def score(self, query: str, documents: Sequence[List[str]]) -> List[float]:
+        """对已分词的文档打分，返回归一化到0-1的BM25分数
+
+        以每个查询词取得最大词频贡献时的理论上限归一化，分数在不同批次间可比。
+        """
+        scores = [0.0] * len(documents)
+        query_terms = set(tokenize(query))
+        if not query_terms or not documents:
+            return scores
+
+        index = RelevanceIndex(documents)
+        avg_length = index.avg_length or 1.0
+        upper_bound = 0.0
+
+        for term in query_terms:
+            idf = index.idf(term)
+            upper_bound += idf * (self.k1 + 1)
+            for doc_id, tf in index.postings.get(term, ()):
+                norm = self.k1 * (1 - self.b + self.b * index.doc_lengths[doc_id] / avg_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        if upper_bound <= 0:
+            return scores
+        return [min(s / upper_bound, 1.0) for s in scores]
+
+    def score_texts(self, query: str, pairs: Sequence[tuple]) -> List[float]:
+        """对 (标题, 正文) 列表打分"""
+        return self.score(query, [self.document_tokens(title, body) for title, body in pairs])
@@ -1,65 +1,391 @@
 """
 报告生成模块 - ReportGenerator
-提供自动化报告生成功能，支持Markdown和文本格式。
+提供自动化报告生成功能：研究结果先构建为一份中间文档模型，再导出为Markdown、HTML、文本
+（由 report_templates 中的编译模板渲染）、JSON 和 PDF（由 pdf_writer 排版）。
 """
 
 import os
+import json
+import base64
 import asyncio
+import sqlite3
+import hashlib
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Iterator, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 
+from .stage_executor import ProcessSafeModule, StageExecutor
+from . import report_templates
+from .report_writer import ReportWriter
+from .pdf_writer import PDFDocument
+from .report_store import FORMAT_EXTENSIONS, ReportStore, new_ulid
+from .chart_renderer import ChartRenderer
+from .literature_retriever.search_cache import SearchCache
+
 logger = logging.getLogger(__name__)
 
 @dataclass
 class ReportConfig:
     """报告配置"""
-    output_format: str = "markdown"  # markdown, html, text
-    include_charts: bool = True
-    include_raw_data: bool = False
+    output_format: str = "markdown"  # markdown, html, text, json, pdf
+    include_charts: bool = True  # 数据统计与趋势图（SVG，嵌入Markdown/HTML/JSON）
+    include_raw_data: bool = False  # 原始数据附录只写入报告文件，不保留在返回的报告文本中
     include_sources: bool = True
     template_style: str = "professional"  # professional, academic, technical
     language: str = "zh"
+    llm_sections: bool = False  # 由LLM撰写各章节（并发生成），完成后再生成执行摘要
+    max_parallel_sections: int = 3
+
+    @classmethod
+    def from_research_config(cls, config) -> 'ReportConfig':
+        """由 ResearchConfig 推导报告配置"""
+        return cls(output_format=getattr(config, 'output_format', 'markdown'),
+                   llm_sections=getattr(config, 'llm_sections', False))
 
-class ReportGenerator:
+class ReportGenerator(ProcessSafeModule):
     """报告生成器 - 将研究结果转换为结构化报告"""
 
-    def __init__(self, research_agent):
+    def __init__(self, research_agent, executor: Optional[StageExecutor] = None):
         self.research_agent = research_agent
+        self.executor = executor or StageExecutor()
         self.config = ReportConfig()
         self.output_dir = Path("reports")
         self.output_dir.mkdir(exist_ok=True)
+        self._store: Optional[ReportStore] = None
+        # LLM章节按输入哈希缓存，换一种格式重新渲染时直接复用
+        self.section_cache = SearchCache(os.path.join(os.getenv('RESEARCH_CACHE_DIR', 'cache'), 'report_sections'))
+        self.charts = ChartRenderer()
         logger.info("ReportGenerator 初始化完成")
 
     async def generate(self, research_data: Dict[str, Any], config: Optional[ReportConfig] = None) -> str:
-        """生成研究报告"""
+        """生成研究报告并保存到 output_dir"""
+        report, _ = await self.generate_to_file(research_data, config)
+        return report
+
+    async def generate_to_file(self, research_data: Dict[str, Any], config: Optional[ReportConfig] = None,
+                               output_path: Optional[str] = None, save: bool = True) -> Tuple[str, Optional[str]]:
+        """生成研究报告，逐个章节写入报告文件
+
+        报告文件只由本方法写入一次：先写临时文件，完成后原子替换目标文件。
+
+        Args:
+            output_path: 报告文件路径，默认由 output_dir 下的报告存储分配并登记索引
+            save: 为 False 时只返回报告文本
+
+        Returns:
+            (report, saved_path): 报告正文（原始数据附录只写入文件）和文件路径，未保存或保存失败时为 None
+        """
         if config:
-            self.config = config
+            self.config = config if isinstance(config, ReportConfig) else ReportConfig.from_research_config(config)
 
         try:
             logger.info("开始生成研究报告")
-            report_data = self._prepare_report_data(research_data)
-
-            # 选择格式生成
-            fmt = self.config.output_format
-            if fmt == "markdown":
-                report = self._generate_markdown_report(report_data)
-            elif fmt == "html":
-                report = self._generate_html_report(report_data)
-            elif fmt == "pdf":
-                report = self._generate_markdown_report(report_data)  # PDF暂时回退到MD
+            report_data = await self.build_document(research_data)
+        except Exception as e:
+            logger.error(f"报告生成失败: {e}")
+            return f"报告生成失败: {e}", None
+
+        fmt = self.config.output_format
+        if not save:
+            return self.render_report(report_data, fmt), None
+        if output_path:
+            return await self._write_format(report_data, research_data, fmt, output_path)
+        return await self._write_stored(report_data, research_data, fmt)
+
+    async def export(self, research_data: Dict[str, Any], formats: Optional[List[str]] = None,
+                     config: Optional[ReportConfig] = None, basename: Optional[str] = None) -> Dict[str, Optional[str]]:
+        """一次数据准备，同时导出多种格式
+
+        Args:
+            formats: 导出格式，默认全部（markdown、html、text、json、pdf）
+            basename: 文件名（不含扩展名），写入 output_dir；默认由报告存储按报告ID分配并登记索引
+
+        Returns:
+            格式 -> 文件路径（写入失败为 None）
+        """
+        formats = list(formats or FORMAT_EXTENSIONS)
+        unknown = [fmt for fmt in formats if fmt not in FORMAT_EXTENSIONS]
+        if unknown:
+            raise ValueError(f"不支持的报告格式: {', '.join(unknown)}")
+        if config:
+            self.config = config if isinstance(config, ReportConfig) else ReportConfig.from_research_config(config)
+
+        report_data = await self.build_document(research_data)
+
+        async def export_one(fmt: str):
+            if basename:
+                path = f"{self.output_dir / basename}{FORMAT_EXTENSIONS[fmt]}"
+                _, saved_path = await self._write_format(report_data, research_data, fmt, path)
             else:
-                report = self._generate_text_report(report_data)
+                _, saved_path = await self._write_stored(report_data, research_data, fmt)
+            return fmt, saved_path
+
+        return dict(await asyncio.gather(*(export_one(fmt) for fmt in formats)))
 
-            saved_path = await self._save_report(report, report_data)
+    async def build_document(self, research_data: Dict[str, Any]) -> Dict[str, Any]:
+        """构建报告的中间文档模型，所有导出格式共用
+
+        图表与文本章节同时生成：图表任务先启动，在执行器中渲染，不占用文本章节的关键路径。
+        """
+        chart_task = None
+        if self.config.include_charts and isinstance(research_data.get('data'), dict):
+            chart_task = asyncio.create_task(self.charts.render(research_data['data'], self.executor))
+        try:
+            # 报告数据准备为CPU密集步骤，交给阶段执行器
+            report_data = await self.executor.run(self._prepare_report_data, research_data)
+            if self.config.llm_sections:
+                await self._write_sections_with_llm(report_data, research_data)
+        except BaseException:
+            if chart_task:
+                chart_task.cancel()
+            raise
+        report_data['charts'] = await chart_task if chart_task else []
+        return report_data
+
+    @property
+    def store(self) -> ReportStore:
+        """output_dir 下的报告存储"""
+        if self._store is None or self._store.root != Path(self.output_dir):
+            self._store = ReportStore(self.output_dir)
+        return self._store
+
+    async def _write_stored(self, report_data: Dict[str, Any], research_data: Dict[str, Any],
+                            fmt: str) -> Tuple[str, Optional[str]]:
+        """写入报告存储分配的分片路径，成功后登记索引"""
+        report_id, path = self.store.allocate(fmt, report_data['metadata']['report_id'])
+        report, saved_path = await self._write_format(report_data, research_data, fmt, str(path))
+        if saved_path:
+            quality = research_data.get('quality')
+            try:
+                await asyncio.to_thread(
+                    self.store.register, report_id, fmt, saved_path, query=research_data.get('query', ''),
+                    domain=report_data['metadata']['research_domain'],
+                    score=quality.get('overall_score') if isinstance(quality, dict) else None)
+            except sqlite3.Error as e:
+                logger.warning(f"报告索引登记失败: {e}")
+        return report, saved_path
+
+    async def _write_format(self, report_data: Dict[str, Any], research_data: Dict[str, Any],
+                            fmt: str, path: str) -> Tuple[str, Optional[str]]:
+        """把文档模型写入一种格式的报告文件，返回 (报告文本, 文件路径)"""
+        parts: List[str] = []
+        writer = ReportWriter(path, binary=fmt == 'pdf')
+        try:
+            async with writer:
+                if fmt == 'pdf':
+                    await writer.write_section(await asyncio.to_thread(self.render_pdf, report_data, research_data))
+                    parts.append(self.render_report(report_data, fmt))
+                elif fmt == 'json':
+                    parts.append(await self._write_json(report_data, research_data, writer))
+                else:
+                    for part in self.iter_report_parts(report_data, fmt):
+                        parts.append(part)
+                        await writer.write_section(part)
+                    if self.config.include_raw_data:
+                        await self._write_raw_data(research_data, writer, fmt)
+                    closing = self.render_closing(fmt)
+                    parts.append(closing)
+                    await writer.write(closing)
+            saved_path = str(writer.path.absolute())
             logger.info(f"报告生成完成: {saved_path}")
-            return report
+        except OSError as e:
+            logger.error(f"保存报告失败: {e}")
+            return self.render_report(report_data, fmt), None
 
+        return "".join(parts), saved_path
+
+    async def _write_sections_with_llm(self, report_data: Dict[str, Any], research_data: Dict[str, Any]):
+        """并发生成各章节（最多 max_parallel_sections 个同时进行），全部完成后生成执行摘要
+
+        LLM调用失败的章节保留模板内容。
+        """
+        background = self._llm_background(research_data)
+        semaphore = asyncio.Semaphore(max(self.config.max_parallel_sections, 1))
+
+        async def write_section(name: str, section: Dict[str, Any]):
+            outline = section.get('content') or "\n".join(
+                f"{sub['title']}: {sub['content']}" for sub in section.get('subsections', []))
+            prompt = f"""撰写调研报告的「{section['title']}」章节（Markdown，使用三级及以下标题）。
+
+{background}
+
+章节提纲:
+{outline}"""
+            async with semaphore:
+                content = await self._cached_completion(f"section:{name}", prompt)
+            if content:
+                report_data['sections'][name] = {'title': section['title'], 'content': content}
+
+        await asyncio.gather(*(write_section(name, section) for name, section in report_data['sections'].items()))
+
+        sections_text = "\n\n".join(f"## {s['title']}\n{s.get('content', '')}" for s in report_data['sections'].values())
+        summary = await self._cached_completion('executive_summary', f"""根据以下报告章节撰写执行摘要（300字以内，包含主要发现和核心建议）:
+
+主题: {research_data.get('query', '')}
+
+{sections_text}""")
+        if summary:
+            report_data['executive_summary'] = summary
+
+    def _llm_background(self, research_data: Dict[str, Any]) -> str:
+        lines = [f"主题: {research_data.get('query', '')}", f"领域: {self.research_agent.research_domain}"]
+        literature = research_data.get('literature', {})
+        if isinstance(literature, dict):
+            items = [item for key in ('github_results', 'paper_results', 'blog_results') for item in literature.get(key, [])]
+            lines.extend(f"- [{getattr(item, 'source', '')}] {getattr(item, 'title', '')}: "
+                         f"{(getattr(item, 'description', '') or '')[:120]}" for item in items[:10])
+        analysis = research_data.get('analysis', {})
+        if isinstance(analysis, dict) and analysis.get('analysis_report'):
+            lines.append(f"分析: {str(analysis['analysis_report'])[:1500]}")
+        return "\n".join(lines)
+
+    async def _cached_completion(self, kind: str, prompt: str) -> Optional[str]:
+        """按提示内容哈希缓存的一次性LLM调用；失败返回 None"""
+        agent = self.research_agent
+        key = SearchCache.make_key('report_section', kind, model=f"{getattr(agent, 'provider', '')}/{getattr(agent, 'model', '')}",
+                                   prompt=hashlib.sha256(prompt.encode('utf-8')).hexdigest())
+        entry = await asyncio.to_thread(self.section_cache.get, key)
+        if entry:
+            return entry.payload
+
+        try:
+            # acomplete 不共享对话历史，可并发；旧的代理对象只提供 achat
+            complete = getattr(agent, 'acomplete', None) or agent.achat
+            content = (await complete(prompt) or '').strip()
         except Exception as e:
-            logger.error(f"报告生成失败: {e}")
-            return f"报告生成失败: {e}"
+            logger.warning(f"章节生成失败（{kind}），保留模板内容: {e}")
+            return None
+
+        if content:
+            await asyncio.to_thread(self.section_cache.set, key, content)
+        return content or None
+
+    def _template_name(self, fmt: Optional[str] = None) -> str:
+        fmt = fmt or self.config.output_format
+        if fmt in ('markdown', 'html'):
+            return fmt
+        return 'text'  # PDF返回的报告文本也使用纯文本模板
+
+    def _render_template(self, name: str, context: Dict[str, Any]) -> str:
+        return report_templates.render_to_string(name, context, self.config.template_style, self.config.language)
+
+    def _labels(self) -> Dict[str, str]:
+        return report_templates.LABELS.get(self.config.language, report_templates.LABELS['zh'])
+
+    def iter_report_parts(self, report_data: Dict[str, Any], fmt: Optional[str] = None) -> Iterator[str]:
+        """依次渲染报告头部、各章节和参考资料，每次产出一个完整部分"""
+        name = self._template_name(fmt)
+        sections = list(report_data['sections'].values())
+        charts = report_data.get('charts') if report_templates.has_template(
+            f"{name}_charts", self.config.template_style, self.config.language) else None
+        labels = self._labels()
+
+        yield self._render_template(f"{name}_head", {
+            'metadata': report_data['metadata'],
+            'executive_summary': report_data['executive_summary'],
+            'toc': [labels['executive_summary']] + [section['title'] for section in sections] + ([labels['charts']] if charts else [])
+        })
+        for index, section in enumerate(sections, 1):
+            yield self._render_template(f"{name}_section", {'section': section, 'index': index})
+        if charts:
+            yield self._render_template(f"{name}_charts", {'charts': [
+                {**chart, 'data_uri': "data:image/svg+xml;base64," + base64.b64encode(chart['svg'].encode('utf-8')).decode('ascii')}
+                for chart in charts]})
+        yield self._render_template(f"{name}_tail", {'sources': report_data['sources']})
+
+    def render_report(self, report_data: Dict[str, Any], fmt: Optional[str] = None) -> str:
+        """渲染完整报告正文（不含原始数据附录）"""
+        if (fmt or self.config.output_format) == 'json':
+            return self.render_json(report_data)
+        return "".join(self.iter_report_parts(report_data, fmt)) + self.render_closing(fmt)
+
+    def render_closing(self, fmt: Optional[str] = None) -> str:
+        """正文和附录之后的结束部分（HTML的结束标签）"""
+        name = f"{self._template_name(fmt)}_end"
+        if report_templates.has_template(name, self.config.template_style, self.config.language):
+            return self._render_template(name, {})
+        return ""
+
+    def render_json(self, report_data: Dict[str, Any]) -> str:
+        """文档模型的JSON表示（不含原始数据）"""
+        document = {**report_data, 'sections': list(report_data['sections'].values())}
+        return json.dumps(document, ensure_ascii=False, indent=2)
+
+    async def _write_json(self, report_data: Dict[str, Any], research_data: Dict[str, Any], writer: ReportWriter) -> str:
+        """写入JSON报告，返回不含原始数据的文档部分
+
+        启用原始数据时先写出文档部分（去掉结尾的括号），raw_data 条目逐个编码、缓冲写出，
+        不在内存中汇总；文件内容与整体 json.dumps 的结果相同。
+        """
+        body = self.render_json(report_data)
+        if not self.config.include_raw_data:
+            await writer.write_section(body)
+            return body
+
+        await writer.write(body[:-len("\n}")] + ',\n  "raw_data": [')
+        count = 0
+        for item in self._iter_raw_data(research_data):
+            encoded = json.dumps(item, ensure_ascii=False, indent=2).replace('\n', '\n    ')
+            await writer.write(f"{',' if count else ''}\n    {encoded}")
+            count += 1
+        await writer.write("\n  ]\n}" if count else "]\n}")
+        await writer.flush()
+        return body
+
+    def render_pdf(self, report_data: Dict[str, Any], research_data: Optional[Dict[str, Any]] = None) -> bytes:
+        """按文档模型排版PDF（文本排版，不含图表）"""
+        labels = self._labels()
+        metadata = report_data['metadata']
+        document = PDFDocument(title=metadata['title'])
+
+        document.add_text(metadata['title'], heading=True)
+        document.add_text(f"{labels['generated_at']}: {metadata['generated_at']}\n"
+                          f"{labels['research_domain']}: {metadata['research_domain']}\n"
+                          f"{labels['model']}: {metadata['model_info']}\n")
+        document.add_text(labels['executive_summary'], heading=True)
+        document.add_text(report_data['executive_summary'])
+        for index, section in enumerate(report_data['sections'].values(), 1):
+            document.add_text(f"{index}. {section['title']}", heading=True)
+            if section.get('content'):
+                document.add_text(section['content'])
+            for sub in section.get('subsections', []):
+                document.add_text(f"[{sub['title']}]\n{sub['content']}")
+
+        document.add_text(labels['sources'], heading=True)
+        sources = report_data['sources']
+        document.add_text("\n".join(f"{i}. [{source['type']}] {source['title']} {source['url']}".rstrip()
+                                     for i, source in enumerate(sources, 1)) or labels['no_sources'])
+        if research_data is not None and self.config.include_raw_data:
+            document.add_text(labels['raw_data'], heading=True)
+            for item in self._iter_raw_data(research_data):
+                document.add_text(f"[{item['source']}] {item['title']} {item['url']}".rstrip())
+        return document.build()
+
+    async def _write_raw_data(self, research_data: Dict[str, Any], writer: ReportWriter, fmt: Optional[str] = None):
+        """原始数据附录：条目逐个生成、缓冲写出，不在内存中汇总"""
+        name = f"{self._template_name(fmt)}_raw"
+        if not report_templates.has_template(name, self.config.template_style, self.config.language):
+            return
+        template = report_templates.get_template(name, self.config.template_style, self.config.language)
+        for chunk in template({'labels': self._labels(), 'raw_data': self._iter_raw_data(research_data)}):
+            await writer.write(chunk)
+        await writer.flush()
+
+    @staticmethod
+    def _iter_raw_data(research_data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        literature = research_data.get('literature', {})
+        if isinstance(literature, dict):
+            for key in ('github_results', 'paper_results', 'blog_results'):
+                for item in literature.get(key, []):
+                    yield {'source': getattr(item, 'source', key), 'title': getattr(item, 'title', ''),
+                           'url': getattr(item, 'url', ''), 'description': getattr(item, 'description', '')}
+
+        data = research_data.get('data', {})
+        for sample in (data.get('samples') or []) if isinstance(data, dict) else []:
+            yield {'source': sample.get('source', ''), 'title': sample.get('type', ''),
+                   'url': '', 'description': sample.get('content', '')}
 
     def _prepare_report_data(self, research_data: Dict[str, Any]) -> Dict[str, Any]:
         """准备报告数据"""
@@ -73,7 +399,7 @@ class ReportGenerator:
                 'generated_at': ts,
                 'research_domain': self.research_agent.research_domain,
                 'model_info': f"{self.research_agent.provider} - {self.research_agent.model}",
-                'report_id': f"report{datetime.now().strftime('%Y%m%d%H%M%S')}"
+                'report_id': new_ulid()
             },
             'executive_summary': self._generate_executive_summary(research_data),
             'sections': {
@@ -267,174 +593,3 @@ class ReportGenerator:
                     })
 
         return sources
-
-    def _generate_markdown_report(self, data: Dict[str, Any]) -> str:
-        """生成Markdown格式报告"""
-        m = data['metadata']
-        sections = data['sections']
-
-        # 生成目录和章节
-        toc_items = [
-            "1. [执行摘要](#执行摘要)",
-            "2. [研究背景与目标](#研究背景与目标)",
-            "3. [研究方法](#研究方法)",
-            "4. [主要发现](#主要发现)",
-            "5. [深入分析](#深入分析)",
-            "6. [结论](#结论)",
-            "7. [建议](#建议)"
-        ]
-
-        # 生成章节内容
-        sections_md = ""
-        for section in sections.values():
-            sections_md += f"\n## {section['title']}\n\n{section['content']}\n\n"
-
-        # 生成发现子章节
-        findings = sections['findings']
-        if findings.get('subsections'):
-            sections_md = sections_md.replace("## 主要发现\n\n", "")
-            for sub in findings['subsections']:
-                sections_md += f"### {sub['title']}\n\n{sub['content']}\n\n"
-
-        # 生成参考资料
-        sources_md = ""
-        if data['sources']:
-            sources_md = "\n".join(f"{i}. **{s['type']}**: {s['title']}" + (f" - [{s['url']}]({s['url']})" if s['url'] else "") for i, s in enumerate(data['sources'], 1))
-        else:
-            sources_md = "暂无参考资料"
-
-        return f"""# {m['title']}
-
-> **生成时间**: {m['generated_at']}
-> **研究领域**: {m['research_domain']}
-> **AI模型**: {m['model_info']}
-
----
-
-## 目录
-
-{chr(10).join(toc_items)}
-
----
-
-## 执行摘要
-
-{data['executive_summary']}
-
----{sections_md}---
-
-## 参考资料
-
-{sources_md}
-
----
-
-*本报告由Research Agent自动生成，建议结合人工验证。*
-"""
-
-    def _generate_html_report(self, data: Dict[str, Any]) -> str:
-        """生成HTML格式报告"""
-        m = data['metadata']
-        return f"""<!DOCTYPE html>
-<html lang="zh">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{m['title']}</title>
-    <style>
-        body {{ font-family: 'Microsoft YaHei', sans-serif; line-height: 1.6; margin: 0; padding: 20px; }}
-        .header {{ background: #f4f4f4; padding: 20px; border-radius: 5px; margin-bottom: 20px; }}
-        .section {{ margin: 20px 0; }}
-    </style>
-</head>
-<body>
-    <div class="header">
-        <h1>{m['title']}</h1>
-        <p><strong>生成时间:</strong> {m['generated_at']}</p>
-        <p><strong>研究领域:</strong> {m['research_domain']}</p>
-    </div>
-
-    <div class="content">
-        <h2>执行摘要</h2>
-        <p>{data['executive_summary']}</p>
-
-        <h2>研究背景与目标</h2>
-        <p>{data['sections']['introduction']['content']}</p>
-
-        <h2>研究方法</h2>
-        <p>{data['sections']['methodology']['content']}</p>
-
-        <h2>主要发现</h2>
-        <p>基于AI辅助生成的技术分析结果</p>
-
-        <h2>深入分析</h2>
-        <p>{data['sections']['analysis']['content']}</p>
-
-        <h2>结论</h2>
-        <p>{data['sections']['conclusions']['content']}</p>
-
-        <h2>建议</h2>
-        <p>{data['sections']['recommendations']['content']}</p>
-    </div>
-</body>
-</html>"""
-
-    def _generate_text_report(self, data: Dict[str, Any]) -> str:
-        """生成纯文本格式报告"""
-        m = data['metadata']
-        sections = data['sections']
-
-        return f"""{m['title']}
-{'=' * len(m['title'])}
-
-生成时间: {m['generated_at']}
-研究领域: {m['research_domain']}
-AI模型: {m['model_info']}
-
-执行摘要
-----------
-{data['executive_summary']}
-
-研究背景与目标
---------------
-{sections['introduction']['content']}
-
-研究方法
---------
-{sections['methodology']['content']}
-
-主要发现
---------
-{sections['findings']['subsections'][0]['content'] if sections['findings'].get('subsections') else '基于AI分析'}
-
-深入分析
---------
-{sections['analysis']['content']}
-
-结论
-----
-{sections['conclusions']['content']}
-
-建议
-----
-{sections['recommendations']['content']}
-
-报告生成完成
-"""
-
-    async def _save_report(self, report: str, report_data: Dict[str, Any]) -> str:
-        """保存报告到文件"""
-        try:
-            ext_map = {'markdown': '.md', 'html': '.html', 'pdf': '.pdf', 'text': '.txt'}
-            ext = ext_map.get(self.config.output_format, '.md')
-
-            filename = f"{report_data['metadata']['report_id']}{ext}"
-            filepath = self.output_dir / filename
-
-            filepath.write_text(report, encoding='utf-8')
-            logger.info(f"报告已保存: {filepath}")
-            return str(filepath)
-
-        except Exception as e:
-            logger.error(f"保存报告失败: {e}")
-            return "保存失败"
@@ -0,0 +1,172 @@
+"""
+报告存储 - ReportStore
+报告文件以 ULID 命名、按日期分片存放（reports/YYYY/MM/DD/<ULID>.<ext>），
+SQLite 索引记录查询、领域、时间、质量分和路径，按ID查找和按条件列出都走B树索引，不扫描目录。
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+FORMAT_EXTENSIONS = {'markdown': '.md', 'html': '.html', 'text': '.txt', 'json': '.json', 'pdf': '.pdf'}
+
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_ulid_lock = threading.Lock()
+_last_ulid = (0, 0)
+
+def new_ulid(timestamp: Optional[float] = None) -> str:
+    """生成 ULID：48位毫秒时间戳 + 80位随机数，字典序即时间序
+
+    同一毫秒内连续生成时随机部分递增，保证单进程内单调且不重复。
+    """
+    global _last_ulid
+    ms = int((time.time() if timestamp is None else timestamp) * 1000)
+    with _ulid_lock:
+        last_ms, last_random = _last_ulid
+        if ms == last_ms and last_random < (1 << 80) - 1:
+            ms, random_part = last_ms, last_random + 1
+        else:
+            random_part = int.from_bytes(os.urandom(10), 'big')
+        _last_ulid = (ms, random_part)
+
+    value = (ms << 80) | random_part
+    return "".join(_CROCKFORD[(value >> shift) & 31] for shift in range(125, -1, -5))
+
+def ulid_time(ulid: str) -> datetime:
+    """ULID 中的生成时间"""
+    value = 0
+    for ch in ulid[:10].upper():
+        value = value * 32 + _CROCKFORD.index(ch)
+    return datetime.fromtimestamp(value / 1000)
+
+@dataclass
+class ReportRecord:
+    """报告索引记录"""
+    report_id: str
+    output_format: str
+    path: str
+    query: str = ""
+    domain: str = ""
+    created_at: str = ""
+    score: Optional[float] = None
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    report_id TEXT NOT NULL,
+    output_format TEXT NOT NULL,
+    path TEXT NOT NULL,
+    query TEXT NOT NULL DEFAULT '',
+    domain TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL,
+    score REAL,
+    PRIMARY KEY (report_id, output_format)
+);
+CREATE INDEX IF NOT EXISTS reports_created ON reports (created_at);
+CREATE INDEX IF NOT EXISTS reports_query ON reports (query, created_at);
+CREATE INDEX IF NOT EXISTS reports_domain ON reports (domain, created_at);
+"""
+
+class ReportStore:
+    """报告存储
+
+    allocate 分配不冲突的报告ID和分片路径，文件写入完成后用 register 登记索引；
+    同一报告的多种格式共用一个ID。索引中的路径相对存储根目录保存，目录整体移动后仍然有效。
+    """
+
+    def __init__(self, root: str = "reports", index_name: str = "index.sqlite3"):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.root / index_name
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")  # 持久设置：读写互不阻塞
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # 每次操作单独连接（事务结束即关闭），可在线程池和多个进程中并发使用
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def allocate(self, output_format: str = "markdown", report_id: Optional[str] = None) -> Tuple[str, Path]:
+        """分配报告ID和文件路径（按ID中的日期分片，目录已创建）"""
+        report_id = report_id or new_ulid()
+        created = ulid_time(report_id)
+        path = self.root / created.strftime('%Y') / created.strftime('%m') / created.strftime('%d') / \
+            f"{report_id}{FORMAT_EXTENSIONS.get(output_format, '.md')}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return report_id, path
+
+    def register(self, report_id: str, output_format: str, path: str, query: str = "", domain: str = "",
+                 score: Optional[float] = None, created_at: Optional[str] = None) -> ReportRecord:
+        """登记已写入的报告文件"""
+        path = Path(path).absolute()
+        try:
+            stored_path = str(path.relative_to(self.root.absolute()))
+        except ValueError:
+            stored_path = str(path)
+        created_at = created_at or ulid_time(report_id).isoformat(timespec='milliseconds')
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (report_id, output_format, stored_path, query, domain, created_at, score))
+        return self._record((report_id, output_format, stored_path, query, domain, created_at, score))
+
+    def get(self, report_id: str, output_format: Optional[str] = None) -> Optional[ReportRecord]:
+        """按ID查找报告（未指定格式时返回任一格式）"""
+        sql, params = "SELECT * FROM reports WHERE report_id = ?", [report_id]
+        if output_format:
+            sql, params = sql + " AND output_format = ?", params + [output_format]
+        with self._connect() as conn:
+            row = conn.execute(sql + " LIMIT 1", params).fetchone()
+        return self._record(row) if row else None
+
+    def find(self, query: Optional[str] = None, domain: Optional[str] = None, since: Optional[datetime] = None,
+             until: Optional[datetime] = None, output_format: Optional[str] = None, limit: int = 50) -> List[ReportRecord]:
+        """按条件列出报告，最新的在前"""
+        clauses, params = [], []
+        for column, value in (('query', query), ('domain', domain), ('output_format', output_format)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since.isoformat(timespec='milliseconds'))
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until.isoformat(timespec='milliseconds'))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT * FROM reports {where} ORDER BY created_at DESC LIMIT ?",
+                                params + [limit]).fetchall()
+        return [self._record(row) for row in rows]
+
+    def count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+
+    def remove(self, report_id: str, delete_files: bool = True) -> int:
+        """删除报告的全部格式及索引，返回删除的记录数"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM reports WHERE report_id = ?", (report_id,)).fetchall()
+            conn.execute("DELETE FROM reports WHERE report_id = ?", (report_id,))
+        if delete_files:
+            for row in rows:
+                Path(self._record(row).path).unlink(missing_ok=True)
+        return len(rows)
+
+    def _record(self, row) -> ReportRecord:
+        report_id, output_format, path, query, domain, created_at, score = row
+        return ReportRecord(report_id=report_id, output_format=output_format, path=str((self.root / path).absolute()),
+                            query=query, domain=domain, created_at=created_at, score=score)
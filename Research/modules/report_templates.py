@@ -0,0 +1,350 @@
+"""
+报告模板 - ReportTemplate
+基于 Jinja2：模板编译一次并按 (模板名, 风格, 语言) 缓存，渲染用 generate() 逐段产出交给 writer，
+原始数据附录等大段内容不会整体进入内存。
+
+环境设置:
+- trim_blocks/lstrip_blocks：标签独占一行时整行（含换行）不输出；行尾的内联标签写作 {% endif +%} 保留换行
+- 不自动转义，HTML模板对文本显式使用 |e；值为 None 时输出空字符串
+- 访问缺失的键或属性得到空值（可链式访问），不报错
+"""
+
+import logging
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+from functools import lru_cache
+
+import jinja2
+from markupsafe import escape
+
+logger = logging.getLogger(__name__)
+
+class TemplateError(ValueError):
+    """模板语法错误或模板不存在"""
+
+def _to_str(value: Any) -> str:
+    return '' if value is None else str(value)
+
+FILTERS: Dict[str, Callable[[Any], Any]] = {
+    'e': lambda v: escape(_to_str(v)),
+    'underline': lambda v: '=' * len(_to_str(v)),
+    'rule': lambda v: '-' * len(_to_str(v)),
+}
+
+_ENV = jinja2.Environment(
+    trim_blocks=True, lstrip_blocks=True, keep_trailing_newline=True, autoescape=False,
+    undefined=jinja2.ChainableUndefined, finalize=lambda value: '' if value is None else value
+)
+_ENV.filters.update(FILTERS)
+
+def compile_template(source: str, name: str = "<template>") -> Callable[[Dict[str, Any]], Iterator[str]]:
+    """编译模板，返回 render(context) 生成器函数"""
+    try:
+        return _ENV.from_string(source).generate
+    except jinja2.TemplateSyntaxError as e:
+        raise TemplateError(f"{name}: {e.message}（第{e.lineno}行）") from e
+
+LABELS = {
+    'zh': {
+        'generated_at': '生成时间', 'research_domain': '研究领域', 'model': 'AI模型', 'toc': '目录',
+        'executive_summary': '执行摘要', 'sources': '参考资料', 'no_sources': '暂无参考资料',
+        'raw_data': '附录：原始数据', 'charts': '数据图表', 'footer': '本报告由Research Agent自动生成，建议结合人工验证。',
+        'done': '报告生成完成', 'report_suffix': '技术调研报告'
+    },
+    'en': {
+        'generated_at': 'Generated at', 'research_domain': 'Research domain', 'model': 'Model', 'toc': 'Contents',
+        'executive_summary': 'Executive Summary', 'sources': 'References', 'no_sources': 'No references',
+        'raw_data': 'Appendix: Raw Data', 'charts': 'Charts', 'footer': 'Generated automatically by Research Agent; please verify manually.',
+        'done': 'End of report', 'report_suffix': 'Technical Research Report'
+    }
+}
+
+# 报告由 头部、逐个章节、尾部 三类模板依次渲染，每个章节渲染完即可写出
+_MARKDOWN_HEAD = """# {{ metadata.title }}
+
+> **{{ labels.generated_at }}**: {{ metadata.generated_at }}
+> **{{ labels.research_domain }}**: {{ metadata.research_domain }}
+> **{{ labels.model }}**: {{ metadata.model_info }}
+
+---
+
+## {{ labels.toc }}
+
+{% for entry in toc %}
+{{ loop.index }}. [{{ entry }}](#{{ entry }})
+{% endfor %}
+
+---
+
+## {{ labels.executive_summary }}
+
+{{ executive_summary }}
+
+---
+"""
+
+_MARKDOWN_SECTION = """
+## {{ section.title }}
+
+{% if section.content %}
+{{ section.content }}
+
+{% endif %}
+{% for sub in section.subsections %}
+### {{ sub.title }}
+
+{{ sub.content }}
+
+{% endfor %}
+"""
+
+# 学术风格：章节编号
+_MARKDOWN_SECTION_ACADEMIC = _MARKDOWN_SECTION.replace("## {{ section.title }}", "## {{ index }}. {{ section.title }}")
+
+_MARKDOWN_TAIL = """---
+
+## {{ labels.sources }}
+
+{% if sources %}
+{% for source in sources %}
+{{ loop.index }}. **{{ source.type }}**: {{ source.title }}{% if source.url %} - [{{ source.url }}]({{ source.url }}){% endif +%}
+{% endfor %}
+{% else %}
+{{ labels.no_sources }}
+{% endif %}
+
+---
+
+*{{ labels.footer }}*
+"""
+
+_MARKDOWN_RAW = """
+## {{ labels.raw_data }}
+
+{% for item in raw_data %}
+- [{{ item.source }}] {{ item.title }}{% if item.url %} <{{ item.url }}>{% endif +%}
+
+  {{ item.description }}
+{% endfor %}
+"""
+
+# 图表以SVG嵌入：Markdown 使用 data URI，HTML 直接内联
+_MARKDOWN_CHARTS = """
+## {{ labels.charts }}
+
+{% for chart in charts %}
+![{{ chart.title }}]({{ chart.data_uri }})
+
+{% endfor %}
+"""
+
+_HTML_HEAD = """<!DOCTYPE html>
+<html lang="{{ language }}">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{{ metadata.title|e }}</title>
+    <style>
+        body { font-family: 'Microsoft YaHei', sans-serif; line-height: 1.6; margin: 0; padding: 20px; }
+        .header { background: #f4f4f4; padding: 20px; border-radius: 5px; margin-bottom: 20px; }
+        .section { margin: 20px 0; }
+        .section-body { white-space: pre-wrap; }
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>{{ metadata.title|e }}</h1>
+        <p><strong>{{ labels.generated_at }}:</strong> {{ metadata.generated_at|e }}</p>
+        <p><strong>{{ labels.research_domain }}:</strong> {{ metadata.research_domain|e }}</p>
+    </div>
+
+    <div class="content">
+        <h2>{{ labels.executive_summary }}</h2>
+        <div class="section-body">{{ executive_summary|e }}</div>
+"""
+
+_HTML_SECTION = """
+        <div class="section">
+        <h2>{{ section.title|e }}</h2>
+{% if section.content %}
+        <div class="section-body">{{ section.content|e }}</div>
+{% endif %}
+{% for sub in section.subsections %}
+        <h3>{{ sub.title|e }}</h3>
+        <div class="section-body">{{ sub.content|e }}</div>
+{% endfor %}
+        </div>
+"""
+
+_HTML_CHARTS = """
+        <div class="section charts">
+        <h2>{{ labels.charts }}</h2>
+{% for chart in charts %}
+        <figure>
+{{ chart.svg }}
+        <figcaption>{{ chart.title|e }}</figcaption>
+        </figure>
+{% endfor %}
+        </div>
+"""
+
+_HTML_TAIL = """{% if sources %}
+
+        <h2>{{ labels.sources }}</h2>
+        <ol>
+{% for source in sources %}
+            <li><strong>{{ source.type|e }}</strong>: {% if source.url %}<a href="{{ source.url|e }}">{{ source.title|e }}</a>{% else %}{{ source.title|e }}{% endif %}</li>
+{% endfor %}
+        </ol>
+{% endif %}
+    </div>
+"""
+
+# HTML 附录写在正文之后，因此结束标签单独作为模板
+_HTML_RAW = """    <div class="raw-data">
+        <h2>{{ labels.raw_data }}</h2>
+        <ul>
+{% for item in raw_data %}
+            <li>[{{ item.source|e }}] {{ item.title|e }} {{ item.url|e }}</li>
+{% endfor %}
+        </ul>
+    </div>
+"""
+
+_HTML_END = """</body>
+</html>"""
+
+_TEXT_HEAD = """{{ metadata.title }}
+{{ metadata.title|underline }}
+
+{{ labels.generated_at }}: {{ metadata.generated_at }}
+{{ labels.research_domain }}: {{ metadata.research_domain }}
+{{ labels.model }}: {{ metadata.model_info }}
+
+{{ labels.executive_summary }}
+{{ labels.executive_summary|rule }}
+{{ executive_summary }}
+"""
+
+_TEXT_SECTION = """
+{{ section.title }}
+{{ section.title|rule }}
+{% if section.content %}
+{{ section.content }}
+{% endif %}
+{% for sub in section.subsections %}
+[{{ sub.title }}]
+{{ sub.content }}
+{% endfor %}
+"""
+
+_TEXT_TAIL = """
+{{ labels.done }}
+"""
+
+_TEXT_RAW = """
+{{ labels.raw_data }}
+{{ labels.raw_data|rule }}
+{% for item in raw_data %}
+[{{ item.source }}] {{ item.title }} {{ item.url }}
+{% endfor %}
+"""
+
+# ResearchAgent 在功能模块不可用时的简要报告
+_BRIEF_MARKDOWN = """# {{ query }} - {{ labels.report_suffix }}
+
+## 研究概述
+- **{{ labels.research_domain }}**: {{ research_domain }}
+- **调研时间**: {{ generated_at }}
+- **{{ labels.model }}**: {{ model_info }}
+
+## {{ labels.executive_summary }}
+本报告基于多源数据收集和分析，提供了关于"{{ query }}"的技术调研结果。
+
+## 文献检索结果
+{{ literature }}
+
+## 数据收集分析
+{{ data }}
+
+## 质量评估
+{{ quality }}
+
+## 技术分析
+{{ analysis }}
+
+## 建议
+1. 扩展数据源和检索范围
+2. 深入分析特定技术细节
+3. 跟踪最新发展趋势
+4. 进行专家验证和反馈
+
+---
+*{{ labels.footer }}*
+"""
+
+_BRIEF_TEXT = """{{ query }} - {{ labels.report_suffix }}
+
+{{ labels.generated_at }}: {{ generated_at }}
+{{ labels.research_domain }}: {{ research_domain }}
+
+=== {{ labels.executive_summary }} ===
+本报告基于AI辅助的技术调研。
+
+=== 主要发现 ===
+{{ analysis }}
+
+=== 建议 ===
+1. 扩展更多数据源
+2. 进行深度技术分析
+3. 结合专家意见验证
+"""
+
+# (模板名, 风格, 语言) -> 模板源码；语言只影响 labels 时各语言共用 '*' 模板
+TEMPLATES: Dict[Tuple[str, str, str], str] = {
+    ('markdown_head', 'professional', '*'): _MARKDOWN_HEAD,
+    ('markdown_section', 'professional', '*'): _MARKDOWN_SECTION,
+    ('markdown_section', 'academic', '*'): _MARKDOWN_SECTION_ACADEMIC,
+    ('markdown_tail', 'professional', '*'): _MARKDOWN_TAIL,
+    ('markdown_raw', 'professional', '*'): _MARKDOWN_RAW,
+    ('markdown_charts', 'professional', '*'): _MARKDOWN_CHARTS,
+    ('html_head', 'professional', '*'): _HTML_HEAD,
+    ('html_section', 'professional', '*'): _HTML_SECTION,
+    ('html_charts', 'professional', '*'): _HTML_CHARTS,
+    ('html_tail', 'professional', '*'): _HTML_TAIL,
+    ('html_raw', 'professional', '*'): _HTML_RAW,
+    ('html_end', 'professional', '*'): _HTML_END,
+    ('text_head', 'professional', '*'): _TEXT_HEAD,
+    ('text_section', 'professional', '*'): _TEXT_SECTION,
+    ('text_tail', 'professional', '*'): _TEXT_TAIL,
+    ('text_raw', 'professional', '*'): _TEXT_RAW,
+    ('brief_markdown', 'professional', '*'): _BRIEF_MARKDOWN,
+    ('brief_text', 'professional', '*'): _BRIEF_TEXT,
+}
+
+def has_template(name: str, style: str = "professional", language: str = "zh") -> bool:
+    return any(key in TEMPLATES for key in _candidates(name, style, language))
+
+def _candidates(name: str, style: str, language: str):
+    return [(name, style, language), (name, style, '*'), (name, 'professional', language), (name, 'professional', '*')]
+
+@lru_cache(maxsize=None)
+def get_template(name: str, style: str = "professional", language: str = "zh") -> Callable[[Dict[str, Any]], Iterator[str]]:
+    """取编译后的模板（风格或语言没有专用模板时回退到 professional / 通用模板）"""
+    for key in _candidates(name, style, language):
+        if key in TEMPLATES:
+            return compile_template(TEMPLATES[key], "/".join(key))
+    raise TemplateError(f"模板不存在: {name}")
+
+def render(name: str, context: Dict[str, Any], write: Callable[[str], Any],
+           style: str = "professional", language: str = "zh"):
+    """渲染模板，逐段调用 write；context 中未提供 labels 时按语言补充"""
+    if 'labels' not in context:
+        context = {**context, 'labels': LABELS.get(language, LABELS['zh']), 'language': language}
+    for chunk in get_template(name, style, language)(context):
+        if chunk:
+            write(chunk)
+
+def render_to_string(name: str, context: Dict[str, Any], style: str = "professional", language: str = "zh") -> str:
+    chunks: List[str] = []
+    render(name, context, chunks.append, style, language)
+    return "".join(chunks)
@@ -0,0 +1,119 @@
+"""
+报告写入器 - ReportWriter
+异步缓冲写入（文本或二进制）：内容先写入目标目录下的临时文件，提交时原子替换目标文件；
+文件I/O在线程中执行，不阻塞事件循环。
+"""
+
+import os
+import asyncio
+import logging
+from typing import List, Optional, Union
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+class ReportWriter:
+    """报告文件写入器 - 一份报告只由一个写入器负责
+
+    write 缓冲小块内容（binary=True 时为字节），缓冲超过 buffer_size 个字符（字节）时写出；write_section 写入一个完整章节后立即写出。
+    commit 原子替换目标文件；失败或 abort 时删除临时文件，目标文件保持原状。
+    作为异步上下文管理器使用时，正常退出自动提交，异常退出自动放弃。
+    """
+
+    def __init__(self, path: str, buffer_size: int = 64 * 1024, encoding: str = 'utf-8', binary: bool = False):
+        self.path = Path(path)
+        self.buffer_size = buffer_size
+        self.encoding = encoding
+        self.binary = binary
+        self.chars_written = 0
+        self._tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.{id(self):x}.tmp")
+        self._buffer: List[str] = []
+        self._buffered = 0
+        self._file = None
+        self._closed = False
+
+    async def open(self) -> 'ReportWriter':
+        def open_tmp():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self.binary:
+                return open(self._tmp_path, 'wb')
+            return open(self._tmp_path, 'w', encoding=self.encoding)
+        self._file = await asyncio.to_thread(open_tmp)
+        return self
+
+    async def write(self, chunk: Union[str, bytes]):
+        """缓冲写入"""
+        if not chunk:
+            return
+        self._buffer.append(chunk)
+        self._buffered += len(chunk)
+        if self._buffered >= self.buffer_size:
+            await self.flush()
+
+    async def write_section(self, text: Union[str, bytes]):
+        """写入一个完整章节并立即写出"""
+        await self.write(text)
+        await self.flush()
+
+    async def flush(self):
+        if self._file is None:
+            raise RuntimeError("ReportWriter 未打开")
+        if not self._buffer:
+            return
+        data = (b"" if self.binary else "").join(self._buffer)
+        self._buffer.clear()
+        self._buffered = 0
+        await asyncio.to_thread(self._file.write, data)
+        self.chars_written += len(data)
+
+    async def commit(self) -> str:
+        """写出剩余内容并原子替换目标文件，返回目标路径"""
+        await self.flush()
+
+        def finish():
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            os.replace(self._tmp_path, self.path)
+
+        self._closed = True
+        try:
+            await asyncio.to_thread(finish)
+        except OSError:
+            self._tmp_path.unlink(missing_ok=True)
+            raise
+        logger.info(f"报告已保存: {self.path.absolute()}")
+        return str(self.path.absolute())
+
+    async def abort(self):
+        """放弃写入并删除临时文件"""
+        if self._closed:
+            return
+        self._closed = True
+        self._buffer.clear()
+
+        def discard():
+            if self._file is not None:
+                self._file.close()
+            self._tmp_path.unlink(missing_ok=True)
+
+        await asyncio.to_thread(discard)
+
+    async def __aenter__(self) -> 'ReportWriter':
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            await self.abort()
+        elif not self._closed:
+            await self.commit()
+
+async def write_report_file(path: str, report: str) -> Optional[str]:
+    """原子写入一份完整报告，失败时返回 None"""
+    try:
+        async with ReportWriter(path) as writer:
+            await writer.write_section(report)
+        return str(writer.path.absolute())
+    except OSError as e:
+        logger.error(f"保存报告失败: {e}")
+        return None
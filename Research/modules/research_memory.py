@@ -0,0 +1,238 @@
+"""
+调研记忆模块 - ResearchMemory
+对历史调研的查询、文献条目和报告章节建立本地向量索引，用于查找相似调研并复用结果。
+"""
+
+import os
+import re
+import json
+import uuid
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional
+from dataclasses import dataclass, asdict, is_dataclass
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from .relevance import tokenize
+
+try:
+    import hnswlib  # 可选：条目很多时使用近似最近邻索引
+except ImportError:
+    hnswlib = None
+
+logger = logging.getLogger(__name__)
+
+_SECTION_PATTERN = re.compile(r'^#{1,3}\s+(.+)$', re.MULTILINE)
+
+class HashingEmbedder:
+    """特征哈希向量化 - 无需模型文件，中英文分词后按哈希桶累加（次线性词频）"""
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts: Dict[str, int] = {}
+            for token in tokenize(text):
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                h = int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+                sign = 1.0 if (h >> 63) & 1 else -1.0
+                vectors[row, h % self.dim] += sign * (1.0 + np.log(tf))
+        return _normalize(vectors)
+
+class SentenceTransformerEmbedder:
+    """本地句向量模型（需安装 sentence-transformers）"""
+
+    def __init__(self, model_name: str = "paraphrase-multilingual-MiniLM-L12-v2"):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError("使用 SentenceTransformerEmbedder 需要安装 sentence-transformers") from e
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = f"st-{model_name.replace('/', '_')}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return _normalize(np.asarray(self.model.encode(texts), dtype=np.float32))
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+def _json_default(value):
+    if is_dataclass(value):
+        return asdict(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (np.integer, np.floating)):
+        return value.item()
+    return str(value)
+
+@dataclass
+class MemoryHit:
+    """检索命中"""
+    score: float
+    kind: str  # query, literature, section
+    record_id: str
+    query: str
+    text: str
+    url: Optional[str] = None
+
+class ResearchMemory:
+    """调研记忆索引 - 向量与条目追加写入磁盘，查询为归一化向量的点积（余弦相似度）
+
+    默认NumPy暴力检索；安装 hnswlib 且条目数达到 ann_min_items 时改用HNSW近似检索。
+    """
+
+    def __init__(self, memory_dir: Optional[str] = None, embedder=None, ann_min_items: int = 20000):
+        self.embedder = embedder or HashingEmbedder()
+        base_dir = memory_dir or os.path.join(os.getenv('RESEARCH_CACHE_DIR', 'cache'), 'memory')
+        # 不同向量化方式的向量不可比，各自独立存放
+        self.index_dir = Path(base_dir) / self.embedder.name
+        self.records_dir = self.index_dir / 'records'
+        self.ann_min_items = ann_min_items
+
+        self.entries: List[Dict[str, Any]] = []
+        self.vectors = np.zeros((0, self.embedder.dim), dtype=np.float32)
+        self._ann = None
+        self._load()
+
+    @property
+    def size(self) -> int:
+        return len(self.entries)
+
+    def _load(self):
+        entries_path, vectors_path = self.index_dir / 'entries.jsonl', self.index_dir / 'vectors.f32'
+        if not entries_path.exists() or not vectors_path.exists():
+            return
+        try:
+            with entries_path.open(encoding='utf-8') as f:
+                entries = [json.loads(line) for line in f if line.strip()]
+            vectors = np.fromfile(vectors_path, dtype=np.float32)
+            count = min(len(entries), len(vectors) // self.embedder.dim)  # 忽略中断写入留下的残缺尾部
+            self.entries = entries[:count]
+            self.vectors = vectors[:count * self.embedder.dim].reshape(count, self.embedder.dim)
+            logger.info(f"调研记忆已加载: {count} 个条目")
+        except (OSError, ValueError) as e:
+            logger.warning(f"调研记忆加载失败，已忽略: {e}")
+
+    def add_result(self, result) -> Optional[str]:
+        """索引一次调研结果（查询、文献条目、报告章节）并保存完整记录，返回记录ID"""
+        record_id = uuid.uuid4().hex
+        entries = [{'kind': 'query', 'text': result.query}]
+
+        literature = result.literature if isinstance(result.literature, dict) else {}
+        for key in ('github_results', 'paper_results', 'blog_results'):
+            for item in literature.get(key, []):
+                title, description = getattr(item, 'title', ''), getattr(item, 'description', '')
+                entries.append({'kind': 'literature', 'text': f"{title} {description}".strip(),
+                                'url': getattr(item, 'url', None)})
+
+        for title, body in self._split_sections(result.report or ''):
+            entries.append({'kind': 'section', 'text': f"{title}\n{body}".strip()})
+
+        try:
+            self.records_dir.mkdir(parents=True, exist_ok=True)
+            record = {'record_id': record_id, 'query': result.query, 'literature': result.literature,
+                      'data': result.data, 'analysis': result.analysis, 'report': result.report,
+                      'metadata': result.metadata, 'timestamp': result.timestamp,
+                      'saved_file_path': result.saved_file_path}
+            (self.records_dir / f"{record_id}.json").write_text(
+                json.dumps(record, ensure_ascii=False, default=_json_default), encoding='utf-8')
+        except OSError as e:
+            logger.warning(f"保存调研记录失败: {e}")
+            return None
+
+        self._append(entries, record_id, result.query)
+        return record_id
+
+    @staticmethod
+    def _split_sections(report: str):
+        """按标题拆分报告章节"""
+        matches = list(_SECTION_PATTERN.finditer(report))
+        for i, match in enumerate(matches):
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(report)
+            body = report[match.end():end].strip()
+            if body:
+                yield match.group(1).strip(), body[:2000]
+
+    def _append(self, entries: List[Dict[str, Any]], record_id: str, query: str):
+        vectors = self.embedder.embed([e['text'] for e in entries])
+        timestamp = datetime.now().isoformat()
+        for entry in entries:
+            entry.update({'record_id': record_id, 'query': query, 'timestamp': timestamp})
+            entry['text'] = entry['text'][:500]
+
+        try:
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            # 先写向量再写条目：加载时按两者的较小数量对齐
+            with (self.index_dir / 'vectors.f32').open('ab') as f:
+                f.write(vectors.astype(np.float32).tobytes())
+            with (self.index_dir / 'entries.jsonl').open('a', encoding='utf-8') as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.warning(f"写入调研记忆失败: {e}")
+
+        start = self.size
+        self.entries.extend(entries)
+        self.vectors = np.vstack([self.vectors, vectors])
+        if self._ann is not None:
+            self._ann.resize_index(self.size)
+            self._ann.add_items(vectors, np.arange(start, self.size))
+
+    def search(self, text: str, k: int = 5, kind: Optional[str] = None) -> List[MemoryHit]:
+        """检索最相似的k个条目，可按类型过滤"""
+        if not self.size or k <= 0:
+            return []
+        query_vector = self.embedder.embed([text])[0]
+
+        candidates = self._ann_candidates(query_vector, k * 4 if kind else k)
+        if candidates is None:
+            scores = self.vectors @ query_vector
+            if kind:
+                scores = np.where([e['kind'] == kind for e in self.entries], scores, -np.inf)
+            top = np.argpartition(-scores, min(k, self.size) - 1)[:k]
+            candidates = [(int(i), float(scores[i])) for i in top if np.isfinite(scores[i])]
+
+        hits = []
+        for position, score in sorted(candidates, key=lambda x: x[1], reverse=True):
+            entry = self.entries[position]
+            if kind and entry['kind'] != kind:
+                continue
+            hits.append(MemoryHit(score=round(score, 4), kind=entry['kind'], record_id=entry['record_id'],
+                                  query=entry['query'], text=entry['text'], url=entry.get('url')))
+        return hits[:k]
+
+    def _ann_candidates(self, query_vector: np.ndarray, k: int):
+        if hnswlib is None or self.size < self.ann_min_items:
+            return None
+        if self._ann is None:
+            self._ann = hnswlib.Index(space='ip', dim=self.embedder.dim)
+            self._ann.init_index(max_elements=self.size, ef_construction=200, M=16)
+            self._ann.add_items(self.vectors, np.arange(self.size))
+            self._ann.set_ef(max(k * 2, 50))
+        labels, distances = self._ann.knn_query(query_vector, k=min(k, self.size))
+        return [(int(label), 1.0 - float(distance)) for label, distance in zip(labels[0], distances[0])]
+
+    def find_similar_research(self, query: str, threshold: float = 0.9) -> Optional[MemoryHit]:
+        """查找与查询足够相似的历史调研"""
+        hits = self.search(query, k=1, kind='query')
+        if hits and hits[0].score >= threshold:
+            return hits[0]
+        return None
+
+    def load_record(self, record_id: str) -> Optional[Dict[str, Any]]:
+        """读取保存的调研记录"""
+        try:
+            return json.loads((self.records_dir / f"{record_id}.json").read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取调研记录失败: {record_id} ({e})")
+            return None
@@ -0,0 +1,90 @@
+"""
+阶段执行器 - StageExecutor
+将CPU密集的后处理步骤（数据清洗与分析、质量评估、报告渲染）移出事件循环线程。
+"""
+
+import os
+import asyncio
+import logging
+from typing import Any, Callable, Optional
+from dataclasses import dataclass
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ExecutorConfig:
+    """阶段执行器配置"""
+    mode: str = "inline"  # inline, thread, process
+    max_workers: Optional[int] = None  # None 表示使用 CPU 核数
+
+@dataclass
+class AgentSnapshot:
+    """ResearchAgent 的可序列化快照，仅保留模块在子进程中读取的属性"""
+    research_domain: str = "人工智能"
+    provider: str = "mock"
+    model: str = ""
+
+    def chat(self, message: str) -> str:
+        raise RuntimeError("子进程中不能调用 chat，LLM 调用应留在主进程")
+
+    async def achat(self, message: str) -> str:
+        return self.chat(message)
+
+    async def acomplete(self, message: str) -> str:
+        return self.chat(message)
+
+def snapshot_agent(agent) -> AgentSnapshot:
+    """生成 ResearchAgent 的快照"""
+    if agent is None or isinstance(agent, AgentSnapshot):
+        return agent
+    return AgentSnapshot(
+        research_domain=getattr(agent, 'research_domain', '人工智能'),
+        provider=getattr(agent, 'provider', 'mock'),
+        model=getattr(agent, 'model', '')
+    )
+
+class ProcessSafeModule:
+    """功能模块混入类 - 序列化时用快照替换 research_agent（其中的API客户端不可序列化）"""
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['research_agent'] = snapshot_agent(state.get('research_agent'))
+        state['executor'] = None
+        return state
+
+class StageExecutor:
+    """阶段执行器 - 按配置在当前线程、线程池或进程池中运行同步阶段函数"""
+
+    def __init__(self, config: Optional[ExecutorConfig] = None):
+        self.config = config or ExecutorConfig()
+        if self.config.mode not in ('inline', 'thread', 'process'):
+            raise ValueError(f"不支持的执行模式: {self.config.mode}")
+        self._pool: Optional[Executor] = None
+
+    @property
+    def max_workers(self) -> int:
+        return self.config.max_workers or os.cpu_count() or 1
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.config.mode == 'process':
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+            logger.info(f"StageExecutor 启动 {self.config.mode} 池 - {self.max_workers} 个工作者")
+        return self._pool
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """执行阶段函数；process 模式下参数和返回值必须可序列化"""
+        if self.config.mode == 'inline':
+            return func(*args, **kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_pool(), partial(func, *args, **kwargs))
+
+    def shutdown(self, wait: bool = True):
+        """关闭工作池"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
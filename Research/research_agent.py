@@ -5,12 +5,16 @@ Research Agent - 专业技术调研代理
 
 import os
 import sys
+import copy
+import json
+import time
 import asyncio
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Callable, Awaitable, Tuple, AsyncIterator
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, field, asdict
 from pathlib import Path
+from contextlib import asynccontextmanager
 
 # 添加AgentSdkTest路径
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'AgentSdkTest'))
@@ -36,6 +40,10 @@ class ResearchConfig:
     cache_results: bool = True
     save_to_file: bool = True
     reports_dir: str = "reports"
+    reuse_threshold: float = 0.0  # 大于0时，若历史调研查询的相似度达到该值则直接复用其结果
+    early_stop: bool = False  # 检索结果的增量质量分达到阈值后停止翻页
+    llm_sections: bool = False  # 报告各章节由LLM并发撰写
+    include_data: bool = True  # 为 False 时跳过数据处理阶段（只做文献调研，不加载数据处理模块）
 
 @dataclass
 class ResearchResult:
@@ -49,14 +57,67 @@ class ResearchResult:
     timestamp: datetime
     saved_file_path: Optional[str] = None
 
+@dataclass
+class PipelineStage:
+    """调研流水线阶段"""
+    name: str
+    run: Callable[[Dict[str, Any]], Awaitable[Any]]  # 参数为已完成阶段的结果
+    depends_on: Tuple[str, ...] = field(default_factory=tuple)
+
+async def run_stage_graph(stages: List[PipelineStage]) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """按依赖关系执行阶段：每个阶段在其依赖全部完成后立即启动，相互独立的阶段并发执行
+
+    Returns:
+        (results, timings): 各阶段结果和耗时（秒）
+    """
+    results: Dict[str, Any] = {}
+    timings: Dict[str, float] = {}
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def execute(stage: PipelineStage):
+        if stage.depends_on:
+            await asyncio.gather(*(tasks[dep] for dep in stage.depends_on))
+        start = time.perf_counter()
+        results[stage.name] = await stage.run(results)
+        timings[stage.name] = round(time.perf_counter() - start, 4)
+
+    for stage in stages:
+        tasks[stage.name] = asyncio.create_task(execute(stage))
+
+    try:
+        await asyncio.gather(*tasks.values())
+    except Exception:
+        for task in tasks.values():
+            task.cancel()
+        raise
+
+    return results, timings
+
 class ResearchAgent(UniversalTaskAgent):
     """专业技术调研代理 - 提供文献检索、数据分析和报告生成功能"""
 
-    def __init__(self, research_domain: str = "人工智能", **kwargs):
+    def __init__(self, research_domain: str = "人工智能", executor_mode: str = "inline",
+                 max_workers: Optional[int] = None, http_session=None, memory_dir: Optional[str] = None, **kwargs):
         super().__init__(task_description=f"专业{research_domain}领域技术调研助手", **kwargs)
         self.research_domain = research_domain
         self.config = ResearchConfig(research_domain=research_domain)
 
+        # CPU密集阶段的执行方式: inline(事件循环线程), thread, process
+        self.executor_mode = executor_mode
+        self.max_workers = max_workers
+        self.stage_executor = None
+
+        # 可选的外部 aiohttp.ClientSession，由调用方负责关闭
+        self.http_session = http_session
+
+        self.last_batch_index_path: Optional[str] = None
+        # 正在使用HTTP会话的作用域数（async with、批量调研、进行中的调研），归零时关闭自有会话
+        self._http_users = 0
+
+        # 历史调研的向量索引（默认位于 $RESEARCH_CACHE_DIR/memory）
+        self.memory_dir = memory_dir
+        self.memory = None
+
         system_prompt = f"""你是{research_domain}技术调研助手，专注于:
 - 文献检索和分析
 - 技术趋势识别
@@ -68,7 +129,7 @@ class ResearchAgent(UniversalTaskAgent):
 
         self.add_system_prompt(system_prompt)
 
-        # 初始化模块（延迟加载）
+        # 功能模块在对应阶段第一次用到时构建（见 _get_module）
         self.literature_retriever = None
         self.data_processor = None
         self.report_generator = None
@@ -84,39 +145,63 @@ class ResearchAgent(UniversalTaskAgent):
         except Exception as e:
             logger.error(f"创建reports目录失败: {e}")
 
-    def _generate_filename(self, timestamp: datetime) -> str:
-        """生成报告文件名"""
-        time_str = timestamp.strftime('%Y%m%d%H%M%S')
-        ext = 'md' if self.config.output_format == 'markdown' else self.config.output_format
-        return f"report{time_str}.{ext}"
-
-    def _save_report_to_file(self, report: str, filename: str) -> Optional[str]:
-        """保存报告到文件"""
-        try:
-            filepath = Path(self.config.reports_dir) / filename
-            filepath.write_text(report, encoding='utf-8')
-            logger.info(f"报告已保存: {filepath.absolute()}")
-            return str(filepath.absolute())
-        except Exception as e:
-            logger.error(f"保存报告失败: {e}")
-            return None
+    async def get_http_session(self):
+        """各阶段共用的 aiohttp 会话：外部传入的会话，或文献检索模块的连接池（随 close() 关闭）"""
+        if self.http_session is not None:
+            return self.http_session
+        retriever = self._get_module('literature_retriever')
+        return await retriever.get_session() if hasattr(retriever, 'get_session') else None
+
+    def get_report_store(self, reports_dir: Optional[str] = None):
+        """报告目录（默认配置中的 reports_dir）对应的报告存储"""
+        from modules.registry import registry
+        return registry.report_store(str(reports_dir or self.config.reports_dir))
+
+    def find_reports(self, reports_dir: Optional[str] = None, **filters) -> List[Any]:
+        """按查询、领域、时间等条件从报告索引中查找历史报告（参数同 ReportStore.find）"""
+        return self.get_report_store(reports_dir).find(**filters)
+
+    # 功能模块属性 -> 模块导入失败时的基础实现
+    _FALLBACK_MODULES = {
+        'literature_retriever': '_basic_literature_search',
+        'data_processor': '_basic_data_processing',
+        'report_generator': '_basic_report_generation',
+        'quality_checker': '_basic_quality_check',
+    }
+
+    def _get_module(self, name: str) -> Any:
+        """取功能模块，第一次用到时构建
+
+        模块类由进程级注册表导入（每个进程一次），因此只做文献检索的调研不会导入数据处理模块及 pandas；
+        阶段执行器和调研记忆由同参数的代理共享。
+        """
+        module = getattr(self, name)
+        if module is None:
+            try:
+                module = self._build_module(name)
+            except ImportError as e:
+                logger.warning(f"模块导入失败: {e}")
+                fallback = self._FALLBACK_MODULES.get(name)
+                module = getattr(self, fallback) if fallback else None
+            setattr(self, name, module)
+        return module
+
+    def _build_module(self, name: str) -> Any:
+        from modules.registry import registry
+        if name == 'memory':
+            return registry.memory(self.memory_dir)
+        module_class = registry.module_class(name)
+        if name == 'literature_retriever':
+            return module_class(self, session=self.http_session)
+        if self.stage_executor is None:
+            self.stage_executor = registry.executor(self.executor_mode, self.max_workers)
+        return module_class(self, self.stage_executor)
 
     def _init_modules(self):
-        """初始化功能模块"""
-        try:
-            from modules.literature_retriever import LiteratureRetriever
-            from modules.data_processor import DataProcessor
-            from modules.report_generator import ReportGenerator
-            from modules.quality_checker import QualityChecker
-
-            self.literature_retriever = LiteratureRetriever(self)
-            self.data_processor = DataProcessor(self)
-            self.report_generator = ReportGenerator(self)
-            self.quality_checker = QualityChecker(self)
-            logger.info("功能模块初始化成功")
-        except ImportError as e:
-            logger.warning(f"模块导入失败: {e}")
-            self._init_basic_modules()
+        """一次构建全部功能模块"""
+        for name in ('literature_retriever', 'data_processor', 'report_generator', 'quality_checker', 'memory'):
+            self._get_module(name)
+        logger.info("功能模块初始化成功")
 
     def _init_basic_modules(self):
         """初始化基础功能模块（回退方案）"""
@@ -126,32 +211,53 @@ class ResearchAgent(UniversalTaskAgent):
         self.quality_checker = self._basic_quality_check
 
     async def conduct_research(self, query: str, **options) -> ResearchResult:
-        """执行完整的技术调研流程"""
+        """执行完整的技术调研流程
+
+        未在 async with 或批量调研中使用时，调研结束后关闭本代理自有的HTTP会话（下次调研时重建）。
+        """
+        async with self._http_scope():
+            return await self._conduct_research(query, **options)
+
+    async def _conduct_research(self, query: str, **options) -> ResearchResult:
         logger.info(f"开始执行技术调研: {query}")
 
         # 过滤有效参数并创建配置
         valid_keys = {'research_domain', 'max_sources', 'output_format',
                       'include_github', 'include_papers', 'include_blogs',
-                      'cache_results', 'save_to_file', 'reports_dir'}
+                      'cache_results', 'save_to_file', 'reports_dir', 'reuse_threshold', 'early_stop',
+                      'llm_sections', 'include_data'}
         config = ResearchConfig(**{k: v for k, v in options.items() if k in valid_keys})
 
-        # 初始化模块
-        if not self.literature_retriever:
-            self._init_modules()
+        if config.reuse_threshold > 0:
+            reused = self._reuse_research(query, config.reuse_threshold)
+            if reused:
+                return reused
 
         try:
-            # 执行调研步骤
-            literature_data = await self._search_literature(query, config)
-            processed_data = await self._process_data(query, config)
-            quality_report = await self._check_quality({'literature': literature_data, 'data': processed_data, 'query': query})
-            analysis_report = await self._generate_analysis({'literature': literature_data, 'data': processed_data, 'quality': quality_report})
-            final_report = await self._generate_report({'query': query, 'literature': literature_data, 'data': processed_data, 'analysis': analysis_report, 'quality': quality_report, 'config': config})
-
-            # 保存报告
-            saved_file_path = None
-            if config.save_to_file:
-                filename = self._generate_filename(datetime.now())
-                saved_file_path = self._save_report_to_file(final_report, filename)
+            # 执行调研步骤：文献检索与数据处理相互独立，并发执行
+            stages = [
+                PipelineStage('literature', lambda r: self._search_literature(query, config)),
+                PipelineStage('data', lambda r: self._process_data(query, config)),
+                PipelineStage('quality', lambda r: self._check_quality(
+                    {'literature': r['literature'], 'data': r['data'], 'query': query}),
+                    depends_on=('literature', 'data')),
+                PipelineStage('analysis', lambda r: self._generate_analysis(
+                    {'literature': r['literature'], 'data': r['data'], 'quality': r['quality']}),
+                    depends_on=('quality',)),
+                PipelineStage('report', lambda r: self._generate_report(
+                    {'query': query, 'literature': r['literature'], 'data': r['data'], 'analysis': r['analysis'],
+                     'quality': r['quality'], 'config': config}),
+                    depends_on=('analysis',)),
+            ]
+            pipeline_start = time.perf_counter()
+            stage_results, stage_timings = await run_stage_graph(stages)
+            total_duration = round(time.perf_counter() - pipeline_start, 4)
+
+            literature_data = stage_results['literature']
+            processed_data = stage_results['data']
+            analysis_report = stage_results['analysis']
+            # 报告文件由报告阶段在生成时写入
+            final_report, saved_file_path = stage_results['report']
 
             result = ResearchResult(
                 query=query,
@@ -165,12 +271,15 @@ class ResearchAgent(UniversalTaskAgent):
                     'provider': self.provider,
                     'model': self.model,
                     'timestamp': datetime.now().isoformat(),
-                    'saved_file_path': saved_file_path
+                    'saved_file_path': saved_file_path,
+                    'stage_timings': stage_timings,
+                    'total_duration': total_duration
                 },
                 timestamp=datetime.now(),
                 saved_file_path=saved_file_path
             )
 
+            self._remember(result)
             logger.info(f"技术调研完成: {query}")
             return result
 
@@ -182,22 +291,171 @@ class ResearchAgent(UniversalTaskAgent):
                 metadata={'error': str(e)}, timestamp=datetime.now()
             )
 
-    async def _call_module(self, module, *args, **kwargs) -> Any:
-        """统一调用模块（同步/异步）"""
-        if asyncio.iscoroutinefunction(module):
-            return await module(*args, **kwargs)
-        elif callable(module):
-            return module(*args, **kwargs)
+    def find_similar_research(self, query: str, k: int = 5, kind: Optional[str] = None) -> List[Any]:
+        """在历史调研中检索相似的查询、文献条目或报告章节（kind: query/literature/section）"""
+        memory = self._get_module('memory')
+        if not memory:
+            return []
+        return memory.search(query, k=k, kind=kind)
+
+    def _remember(self, result: ResearchResult):
+        """将调研结果加入历史索引"""
+        memory = self._get_module('memory')
+        if not memory:
+            return
+        try:
+            memory.add_result(result)
+        except Exception as e:
+            logger.warning(f"调研结果加入历史索引失败: {e}")
+
+    def _reuse_research(self, query: str, threshold: float) -> Optional[ResearchResult]:
+        """复用足够相似的历史调研结果，跳过检索和LLM调用"""
+        memory = self._get_module('memory')
+        if not memory:
+            return None
+        hit = memory.find_similar_research(query, threshold)
+        record = memory.load_record(hit.record_id) if hit else None
+        if not record:
+            return None
+
+        from modules.literature_retriever.literature_retriever import SearchResult
+
+        literature = record.get('literature') or {}
+        for key in ('github_results', 'paper_results', 'blog_results'):
+            if isinstance(literature.get(key), list):
+                literature[key] = [
+                    SearchResult(**{**item, 'timestamp': datetime.fromisoformat(item['timestamp'])})
+                    for item in literature[key] if isinstance(item, dict)
+                ]
+
+        logger.info(f"复用历史调研: {hit.query} (相似度 {hit.score:.2f})")
+        return ResearchResult(
+            query=query,
+            literature=literature,
+            data=record.get('data', {}),
+            analysis=record.get('analysis', {}),
+            report=record.get('report', ''),
+            metadata={**record.get('metadata', {}),
+                      'reused_from': {'record_id': hit.record_id, 'query': hit.query, 'similarity': hit.score}},
+            timestamp=datetime.now(),
+            saved_file_path=record.get('saved_file_path')
+        )
+
+    async def achat(self, message: str) -> str:
+        """在线程池中执行一次性 chat，不阻塞事件循环
+
+        以当前对话历史为上下文，在对话副本上执行、不写回历史：
+        并发调研中的LLM调用互不等待，同一代理上的大量调研也不会让每次请求的上下文不断增长。
+        """
+        return await self._chat_detached(message, list(self.conversation_history))
+
+    async def acomplete(self, message: str) -> str:
+        """无状态的一次性调用 - 在只含系统提示的对话副本上执行，可与其他调用并发"""
+        return await self._chat_detached(message, [m for m in self.conversation_history if m['role'] == 'system'])
+
+    async def _chat_detached(self, message: str, history: List[Dict[str, Any]]) -> str:
+        def run():
+            worker = copy.copy(self)
+            worker.conversation_history = history
+            return worker.chat(message)
+        return await asyncio.to_thread(run)
+
+    async def close(self):
+        """释放本代理占用的资源（HTTP会话）；共享的阶段执行器由注册表在进程退出时关闭"""
+        if hasattr(self.literature_retriever, 'close'):
+            await self.literature_retriever.close()
+        self.stage_executor = None
+
+    @asynccontextmanager
+    async def _http_scope(self):
+        self._http_users += 1
+        try:
+            yield
+        finally:
+            self._http_users -= 1
+            if not self._http_users and hasattr(self.literature_retriever, 'close'):
+                await self.literature_retriever.close()
+
+    async def conduct_research_many(self, queries: List[str], concurrency: int = 4,
+                                    **options) -> AsyncIterator[ResearchResult]:
+        """批量技术调研 - 复用本代理及其模块实例，按完成顺序逐个产出结果
+
+        保存报告时，批次结束后在reports目录写入汇总索引（路径见 last_batch_index_path）。
+        """
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+        async def run(query: str) -> ResearchResult:
+            async with semaphore:
+                return await self.conduct_research(query, **options)
+
+        async with self._http_scope():
+            tasks = [asyncio.create_task(run(query)) for query in queries]
+            entries = []
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    result = await next_done
+                    entries.append({
+                        'query': result.query,
+                        'status': 'failed' if 'error' in result.metadata else 'completed',
+                        'saved_file_path': result.saved_file_path,
+                        'timestamp': result.timestamp.isoformat(),
+                        'total_duration': result.metadata.get('total_duration')
+                    })
+                    yield result
+            finally:
+                # 调用方提前停止迭代时取消未完成的调研，并等待其结束
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                if entries and options.get('save_to_file', True):
+                    self.last_batch_index_path = self._write_batch_index(entries, options.get('reports_dir', self.config.reports_dir))
+
+    def _write_batch_index(self, entries: List[Dict[str, Any]], reports_dir: str) -> Optional[str]:
+        """写入批量调研的报告索引"""
+        from modules.report_store import new_ulid
+
+        try:
+            index_path = Path(reports_dir) / f"index{new_ulid()}.json"
+            index_path.parent.mkdir(parents=True, exist_ok=True)
+            index = {'generated_at': datetime.now().isoformat(), 'research_domain': self.research_domain,
+                     'total': len(entries), 'reports': entries}
+            index_path.write_text(json.dumps(index, ensure_ascii=False, indent=2), encoding='utf-8')
+            logger.info(f"批量调研索引已保存: {index_path.absolute()}")
+            return str(index_path.absolute())
+        except Exception as e:
+            logger.error(f"保存批量调研索引失败: {e}")
+            return None
+
+    async def __aenter__(self) -> 'ResearchAgent':
+        self._http_users += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._http_users -= 1
+        await self.close()
+
+    async def _call_module(self, module, method: str, *args, **kwargs) -> Any:
+        """统一调用模块（同步/异步）；功能模块调用其入口方法，回退方案直接调用函数"""
+        func = getattr(module, method, module)
+        if asyncio.iscoroutinefunction(func):
+            return await func(*args, **kwargs)
+        elif callable(func):
+            return func(*args, **kwargs)
         return None
 
     async def _search_literature(self, query: str, config: ResearchConfig) -> Dict[str, Any]:
         """执行文献检索"""
         try:
-            result = await self._call_module(self.literature_retriever, query, config)
+            options = {}
+            if config.early_stop:
+                quality_checker = self._get_module('quality_checker')
+                if hasattr(quality_checker, 'incremental'):
+                    options['stop_when'] = quality_checker.incremental(query).update_and_check
+            result = await self._call_module(self._get_module('literature_retriever'), 'search', query, config, **options)
             if result:
                 return result
             # AI辅助回退
-            response = self.chat(f"为'{query}'提供文献搜索建议（领域：{self.research_domain}，最多{config.max_sources}条）")
+            response = await self.achat(f"为'{query}'提供文献搜索建议（领域：{self.research_domain}，最多{config.max_sources}条）")
             return {'search_suggestions': response, 'sources': ['AI建议'], 'status': 'ai_suggestions'}
         except Exception as e:
             logger.error(f"文献检索失败: {e}")
@@ -205,11 +463,13 @@ class ResearchAgent(UniversalTaskAgent):
 
     async def _process_data(self, query: str, config: ResearchConfig) -> Dict[str, Any]:
         """处理研究数据"""
+        if not config.include_data:
+            return {'status': 'skipped'}
         try:
-            result = await self._call_module(self.data_processor, query, config)
+            result = await self._call_module(self._get_module('data_processor'), 'process', query)
             if result:
                 return result
-            response = self.chat(f"为'{query}'提供数据处理建议（领域：{self.research_domain}）")
+            response = await self.achat(f"为'{query}'提供数据处理建议（领域：{self.research_domain}）")
             return {'processing_suggestions': response, 'data_sources': ['AI建议'], 'status': 'ai_suggestions'}
         except Exception as e:
             logger.error(f"数据处理失败: {e}")
@@ -218,11 +478,16 @@ class ResearchAgent(UniversalTaskAgent):
     async def _check_quality(self, research_data: Dict[str, Any]) -> Dict[str, Any]:
         """执行质量检查"""
         try:
-            result = await self._call_module(self.quality_checker, research_data)
+            quality_checker = self._get_module('quality_checker')
+            result = await self._call_module(quality_checker, 'check', research_data)
+            if result and not isinstance(result, dict):
+                # QualityChecker 返回 QualityScore，转换为与其他阶段一致的字典
+                return {**asdict(result), 'quality_assessment': quality_checker.get_quality_summary(result),
+                        'status': 'completed'}
             if result:
                 return result
             query = research_data.get('query', 'N/A')
-            response = self.chat(f"评估研究数据质量（查询：{query}，文献大小：{len(str(research_data.get('literature', {})))}字符）")
+            response = await self.achat(f"评估研究数据质量（查询：{query}，文献大小：{len(str(research_data.get('literature', {})))}字符）")
             return {'quality_assessment': response, 'overall_score': 8.0, 'recommendations': ['建议添加更多数据源'], 'status': 'ai_assessment'}
         except Exception as e:
             logger.error(f"质量检查失败: {e}")
@@ -231,101 +496,100 @@ class ResearchAgent(UniversalTaskAgent):
     async def _generate_analysis(self, research_data: Dict[str, Any]) -> Dict[str, Any]:
         """生成分析报告"""
         try:
-            lit = str(research_data.get('literature', {}))[:500]
+            lit = self._summarize_literature(research_data.get('literature', {}))
             data_status = research_data.get('data', {}).get('status', 'unknown')
             quality_status = research_data.get('quality', {}).get('status', 'unknown')
-            prompt = f"基于以下数据生成技术分析（领域：{self.research_domain}）：文献：{lit}...，数据状态：{data_status}，质量：{quality_status}"
-            response = self.chat(prompt)
+            prompt = f"基于以下数据生成技术分析（领域：{self.research_domain}）：\n文献：\n{lit}\n数据状态：{data_status}，质量：{quality_status}"
+            response = await self.achat(prompt)
             return {'analysis_report': response, 'key_findings': ['基于AI生成'], 'trends': ['技术趋势'], 'status': 'completed'}
         except Exception as e:
             logger.error(f"分析生成失败: {e}")
             return {'error': str(e), 'status': 'failed'}
 
-    async def _generate_report(self, research_data: Dict[str, Any]) -> str:
-        """生成最终报告"""
+    def _summarize_literature(self, literature: Dict[str, Any], limit: int = 10) -> str:
+        """将检索结果压缩为分析提示词中的条目列表"""
+        top_results = literature.get('search_summary', {}).get('top_results', []) if isinstance(literature, dict) else []
+        if not top_results:
+            return literature.get('search_suggestions', str(literature)[:500]) if isinstance(literature, dict) else str(literature)[:500]
+
+        lines = [f"共{literature.get('total_results', len(top_results))}条结果，相关性最高的{min(limit, len(top_results))}条："]
+        for item in top_results[:limit]:
+            lines.append(f"- [{item['source']}] {item['title']} (相关性 {item['relevance_score']:.1f}) {item['url']}")
+        return "\n".join(lines)
+
+    async def _generate_report(self, research_data: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+        """生成最终报告并按配置保存（报告文件只写入一次，保存后登记到报告索引）
+
+        Returns:
+            (report, saved_file_path)
+        """
+        config = research_data.get('config') or ResearchConfig()
+        store = report_id = output_path = None
+        if config.save_to_file:
+            store = self.get_report_store(config.reports_dir)
+            report_id, path = store.allocate(config.output_format)
+            output_path = str(path)
+
         try:
-            fmt = research_data.get('config', ResearchConfig()).output_format
-            if fmt == 'markdown':
-                return self._generate_markdown_report(research_data)
-            return self._generate_text_report(research_data)
+            report_generator = self._get_module('report_generator')
+            if hasattr(report_generator, 'generate_to_file'):
+                report, saved_file_path = await report_generator.generate_to_file(
+                    research_data, config, output_path=output_path, save=output_path is not None)
+            else:
+                if config.output_format == 'markdown':
+                    report = self._generate_markdown_report(research_data)
+                else:
+                    report = self._generate_text_report(research_data)
+                saved_file_path = None
+                if output_path is not None:
+                    from modules.report_writer import write_report_file
+                    saved_file_path = await write_report_file(output_path, report)
         except Exception as e:
             logger.error(f"报告生成失败: {e}")
-            return f"报告生成失败: {e}"
+            return f"报告生成失败: {e}", None
+
+        if saved_file_path:
+            quality = research_data.get('quality')
+            try:
+                await asyncio.to_thread(
+                    store.register, report_id, config.output_format, saved_file_path,
+                    query=research_data.get('query', ''), domain=self.research_domain,
+                    score=quality.get('overall_score') if isinstance(quality, dict) else None)
+            except Exception as e:
+                logger.warning(f"报告索引登记失败: {e}")
+        return report, saved_file_path
 
     def _generate_markdown_report(self, data: Dict[str, Any]) -> str:
-        """生成Markdown格式报告"""
-        query = data.get('query', 'Unknown Research')
-        ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        lit = data.get('literature', {}).get('search_suggestions', '暂无')
-        proc = data.get('data', {}).get('processing_suggestions', '暂无')
-        qual = data.get('quality', {}).get('quality_assessment', '暂无')
-        ana = data.get('analysis', {}).get('analysis_report', '暂无')
-
-        return f"""# {query} - 技术调研报告
-
-## 研究概述
-- **研究领域**: {self.research_domain}
-- **调研时间**: {ts}
-- **AI模型**: {self.provider} - {self.model}
-
-## 执行摘要
-本报告基于多源数据收集和分析，提供了关于"{query}"的技术调研结果。
-
-## 文献检索结果
-{lit}
-
-## 数据收集分析
-{proc}
-
-## 质量评估
-{qual}
-
-## 技术分析
-{ana}
-
-## 关键发现
-- 基于AI辅助生成的调研结果
-- 多源数据收集和处理
-- 自动化质量评估和分析
-
-## 建议
-1. 扩展数据源和检索范围
-2. 深入分析特定技术细节
-3. 跟踪最新发展趋势
-4. 进行专家验证和反馈
-
----
-*本报告由Research Agent自动生成，建议结合人工验证。*
-"""
+        """生成Markdown格式简要报告（功能模块不可用时使用）"""
+        return self._render_brief_report('brief_markdown', data)
 
     def _generate_text_report(self, data: Dict[str, Any]) -> str:
-        """生成纯文本格式报告"""
-        query = data.get('query', 'Unknown Research')
-        ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        ana = data.get('analysis', {}).get('analysis_report', '分析中...')
-
-        return f"""{query} - 技术调研报告
-
-生成时间: {ts}
-研究领域: {self.research_domain}
-
-=== 执行摘要 ===
-本报告基于AI辅助的技术调研。
-
-=== 主要发现 ===
-{ana}
-
-=== 建议 ===
-1. 扩展更多数据源
-2. 进行深度技术分析
-3. 结合专家意见验证
-"""
+        """生成纯文本格式简要报告（功能模块不可用时使用）"""
+        return self._render_brief_report('brief_text', data)
+
+    def _render_brief_report(self, template: str, data: Dict[str, Any]) -> str:
+        from modules.report_templates import render_to_string
+
+        def field(key: str, name: str, default: str = '暂无') -> Any:
+            value = data.get(key, {})
+            return value.get(name, default) if isinstance(value, dict) else default
+
+        return render_to_string(template, {
+            'query': data.get('query', 'Unknown Research'),
+            'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'research_domain': self.research_domain,
+            'model_info': f"{self.provider} - {self.model}",
+            'literature': field('literature', 'search_suggestions'),
+            'data': field('data', 'processing_suggestions'),
+            'quality': field('quality', 'quality_assessment'),
+            'analysis': field('analysis', 'analysis_report')
+        })
 
     # 基础功能（回退方案）
     def _basic_literature_search(self, query: str, config: ResearchConfig) -> Dict[str, Any]:
         return {'status': 'basic_search', 'query': query}
 
-    def _basic_data_processing(self, query: str, config: ResearchConfig) -> Dict[str, Any]:
+    def _basic_data_processing(self, query: str, config: Optional[ResearchConfig] = None) -> Dict[str, Any]:
         return {'status': 'basic_processing', 'query': query}
 
     def _basic_report_generation(self, research_data: Dict[str, Any]) -> str:
@@ -338,26 +602,25 @@ class ResearchAgent(UniversalTaskAgent):
 async def quick_research(query: str, research_domain: str = "人工智能", **kwargs) -> ResearchResult:
     """快速技术调研函数"""
     agent_kwargs = {k: v for k, v in kwargs.items() if k in {'provider', 'model', 'task_description'}}
-    agent = ResearchAgent(research_domain=research_domain, **agent_kwargs)
-    return await agent.conduct_research(query, **kwargs)
+    async with ResearchAgent(research_domain=research_domain, **agent_kwargs) as agent:
+        return await agent.conduct_research(query, **kwargs)
 
 if __name__ == "__main__":
     async def test_research_agent():
         """测试Research Agent"""
         print("=== Research Agent 测试 ===")
-        agent = ResearchAgent(
+        async with ResearchAgent(
             research_domain="人工智能",
             provider="claude",
             api_key=os.getenv('ANTHROPIC_API_KEY'),
             base_url=os.getenv('ANTHROPIC_BASE_URL', 'https://open.bigmodel.cn/api/anthropic')
-        )
-
-        result = await agent.conduct_research(
-            query="bmad使用方法",
-            max_sources=10,
-            output_format="markdown",
-            save_to_file=True
-        )
+        ) as agent:
+            result = await agent.conduct_research(
+                query="bmad使用方法",
+                max_sources=10,
+                output_format="markdown",
+                save_to_file=True
+            )
 
         print(f"查询: {result.query}")
         print(f"时间: {result.timestamp}")
@@ -0,0 +1,1668 @@
+"""
+Research Agent 功能模块测试
+
+测试各功能模块的独立行为:
+- 阶段执行器
+- 文献检索HTTP会话
+- 检索结果缓存
+- 分页流式检索
+- arXiv增量解析
+- BM25相关性评分
+- 跨来源结果去重
+- 历史调研向量索引
+- 列式数据处理
+- 数据收集器
+- 流式记录聚合
+- 列式与增量质量评分
+- LLM批量内容验证
+- 报告模板引擎
+- 报告流式原子写入
+- 报告章节并发生成
+- 多格式报告导出
+- 报告存储与索引
+- SVG图表渲染
+- 模块注册表与延迟构建
+"""
+
+import asyncio
+import sys
+import os
+import json
+import pickle
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# 添加项目路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from research_agent import ResearchAgent
+    from modules.data_processor import DataProcessor
+    from modules.stage_executor import StageExecutor, ExecutorConfig, AgentSnapshot
+    from modules.literature_retriever import LiteratureRetriever, SearchCache
+except ImportError as e:
+    print(f"导入错误: {e}")
+    ResearchAgent = None
+
+_sandbox = {}
+
+def setUpModule():
+    """缓存与默认报告目录都放到临时目录中，测试不在源码树里留下文件"""
+    tmp = tempfile.TemporaryDirectory()
+    env = patch.dict(os.environ, {'RESEARCH_CACHE_DIR': os.path.join(tmp.name, 'cache')})
+    env.start()
+    _sandbox.update(tmp=tmp, env=env, cwd=os.getcwd())
+    os.chdir(tmp.name)
+
+def tearDownModule():
+    os.chdir(_sandbox['cwd'])
+    _sandbox['env'].stop()
+    _sandbox['tmp'].cleanup()
+
+def run_async_test(coro):
+    """运行异步测试的辅助函数"""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+class TestStageExecutor(unittest.TestCase):
+    """阶段执行器测试"""
+
+    def setUp(self):
+        if ResearchAgent is None:
+            self.skipTest("ResearchAgent未正确导入")
+        self.agent = ResearchAgent(research_domain="执行器测试", provider="mock")
+
+    def test_module_pickles_with_agent_snapshot(self):
+        """测试模块序列化时用快照替换代理"""
+        processor = DataProcessor(self.agent, collectors=[])
+        restored = pickle.loads(pickle.dumps(processor))
+
+        self.assertIsInstance(restored.research_agent, AgentSnapshot)
+        self.assertEqual(restored.research_agent.research_domain, "执行器测试")
+        self.assertIsNone(restored.executor)
+
+    def test_process_mode_matches_inline(self):
+        """测试进程池模式与内联模式结果一致"""
+        processor = DataProcessor(self.agent, collectors=[])
+        raw_data = processor._generate_simulated_data("测试")
+
+        inline = StageExecutor()
+        pool = StageExecutor(ExecutorConfig(mode='process', max_workers=1))
+        try:
+            expected = run_async_test(inline.run(processor._process_records, list(raw_data), "测试"))
+            actual = run_async_test(pool.run(processor._process_records, list(raw_data), "测试"))
+        finally:
+            pool.shutdown()
+
+        self.assertEqual(actual['processing_summary']['total_records'], expected['processing_summary']['total_records'])
+        self.assertEqual(actual['statistics']['source_distribution'], expected['statistics']['source_distribution'])
+
+    def test_invalid_mode(self):
+        """测试不支持的执行模式"""
+        with self.assertRaises(ValueError):
+            StageExecutor(ExecutorConfig(mode='gpu'))
+
+class TestLiteratureSession(unittest.TestCase):
+    """文献检索HTTP会话测试"""
+
+    def setUp(self):
+        if ResearchAgent is None:
+            self.skipTest("ResearchAgent未正确导入")
+        self.agent = ResearchAgent(research_domain="会话测试", provider="mock")
+
+    def test_session_reused_and_closed(self):
+        """测试自有会话跨请求复用并在关闭时释放"""
+        async def scenario():
+            retriever = LiteratureRetriever(self.agent)
+            first = await retriever.get_session()
+            second = await retriever.get_session()
+            await retriever.close()
+            return first, second
+
+        first, second = run_async_test(scenario())
+        self.assertIs(first, second)
+        self.assertTrue(first.closed)
+
+    def test_injected_session_not_closed(self):
+        """测试注入的会话由调用方负责关闭"""
+        import aiohttp
+
+        async def scenario():
+            async with aiohttp.ClientSession() as session:
+                async with LiteratureRetriever(self.agent, session=session) as retriever:
+                    self.assertIs(await retriever.get_session(), session)
+                return session.closed
+
+        self.assertFalse(run_async_test(scenario()))
+
+class TestSearchCache(unittest.TestCase):
+    """检索结果缓存测试"""
+
+    def setUp(self):
+        if ResearchAgent is None:
+            self.skipTest("ResearchAgent未正确导入")
+        self.agent = ResearchAgent(research_domain="缓存测试", provider="mock")
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def test_key_normalizes_query(self):
+        """测试缓存键忽略大小写和多余空白"""
+        self.assertEqual(SearchCache.make_key('github', 'Agent  SDK', per_page=10),
+                         SearchCache.make_key('github', ' agent sdk', per_page=10))
+        self.assertNotEqual(SearchCache.make_key('github', 'agent sdk', per_page=10),
+                            SearchCache.make_key('github', 'agent sdk', per_page=20))
+
+    def test_streaming_writer(self):
+        """测试流式写入的条目与 set 写入的读取方式相同，放弃写入时不留下文件"""
+        cache = SearchCache(self.tmp_dir.name)
+        writer = cache.writer('k', etag='"e"')
+        for i in range(3):
+            writer.add({'i': i, 'title': '标题'})
+        writer.commit()
+        writer.abort()
+
+        entry = cache.get('k')
+        self.assertEqual(entry.payload, [{'i': 0, 'title': '标题'}, {'i': 1, 'title': '标题'}, {'i': 2, 'title': '标题'}])
+        self.assertEqual(entry.etag, '"e"')
+        self.assertTrue(entry.is_fresh(60))
+
+        empty = cache.writer('empty')
+        empty.commit()
+        self.assertEqual(cache.get('empty').payload, [])
+
+        aborted = cache.writer('aborted')
+        aborted.add({'i': 0})
+        aborted.abort()
+        self.assertIsNone(cache.get('aborted'))
+        self.assertEqual(sorted(os.listdir(self.tmp_dir.name)), ['empty.json', 'k.json'])
+
+    def test_concurrent_writes_same_key(self):
+        """测试同一进程内多个线程同时写同一个键时临时文件互不冲突"""
+        from concurrent.futures import ThreadPoolExecutor
+        cache = SearchCache(self.tmp_dir.name)
+        writers = [cache.writer('k'), cache.writer('k')]
+        self.assertNotEqual(writers[0]._tmp_path, writers[1]._tmp_path)
+        for writer in writers:
+            writer.abort()
+
+        with self.assertNoLogs('modules.literature_retriever.search_cache', level='WARNING'):
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                list(pool.map(lambda i: cache.set('k', {'i': i, 'data': 'x' * 10000}), range(64)))
+        self.assertIn(cache.get('k').payload['i'], range(64))
+        self.assertEqual(os.listdir(self.tmp_dir.name), ['k.json'])
+
+    def test_github_conditional_request(self):
+        """测试缓存过期后发送 If-None-Match 并复用304响应"""
+        from aiohttp import web
+
+        requests_seen = []
+        repo = {'name': 'agent', 'full_name': 'org/agent', 'html_url': 'https://github.com/org/agent',
+                'description': 'agent sdk', 'stargazers_count': 10, 'forks_count': 1, 'language': 'Python',
+                'updated_at': '2025-01-01T00:00:00Z'}
+
+        async def handler(request):
+            requests_seen.append(request.headers.get('If-None-Match'))
+            if request.headers.get('If-None-Match') == '"v1"':
+                return web.Response(status=304)
+            return web.json_response({'items': [repo]}, headers={'ETag': '"v1"'})
+
+        async def scenario():
+            app = web.Application()
+            app.router.add_get('/search/repositories', handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+
+            retriever = LiteratureRetriever(self.agent, cache=SearchCache(self.tmp_dir.name))
+            retriever.github_token = 'test-token'
+            retriever.github_api_base = f'http://127.0.0.1:{port}'
+            try:
+                first = await retriever._search_github('agent')
+                cached = await retriever._search_github('agent')  # 缓存未过期，不发请求
+                # 使缓存条目过期
+                for path in retriever.cache.cache_dir.glob('*.json'):
+                    data = json.loads(path.read_text(encoding='utf-8'))
+                    data['stored_at'] = 0
+                    path.write_text(json.dumps(data), encoding='utf-8')
+                revalidated = await retriever._search_github('agent')
+            finally:
+                await retriever.close()
+                await runner.cleanup()
+            return first, cached, revalidated
+
+        first, cached, revalidated = run_async_test(scenario())
+        self.assertEqual([r.title for r in first], ['org/agent'])
+        self.assertEqual([r.title for r in cached], ['org/agent'])
+        self.assertEqual([r.title for r in revalidated], ['org/agent'])
+        self.assertEqual(requests_seen, [None, '"v1"'])
+
+class TestPaginatedSearch(unittest.TestCase):
+    """分页流式检索测试"""
+
+    def setUp(self):
+        if ResearchAgent is None:
+            self.skipTest("ResearchAgent未正确导入")
+        self.agent = ResearchAgent(research_domain="分页测试", provider="mock")
+
+    def test_github_pages_streamed_beyond_single_page(self):
+        """测试超过单页上限的结果通过并发翻页获取"""
+        from aiohttp import web
+        from modules.literature_retriever.literature_retriever import LiteratureConfig
+
+        pages_seen = []
+
+        async def handler(request):
+            page, per_page = int(request.query['page']), int(request.query['per_page'])
+            pages_seen.append(page)
+            items = [{'name': f'repo{page}-{i}', 'full_name': f'org/repo{page}-{i}',
+                      'html_url': f'https://github.com/org/repo{page}-{i}', 'description': 'agent',
+                      'stargazers_count': 1, 'forks_count': 0, 'language': 'Python',
+                      'updated_at': '2025-01-01T00:00:00Z'} for i in range(per_page)]
+            return web.json_response({'total_count': 500, 'items': items},
+                                     headers={'X-RateLimit-Remaining': '29'})
+
+        async def scenario():
+            app = web.Application()
+            app.router.add_get('/search/repositories', handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+
+            retriever = LiteratureRetriever(self.agent)
+            retriever.github_token = 'test-token'
+            retriever.github_api_base = f'http://127.0.0.1:{port}'
+            config = LiteratureConfig(max_github_results=120, github_page_size=50,
+                                      include_papers=False, use_cache=False)
+            try:
+                return [r async for r in retriever.iter_search('agent', config)]
+            finally:
+                await retriever.close()
+                await runner.cleanup()
+
+        results = run_async_test(scenario())
+        self.assertEqual(len(results), 120)
+        self.assertEqual(sorted(pages_seen), [1, 2, 3])
+        self.assertEqual(len({r.url for r in results}), 120)
+
+    def test_search_stops_when_quality_met(self):
+        """测试增量质量分达到阈值后停止翻页"""
+        from aiohttp import web
+        from datetime import datetime, timezone
+        from modules.literature_retriever.literature_retriever import LiteratureConfig
+        from modules.quality_checker import QualityChecker
+
+        pages_seen = []
+        updated_at = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+        async def handler(request):
+            page, per_page = int(request.query['page']), int(request.query['per_page'])
+            pages_seen.append(page)
+            items = [{'name': f'repo{page}-{i}', 'full_name': f'org/repo{page}-{i}',
+                      'html_url': f'https://github.com/org/repo{page}-{i}', 'description': f'agent toolkit {page} {i}',
+                      'stargazers_count': 500, 'forks_count': 0, 'language': 'Python',
+                      'updated_at': updated_at} for i in range(per_page)]
+            return web.json_response({'total_count': 1000, 'items': items})
+
+        async def scenario():
+            app = web.Application()
+            app.router.add_get('/search/repositories', handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+
+            retriever = LiteratureRetriever(self.agent)
+            retriever.github_token = 'test-token'
+            retriever.github_api_base = f'http://127.0.0.1:{port}'
+            config = LiteratureConfig(max_github_results=1000, github_page_size=10, max_concurrent_pages=1,
+                                      include_papers=False, include_blogs=False, use_cache=False)
+            scorer = QualityChecker(self.agent).incremental(
+                'agent', thresholds={'completeness': 6.0, 'relevance': 6.0, 'freshness': 8.0})
+            try:
+                return await retriever.search('agent', config, stop_when=scorer.update_and_check), scorer
+            finally:
+                await retriever.close()
+                await runner.cleanup()
+
+        results, scorer = run_async_test(scenario())
+        self.assertTrue(results['stopped_early'])
+        self.assertEqual(results['total_results'], 10)  # 10条结果时完整性达到6.0
+        self.assertLess(len(pages_seen), 100)
+        self.assertGreaterEqual(scorer.dimension_scores()['freshness'], 8.0)
+        self.assertGreaterEqual(scorer.dimension_scores()['relevance'], 6.0)
+
+class TestArxivParser(unittest.TestCase):
+    """arXiv Atom 增量解析测试"""
+
+    FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>ArXiv Query</title>
+  {entries}
+</feed>"""
+    ENTRY = """<entry>
+    <id>http://arxiv.org/abs/2401.0000{i}v1</id>
+    <published>2024-01-0{day}T00:00:00Z</published>
+    <title>Agent   Paper {i}</title>
+    <summary>  Multi-line
+      summary {i}  </summary>
+    <author><name>Author {i}</name></author>
+  </entry>"""
+
+    def setUp(self):
+        if ResearchAgent is None:
+            self.skipTest("ResearchAgent未正确导入")
+
+    def test_chunked_feed_matches_whole_document(self):
+        """测试按小块输入与整体解析结果一致，且已处理元素被释放"""
+        from modules.literature_retriever.arxiv_parser import ArxivAtomParser, parse_arxiv_entries
+
+        xml = self.FEED.format(entries="".join(self.ENTRY.format(i=i, day=i + 1) for i in range(3))).encode('utf-8')
+        parser = ArxivAtomParser()
+        entries = []
+        for offset in range(0, len(xml), 7):
+            entries.extend(parser.feed(xml[offset:offset + 7]))
+        entries.extend(parser.close())
+
+        self.assertEqual(entries, parse_arxiv_entries(xml))
+        self.assertEqual(len(entries), 3)
+        self.assertEqual(entries[0]['title'], 'Agent Paper 0')
+        self.assertEqual(entries[0]['summary'], 'Multi-line summary 0')
+        self.assertEqual(entries[0]['arxiv_id'], '2401.00000v1')
+        self.assertEqual(entries[0]['authors'], ['Author 0'])
+        self.assertEqual(len(parser._root), 1)  # 只剩 feed 的 title
+
+    def test_streamed_page_written_to_cache(self):
+        """测试arXiv条目边解析边写入缓存，提前停止时不留下不完整的缓存"""
+        from aiohttp import web
+
+        xml = self.FEED.format(entries="".join(self.ENTRY.format(i=i, day=i + 1) for i in range(5)))
+
+        async def handler(request):
+            return web.Response(text=xml, content_type='application/atom+xml', headers={'ETag': '"v1"'})
+
+        async def scenario(tmp_dir):
+            app = web.Application()
+            app.router.add_get('/api/query', handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+
+            agent = ResearchAgent(research_domain="缓存测试", provider="mock")
+            retriever = LiteratureRetriever(agent, cache=SearchCache(tmp_dir))
+            retriever.arxiv_api_base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/api/query"
+            try:
+                partial = retriever._iter_arxiv_page('agent', 0, 5)
+                await partial.__anext__()
+                await partial.aclose()
+                after_stop = os.listdir(tmp_dir) if os.path.isdir(tmp_dir) else []
+
+                results = [r async for r in retriever._iter_arxiv_page('agent', 0, 5)]
+                _, cached = await retriever._lookup_cache('arxiv', 'agent', max_results=5, start=0)
+                return after_stop, results, cached
+            finally:
+                await retriever.close()
+                await runner.cleanup()
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            after_stop, results, cached = run_async_test(scenario(tmp_dir))
+
+        self.assertEqual(after_stop, [])
+        self.assertEqual(len(results), 5)
+        self.assertEqual(cached.etag, '"v1"')
+        self.assertEqual([entry['title'] for entry in cached.payload], [f'Agent Paper {i}' for i in range(5)])
+
+class TestRelevanceEngine(unittest.TestCase):
+    """BM25相关性评分测试"""
+
+    # 小型标注集：(查询, [(标题, 正文, 是否相关)])
+    BENCHMARK = [
+        ("大模型推理", [
+            ("大学课程", "模型与推理课程作业", False),
+            ("模型压缩", "推理时间优化与剪枝实践，适用于小模型", False),
+            ("vLLM", "高吞吐的大模型推理与服务引擎", True),
+            ("llm-inference-notes", "大模型推理加速笔记：量化、KV缓存", True),
+        ]),
+        ("ai agent", [
+            ("maintainer-tools", "Scripts to maintain repositories and paint dashboards", False),
+            ("travel-agency", "Travel agents booking website, said to be fair", False),
+            ("agent-sdk", "Build AI agent workflows with tool use", True),
+            ("autonomous-agents", "A list of AI agent frameworks", True),
+        ]),
+    ]
+
+    def setUp(self):
+        if ResearchAgent is None:
+            self.skipTest("ResearchAgent未正确导入")
+        from modules.relevance import RelevanceEngine
+        self.engine = RelevanceEngine()
+
+    @staticmethod
+    def _substring_score(query, title, body):
+        # 旧实现的做法：查询词作为子串出现即计分
+        text = f"{title} {body}".lower()
+        return sum(1 for word in query.lower().split() if word in text)
+
+    @staticmethod
+    def _precision_at_k(scores, labels, k=2):
+        ranked = sorted(zip(scores, labels), key=lambda x: x[0], reverse=True)[:k]
+        return sum(1 for _, relevant in ranked if relevant) / k
+
+    def test_tokenize_mixed_text(self):
+        """测试中文二元组与英文词切分"""
+        from modules.relevance import tokenize
+
+        self.assertEqual(tokenize("大模型 inference C++ node.js"), ['大模', '模型', 'inference', 'c++', 'node.js'])
+        self.assertEqual(tokenize("AI 与 agents"), ['ai', '与', 'agents'])
+        self.assertNotIn('ai', tokenize("maintain"))
+
+    def test_beats_substring_ranking(self):
+        """测试BM25在标注集上优于朴素子串匹配（如 ai 误匹配 maintain）"""
+        bm25_total, naive_total = 0.0, 0.0
+        for query, docs in self.BENCHMARK:
+            labels = [relevant for _, _, relevant in docs]
+            bm25 = self.engine.score_texts(query, [(title, body) for title, body, _ in docs])
+            naive = [self._substring_score(query, title, body) for title, body, _ in docs]
+            bm25_total += self._precision_at_k(bm25, labels)
+            naive_total += self._precision_at_k(naive, labels)
+
+            for score, relevant in zip(bm25, labels):
+                self.assertTrue(0.0 <= score <= 1.0)
+
+        self.assertEqual(bm25_total, len(self.BENCHMARK))
+        self.assertGreater(bm25_total, naive_total)
+
+    def test_quality_checker_uses_engine(self):
+        """测试质量检查的相关性评估使用同一评分"""
+        from modules.quality_checker import QualityChecker
+        from modules.literature_retriever.literature_retriever import SearchResult
+        from datetime import datetime
+
+        agent = ResearchAgent(research_domain="相关性测试", provider="mock")
+        checker = QualityChecker(agent)
+        item = SearchResult(title="agent-sdk", url="https://example.com", description="AI agent framework",
+                            source="GitHub", relevance_score=0.0, timestamp=datetime.now(), metadata={})
+        noise = SearchResult(title="maintainer-tools", url="https://example.org", description="maintain repos",
+                             source="GitHub", relevance_score=0.0, timestamp=datetime.now(), metadata={})
+
+        from modules.quality_checker import LiteratureView
+
+        def assess(result):
+            data = {'query': "ai agent", 'literature': {'github_results': [result]}}
+            return checker._assess_relevance(
+                LiteratureView.build(data['literature'], data['query'], checker.relevance_engine).stats(), data)
+
+        relevant, irrelevant = assess(item), assess(noise)
+        self.assertGreater(relevant, irrelevant)
+
+class TestColumnarQuality(unittest.TestCase):
+    """列式质量检查测试"""
+
+    def setUp(self):
+        if ResearchAgent is None:
+            self.skipTest("ResearchAgent未正确导入")
+        from modules.quality_checker import QualityChecker
+        self.checker = QualityChecker(ResearchAgent(research_domain="质量测试", provider="mock"))
+
+    @staticmethod
+    def _literature(count):
+        from modules.literature_retriever.literature_retriever import SearchResult
+        from datetime import datetime, timedelta
+        now = datetime.now()
+        literature = {'github_results': [], 'paper_results': [], 'blog_results': []}
+        keys = list(literature)
+        for i in range(count):
+            literature[keys[i % 3]].append(SearchResult(
+                title=f"agent project {i}", url=f"https://example.com/{i}", description="AI agent tooling",
+                source="GitHub", relevance_score=5.0, timestamp=now - timedelta(days=i % 400),
+                metadata={'stars': i * 10}))
+        return literature
+
+    def test_dimension_scores(self):
+        """测试各维度分数符合评分规则"""
+        from modules.literature_retriever.literature_retriever import SearchResult
+        from datetime import datetime, timedelta
+        now = datetime.now()
+
+        def result(days, stars=0):
+            return SearchResult(title="agent", url="https://example.com", description="AI agent",
+                                source="GitHub", relevance_score=5.0, timestamp=now - timedelta(days=days),
+                                metadata={'stars': stars})
+
+        data = {
+            'query': "ai agent",
+            'literature': {'github_results': [result(1, 500), result(40, 10)], 'paper_results': [result(200)]},
+            'analysis': {'analysis_report': "AI agent 分析", 'key_findings': ["x"]},
+            'metadata': {'provider': 'mock'}
+        }
+        score = self.checker._evaluate(data)
+
+        self.assertAlmostEqual(score.dimension_scores['completeness'], 7.0)  # 5 + 两个来源1 + 两项分析1
+        self.assertAlmostEqual(score.dimension_scores['reliability'], 7.0)  # 5 + 0.5*2 + 一篇论文0.5 + 其他提供商0.5
+        self.assertAlmostEqual(score.dimension_scores['freshness'], 5.0 + (1.0 + 0.6 + 0.2) / 3 * 3.0)
+        self.assertAlmostEqual(score.dimension_scores['consistency'], 8.0)
+        self.assertEqual(score.issues, [])
+        self.assertAlmostEqual(score.confidence, 0.5)
+
+    def test_large_literature_is_cheap(self):
+        """测试数万条结果的检查只构建一次列式视图，相关性整批计算一次"""
+        from modules.quality_checker import LiteratureView
+        data = {'query': "ai agent", 'literature': self._literature(30000), 'metadata': {'provider': 'claude'}}
+        engine = self.checker.relevance_engine
+
+        with patch.object(LiteratureView, 'build', wraps=LiteratureView.build) as build, \
+                patch.object(engine, 'score_texts', wraps=engine.score_texts) as score_texts:
+            score = self.checker._evaluate(data)
+
+        self.assertEqual(build.call_count, 1)
+        self.assertEqual(score_texts.call_count, 1)
+        self.assertEqual(len(score_texts.call_args.args[1]), 30000)
+        self.assertEqual(score.dimension_scores['completeness'], 9.0)
+        self.assertAlmostEqual(score.confidence, 0.9)
+
+    def test_incremental_scorer_matches_batch(self):
+        """测试增量评分与整批检查的结果一致"""
+        literature = self._literature(40)
+        data = {'query': "ai agent", 'literature': literature}
+
+        scorer = self.checker.incremental("ai agent")
+        for key in ('github_results', 'paper_results', 'blog_results'):
+            for result in literature[key]:
+                result.source = {'github_results': 'GitHub', 'paper_results': 'arXiv'}.get(key, 'Blog')
+                scorer.add_result(result)
+
+        batch = self.checker._evaluate(data)
+        incremental = scorer.current_score()
+        for dimension in ('completeness', 'reliability', 'relevance', 'freshness', 'consistency'):
+            self.assertAlmostEqual(incremental.dimension_scores[dimension], batch.dimension_scores[dimension])
+
+        scorer.add_record({'timestamp': "2000-01-01T00:00:00"})
+        self.assertEqual(scorer.records, 1)
+        self.assertLess(scorer.dimension_scores()['freshness'], batch.dimension_scores['freshness'])
+
+    def test_early_stop_uses_reported_relevance(self):
+        """测试提前停止按最终报告的BM25相关性判断：查询词覆盖率已达标但BM25未达标时不停止"""
+        from modules.relevance import text_relevance
+
+        results = [result for items in self._literature(30).values() for result in items]
+        for result in results:
+            result.source = 'GitHub'
+        final = self.checker._evaluate({'query': "ai agent", 'literature': {'github_results': results}})
+        final_relevance = final.dimension_scores['relevance']
+        coverage_relevance = 5.0 + 3.0 * sum(text_relevance("ai agent", f"{r.title} {r.description}")
+                                             for r in results) / len(results)
+        self.assertLess(final_relevance, 7.5)
+        self.assertGreater(coverage_relevance, 7.5)  # 两种度量在 7.5 两侧
+
+        strict = self.checker.incremental("ai agent", thresholds={'relevance': 7.5})
+        self.assertFalse(any(strict.update_and_check(result) for result in results))
+        self.assertAlmostEqual(strict.dimension_scores()['relevance'], final_relevance)
+
+        lenient = self.checker.incremental("ai agent", thresholds={'relevance': final_relevance - 0.1})
+        stopped_at = next(i for i, result in enumerate(results, 1) if lenient.update_and_check(result))
+        self.assertGreaterEqual(lenient.dimension_scores()['relevance'], final_relevance - 0.1)
+        self.assertLessEqual(stopped_at, len(results))
+
+class TestContentValidation(unittest.TestCase):
+    """LLM批量内容验证测试"""
+
+    class FakeAgent:
+        """按提示中的来源编号返回结构化结论，编号为3的倍数的来源判为不可信"""
+        research_domain = "验证测试"
+
+        def __init__(self):
+            self.calls = 0
+
+        async def achat(self, message):
+            import re
+            self.calls += 1
+            ids = [int(i) for i in re.findall(r'^\[(\d+)\]', message, re.MULTILINE)]
+            return "结论如下:\n" + json.dumps([{'id': i, 'valid': i % 3 != 0, 'bias': 'high' if i == 1 else 'none',
+                                              'note': "测试"} for i in ids], ensure_ascii=False)
+
+    def setUp(self):
+        if ResearchAgent is None:
+            self.skipTest("ResearchAgent未正确导入")
+        from modules.literature_retriever.search_cache import SearchCache
+        from modules.content_validator import ContentValidator
+        self.tmp = tempfile.TemporaryDirectory()
+        self.agent = self.FakeAgent()
+        self.validator = ContentValidator(self.agent, cache=SearchCache(self.tmp.name), batch_size=20)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_batched_and_cached(self):
+        """测试多条来源合并为一次调用，未变化的来源再次检查不产生调用"""
+        items = TestColumnarQuality._literature(45)['github_results']  # 15条
+        items += TestColumnarQuality._literature(90)['paper_results']  # 30条
+
+        verdicts = run_async_test(self.validator.validate(items, ['content', 'bias'], "agent"))
+        self.assertEqual(self.agent.calls, 3)
+        self.assertEqual([v.valid for v in verdicts[:4]], [False, True, True, False])
+        self.assertEqual(verdicts[1].bias, 'high')
+
+        again = run_async_test(self.validator.validate(items, ['content', 'bias'], "agent"))
+        self.assertEqual(self.agent.calls, 3)
+        self.assertTrue(all(v.cached for v in again))
+
+        items[0].description = "changed"
+        run_async_test(self.validator.validate(items, ['content', 'bias'], "agent"))
+        self.assertEqual(self.agent.calls, 4)
+
+    def test_uses_stateless_completion(self):
+        """测试验证调用走不带对话历史的 acomplete"""
+        async def achat(message):
+            raise AssertionError("不应带对话历史调用")
+
+        self.agent.acomplete, self.agent.achat = self.agent.achat, achat
+        items = TestColumnarQuality._literature(6)['github_results']
+        verdicts = run_async_test(self.validator.validate(items, ['content'], "agent"))
+        self.assertEqual(self.agent.calls, 1)
+        self.assertEqual([v.valid for v in verdicts], [False, True])
+
+    def test_non_boolean_verdict_is_unjudged(self):
+        """测试 valid 不是JSON布尔值（如字符串"false"）的结论按未判定处理且不缓存"""
+        async def achat(message):
+            self.agent.calls += 1
+            return json.dumps([{'id': 0, 'valid': "false"}, {'id': 1, 'valid': False}])
+
+        self.agent.achat = achat
+        items = TestColumnarQuality._literature(6)['github_results']  # 2条
+        verdicts = run_async_test(self.validator.validate(items, ['content'], "agent"))
+        self.assertIsNone(verdicts[0].valid)
+        self.assertIs(verdicts[1].valid, False)
+
+        run_async_test(self.validator.validate(items, ['content'], "agent"))
+        self.assertEqual(self.agent.calls, 2)
+
+    def test_batches_run_concurrently(self):
+        """测试多个批次同时调用LLM，并发数不超过 max_concurrency"""
+        from modules.content_validator import ContentValidator
+        active, peak = 0, 0
+        chat = self.agent.achat
+
+        async def achat(message):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return await chat(message)
+
+        self.agent.achat = achat
+        validator = ContentValidator(self.agent, cache=self.validator.cache, batch_size=5, max_concurrency=2)
+        items = TestColumnarQuality._literature(45)['github_results']  # 15条，3个批次
+        verdicts = run_async_test(validator.validate(items, ['content'], "agent"))
+        self.assertEqual(self.agent.calls, 3)
+        self.assertEqual(peak, 2)
+        self.assertEqual([v.valid for v in verdicts[:4]], [False, True, True, False])
+
+    def test_check_applies_verdicts(self):
+        """测试质量检查按验证结论下调分数并报告问题"""
+        from modules.quality_checker import QualityChecker
+        checker = QualityChecker(self.agent)
+        checker.validator = self.validator
+        data = {'query': "ai agent", 'literature': TestColumnarQuality._literature(9)}
+
+        baseline = checker._evaluate(data)
+        score = run_async_test(checker.check(data))
+
+        self.assertEqual(self.agent.calls, 1)
+        self.assertEqual(score.validation['checked'], 9)
+        self.assertEqual(score.validation['invalid'], 3)
+        self.assertLess(score.dimension_scores['reliability'], baseline.dimension_scores['reliability'])
+        self.assertIn("3条来源未通过内容验证", score.issues)
+        self.assertIn("1条来源存在明显倾向性", score.issues)
+
+class TestReportTemplates(unittest.TestCase):
+    """报告模板引擎测试"""
+
+    def setUp(self):
+        if ResearchAgent is None:
+            self.skipTest("ResearchAgent未正确导入")
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_compile_and_render(self):
+        """测试变量、过滤器、嵌套循环与条件，缺失值与 None 输出为空"""
+        from modules.report_templates import compile_template, TemplateError
+
+        render = compile_template(
+            "{% for g in groups %}\n"
+            "{{ loop.index }}. {{ g.name|e }}{% if g.members %}:{% for i in g.members %} {{ loop.index }}={{ i }}{% endfor %}{% else %} -{% endif +%}\n"
+            "{% endfor %}\n"
+            "{% if not groups %}\nempty\n{% endif %}\n"
+        )
+        groups = [{'name': "a<b>", 'members': ['x', 'y']}, {'name': None, 'members': []}]
+        self.assertEqual("".join(render({'groups': groups})), "1. a&lt;b&gt;: 1=x 2=y\n2.  -\n")
+        self.assertEqual("".join(render({'groups': []})), "empty\n")
+        self.assertEqual("".join(compile_template("[{{ a.b.c }}|{{ n }}]")({'n': None})), "[|]")
+
+        for broken in ("{% for x in %}", "{% if a %}", "{% endfor %}", "{{ a|nope }}"):
+            with self.assertRaises(TemplateError):
+                compile_template(broken)
+
+    def test_templates_cached_by_style_and_language(self):
+        """测试编译结果按风格与语言缓存，缺少专用模板时回退"""
+        from modules.report_templates import get_template, render_to_string
+
+        self.assertIs(get_template('markdown_head', 'technical', 'en'), get_template('markdown_head', 'technical', 'en'))
+        section = {'section': {'title': "S", 'content': "c"}, 'index': 1}
+        self.assertIn("## 1. S", render_to_string('markdown_section', section, style='academic'))
+        self.assertIn("## S", render_to_string('markdown_section', section, style='technical'))
+        self.assertIn("Executive Summary", render_to_string('markdown_head', {'metadata': {'title': "T"}}, language='en'))
+
+    def test_raw_data_streamed_to_file_only(self):
+        """测试原始数据附录直接写入文件，不进入返回的报告文本"""
+        from pathlib import Path
+        from modules.report_generator import ReportGenerator, ReportConfig
+
+        agent = ResearchAgent(research_domain="报告测试", provider="mock")
+        generator = ReportGenerator(agent)
+        generator.output_dir = Path(self.tmp.name)
+        research_data = {'query': "agent", 'literature': TestColumnarQuality._literature(30)}
+
+        for fmt in ('markdown', 'html', 'text'):
+            report = run_async_test(generator.generate(research_data, ReportConfig(output_format=fmt, include_raw_data=True)))
+            saved = next(Path(self.tmp.name).rglob(f"*{ {'markdown': '.md', 'html': '.html', 'text': '.txt'}[fmt]}"))
+            content = saved.read_text(encoding='utf-8')
+
+            body = report[:-len("</body>\n</html>")] if fmt == 'html' else report
+            self.assertTrue(content.startswith(body))
+            self.assertIn("附录：原始数据", content)
+            self.assertNotIn("附录：原始数据", report)
+            self.assertEqual(content.count("https://example.com/29"), report.count("https://example.com/29") + 1)
+            if fmt == 'html':
+                self.assertTrue(report.endswith("</html>") and content.endswith("</html>"))
+            saved.unlink()
+
+    def test_batch_rendering_is_cheap(self):
+        """测试批量渲染多份报告时每个模板只编译一次，之后复用缓存的渲染函数"""
+        import io
+        from modules import report_templates
+        from modules.report_templates import get_template, render
+
+        context = {'metadata': {'title': "T", 'generated_at': "now", 'research_domain': "AI", 'model_info': "m"},
+                   'executive_summary': "summary " * 50, 'toc': ["A", "B", "C"],
+                   'sections': [{'title': t, 'content': "content " * 200} for t in "ABCDEF"],
+                   'sources': [{'type': "GitHub", 'title': f"r{i}", 'url': f"https://x/{i}"} for i in range(20)]}
+
+        get_template.cache_clear()
+        reports = []
+        with patch.object(report_templates, 'compile_template', wraps=report_templates.compile_template) as compile_:
+            for _ in range(50):
+                out = io.StringIO()
+                render('markdown_head', context, out.write)
+                for index, section in enumerate(context['sections'], 1):
+                    render('markdown_section', {'section': section, 'index': index}, out.write)
+                render('markdown_tail', context, out.write)
+                reports.append(out.getvalue())
+
+        self.assertEqual(compile_.call_count, 3)
+        self.assertEqual(get_template.cache_info().misses, 3)
+        self.assertEqual(get_template.cache_info().hits, 50 * 8 - 3)
+        self.assertEqual(len(set(reports)), 1)
+        self.assertIn("20. **GitHub**: r19", reports[0])
+
+class TestReportWriter(unittest.TestCase):
+    """报告写入器测试"""
+
+    def setUp(self):
+        if ResearchAgent is None:
+            self.skipTest("ResearchAgent未正确导入")
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_atomic_commit_and_abort(self):
+        """测试提交前目标文件不变，异常时放弃写入且不留临时文件"""
+        from pathlib import Path
+        from modules.report_writer import ReportWriter
+
+        target = Path(self.tmp.name) / "report.md"
+        target.write_text("old", encoding='utf-8')
+
+        async def scenario():
+            async with ReportWriter(str(target), buffer_size=8) as writer:
+                await writer.write_section("# title\n")
+                await writer.write("body " * 10)
+                self.assertEqual(target.read_text(encoding='utf-8'), "old")
+
+            with self.assertRaises(RuntimeError):
+                async with ReportWriter(str(target)) as writer:
+                    await writer.write_section("partial")
+                    raise RuntimeError("render failed")
+
+        run_async_test(scenario())
+        self.assertEqual(target.read_text(encoding='utf-8'), "# title\n" + "body " * 10)
+        self.assertEqual([p.name for p in Path(self.tmp.name).iterdir()], ["report.md"])
+
+    def test_research_report_written_once(self):
+        """测试调研报告只由报告阶段写入一个文件"""
+        from pathlib import Path
+        from unittest import mock
+        from modules.report_writer import ReportWriter
+
+        agent = ResearchAgent(research_domain="写入测试", provider="mock")
+        commits = []
+        original_commit = ReportWriter.commit
+
+        async def counting_commit(writer):
+            commits.append(writer.path)
+            return await original_commit(writer)
+
+        with mock.patch.object(ReportWriter, 'commit', counting_commit):
+            result = run_async_test(agent.conduct_research("写入测试", reports_dir=self.tmp.name, max_sources=2,
+                                                           include_github=False, include_papers=False))
+
+        self.assertEqual(len(commits), 1)
+        self.assertEqual(Path(result.saved_file_path).read_text(encoding='utf-8'), result.report)
+        self.assertEqual(len(list(Path(self.tmp.name).rglob("*.md"))), 1)
+
+class TestParallelSections(unittest.TestCase):
+    """LLM报告章节并发生成测试"""
+
+    class FakeAgent:
+        """记录并发度与调用顺序的代理"""
+        research_domain = "章节测试"
+        provider = "fake"
+        model = "m"
+
+        def __init__(self):
+            self.prompts = []
+            self.active = 0
+            self.peak = 0
+
+        async def acomplete(self, message):
+            self.prompts.append(message)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            await asyncio.sleep(0.02)
+            self.active -= 1
+            return "摘要内容" if message.startswith("根据以下报告章节") else f"LLM章节{len(self.prompts)}"
+
+    def setUp(self):
+        if ResearchAgent is None:
+            self.skipTest("ResearchAgent未正确导入")
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_sections_parallel_then_summary_and_cached(self):
+        """测试章节有界并发生成、摘要在章节之后生成，换格式渲染复用缓存"""
+        from pathlib import Path
+        from modules.report_generator import ReportGenerator, ReportConfig
+
+        agent = self.FakeAgent()
+        generator = ReportGenerator(agent)
+        generator.output_dir = Path(self.tmp.name)
+        generator.section_cache = SearchCache(os.path.join(self.tmp.name, "sections"))
+        research_data = {'query': "agent", 'literature': TestColumnarQuality._literature(6)}
+
+        report = run_async_test(generator.generate(research_data, ReportConfig(llm_sections=True, max_parallel_sections=3)))
+        self.assertEqual(len(agent.prompts), 7)
+        self.assertTrue(1 < agent.peak <= 3)
+        self.assertTrue(agent.prompts[-1].startswith("根据以下报告章节"))
+        self.assertIn("摘要内容", report)
+        self.assertIn("LLM章节", report)
+
+        html = run_async_test(generator.generate(research_data, ReportConfig(output_format='html', llm_sections=True)))
+        self.assertEqual(len(agent.prompts), 7)
+        self.assertIn("摘要内容", html)
+
+class TestReportExport(unittest.TestCase):
+    """多格式报告导出测试"""
+
+    def setUp(self):
+        if ResearchAgent is None:
+            self.skipTest("ResearchAgent未正确导入")
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_export_all_formats_from_one_document(self):
+        """测试一次数据准备导出全部格式"""
+        from pathlib import Path
+        from unittest import mock
+        from modules.report_generator import ReportGenerator, ReportConfig
+
+        agent = ResearchAgent(research_domain="导出测试", provider="mock")
+        generator = ReportGenerator(agent)
+        generator.output_dir = Path(self.tmp.name)
+        research_data = {'query': "agent", 'literature': TestColumnarQuality._literature(6)}
+
+        with mock.patch.object(generator, '_prepare_report_data', wraps=generator._prepare_report_data) as prepare:
+            paths = run_async_test(generator.export(research_data, config=ReportConfig(include_raw_data=True),
+                                                    basename="dashboard"))
+        self.assertEqual(prepare.call_count, 1)
+        self.assertEqual({fmt: Path(path).name for fmt, path in paths.items()},
+                         {'markdown': "dashboard.md", 'html': "dashboard.html", 'text': "dashboard.txt",
+                          'json': "dashboard.json", 'pdf': "dashboard.pdf"})
+
+        document = json.loads(Path(paths['json']).read_text(encoding='utf-8'))
+        self.assertEqual(len(document['sections']), 6)
+        self.assertEqual(len(document['raw_data']), 6)
+        title = document['metadata']['title']
+        for fmt in ('markdown', 'html', 'text'):
+            self.assertIn(title, Path(paths[fmt]).read_text(encoding='utf-8'))
+
+        with self.assertRaises(ValueError):
+            run_async_test(generator.export(research_data, formats=['docx']))
+
+    def test_json_raw_data_streamed(self):
+        """测试JSON报告的原始数据逐条写入文件，内容与整体序列化一致，返回文本不含原始数据"""
+        from pathlib import Path
+        from modules.report_generator import ReportGenerator, ReportConfig
+
+        generator = ReportGenerator(ResearchAgent(research_domain="导出测试", provider="mock"))
+        generator.output_dir = Path(self.tmp.name)
+        for count in (6, 0):
+            research_data = {'query': "agent", 'literature': TestColumnarQuality._literature(count)}
+            generator.config = ReportConfig(output_format='json', include_raw_data=True)
+            report_data = run_async_test(generator.build_document(research_data))
+            path = os.path.join(self.tmp.name, f"stream{count}.json")
+            report, saved = run_async_test(generator._write_format(report_data, research_data, 'json', path))
+
+            content = Path(saved).read_text(encoding='utf-8')
+            expected = {**json.loads(report), 'raw_data': list(generator._iter_raw_data(research_data))}
+            self.assertEqual(content, json.dumps(expected, ensure_ascii=False, indent=2))
+            self.assertNotIn('raw_data', json.loads(report))
+            self.assertEqual(len(json.loads(content)['raw_data']), count)
+
+    def test_pdf_structure(self):
+        """测试PDF的交叉引用表偏移正确、长文本自动分页"""
+        import re
+        from modules.pdf_writer import PDFDocument, encode_text
+
+        document = PDFDocument(title="报告")
+        document.add_text("标题", heading=True)
+        document.add_text("中文与 ASCII 混排的长段落。" * 400)
+        pdf = document.build()
+
+        self.assertTrue(pdf.startswith(b"%PDF-1.4") and pdf.endswith(b"%%EOF\n"))
+        xref = int(re.search(rb"startxref\n(\d+)", pdf).group(1))
+        self.assertTrue(pdf[xref:].startswith(b"xref"))
+        offsets = [int(o) for o in re.findall(rb"(\d{10}) 00000 n", pdf)]
+        for number, offset in enumerate(offsets, 1):
+            self.assertTrue(pdf[offset:].startswith(f"{number} 0 obj".encode()))
+        self.assertGreater(int(re.search(rb"/Count (\d+)", pdf).group(1)), 1)
+        self.assertEqual(encode_text("A中"), "<00414e2d>")
+
+class TestReportStore(unittest.TestCase):
+    """报告存储与索引测试"""
+
+    def setUp(self):
+        if ResearchAgent is None:
+            self.skipTest("ResearchAgent未正确导入")
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_ulid_unique_and_sharded(self):
+        """测试同一时刻生成的ID不重复且有序，文件按日期分片"""
+        from modules.report_store import ReportStore, new_ulid, ulid_time
+
+        ids = [new_ulid(1700000000.0) for _ in range(1000)]
+        self.assertEqual(len(set(ids)), 1000)
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(ulid_time(ids[0]).timestamp(), 1700000000.0)
+
+        store = ReportStore(self.tmp.name)
+        report_id, path = store.allocate('pdf', ids[0])
+        created = ulid_time(report_id)
+        self.assertEqual(path.relative_to(self.tmp.name).parts,
+                         (created.strftime('%Y'), created.strftime('%m'), created.strftime('%d'), f"{report_id}.pdf"))
+
+    def test_index_lookup(self):
+        """测试按ID和条件查找走索引，最新的在前"""
+        from modules.report_store import ReportStore, new_ulid
+
+        store = ReportStore(self.tmp.name)
+        for i in range(30):
+            report_id, path = store.allocate('markdown', new_ulid(1700000000.0 + i))
+            store.register(report_id, 'markdown', str(path), query=f"q{i % 3}", domain="AI", score=float(i))
+
+        self.assertEqual(store.count(), 30)
+        found = store.find(query="q1", limit=5)
+        self.assertEqual([r.score for r in found], [28.0, 25.0, 22.0, 19.0, 16.0])
+        self.assertEqual(store.get(found[0].report_id).path, found[0].path)
+        self.assertEqual(store.remove(found[0].report_id), 1)
+        self.assertIsNone(store.get(found[0].report_id))
+
+        import sqlite3
+        conn = sqlite3.connect(store.index_path)
+        plans = {sql: " ".join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+                 for sql, params in [("SELECT * FROM reports WHERE query = ? ORDER BY created_at DESC LIMIT 5", ("q1",)),
+                                     ("SELECT * FROM reports WHERE report_id = ?", ("x",))]}
+        conn.close()
+        self.assertTrue(all("USING INDEX" in plan and "TEMP B-TREE" not in plan for plan in plans.values()), plans)
+
+    def test_reports_in_same_second_do_not_collide(self):
+        """测试同一秒完成的两份报告各自保存并登记"""
+        agent = ResearchAgent(research_domain="存储测试", provider="mock")
+        options = dict(reports_dir=self.tmp.name, max_sources=2, include_github=False, include_papers=False)
+
+        async def both():
+            return await asyncio.gather(agent.conduct_research("同名调研", **options),
+                                        agent.conduct_research("同名调研", **options))
+
+        first, second = run_async_test(both())
+        self.assertNotEqual(first.saved_file_path, second.saved_file_path)
+        records = agent.find_reports(reports_dir=self.tmp.name, query="同名调研")
+        self.assertEqual(sorted(r.path for r in records), sorted([first.saved_file_path, second.saved_file_path]))
+        self.assertEqual(records[0].domain, "存储测试")
+
+class TestChartRenderer(unittest.TestCase):
+    """SVG图表渲染测试"""
+
+    DATA = {
+        'statistics': {'source_distribution': {'GitHub': 5, '<Local>': 3}, 'type_distribution': {'repo': 8}},
+        'processing_summary': {'quality_metrics': {'quality_distribution': {'high': 2, 'medium': 5, 'low': 1}}},
+        'trends': {'time_trends': {'daily_counts': [1, 3, 2, 5], 'start_date': "2024-01-01", 'end_date': "2024-01-04"},
+                   'metric_trends': {'weekly_means': {'stars': [10.0, 12.5, 20.0]}}}
+    }
+
+    def setUp(self):
+        if ResearchAgent is None:
+            self.skipTest("ResearchAgent未正确导入")
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_specs_render_valid_svg(self):
+        """测试由统计与趋势生成图表，SVG为合法XML且标签已转义"""
+        import xml.etree.ElementTree as ET
+        from modules.chart_renderer import build_chart_specs, render_svg
+
+        specs = build_chart_specs(self.DATA)
+        self.assertEqual([spec.kind for spec in specs], ['bar', 'bar', 'bar', 'line', 'line'])
+        for spec in specs:
+            root = ET.fromstring(render_svg(spec))
+            self.assertTrue(root.tag.endswith('svg'))
+        self.assertIn("&lt;Local&gt;", render_svg(specs[0]))
+        self.assertEqual(build_chart_specs({}), [])
+
+    def test_inline_render_skips_cache(self):
+        """测试非进程模式下直接渲染，不读写缓存"""
+        from modules.chart_renderer import ChartRenderer
+
+        cache = SearchCache(self.tmp.name)
+        renderer = ChartRenderer(cache=cache)
+        executor = StageExecutor(ExecutorConfig(mode='thread', max_workers=2))
+        try:
+            with patch.object(cache, 'get') as get, patch.object(cache, 'set') as set_:
+                for runner in (None, executor):
+                    self.assertEqual(len(run_async_test(renderer.render(self.DATA, runner))), 5)
+            self.assertEqual(renderer.rendered, 10)
+            get.assert_not_called()
+            set_.assert_not_called()
+        finally:
+            executor.shutdown()
+
+    def test_charts_cached_by_data_hash(self):
+        """测试进程模式下图表按数据哈希缓存，只有变化的图表重新渲染"""
+        import copy
+        from modules.chart_renderer import ChartRenderer
+
+        renderer = ChartRenderer(cache=SearchCache(self.tmp.name))
+        executor = StageExecutor(ExecutorConfig(mode='process', max_workers=1))
+        try:
+            self.assertEqual(len(run_async_test(renderer.render(self.DATA, executor))), 5)
+            run_async_test(renderer.render(self.DATA, executor))
+            self.assertEqual(renderer.rendered, 5)
+
+            changed = copy.deepcopy(self.DATA)
+            changed['trends']['time_trends']['daily_counts'].append(4)
+            run_async_test(renderer.render(changed, executor))
+            self.assertEqual(renderer.rendered, 6)
+        finally:
+            executor.shutdown()
+
+    def test_report_embeds_charts(self):
+        """测试Markdown与HTML报告嵌入图表，纯文本报告不含图表"""
+        from pathlib import Path
+        from modules.chart_renderer import ChartRenderer
+        from modules.report_generator import ReportGenerator, ReportConfig
+
+        generator = ReportGenerator(ResearchAgent(research_domain="图表测试", provider="mock"))
+        generator.output_dir = Path(self.tmp.name)
+        generator.charts = ChartRenderer(cache=SearchCache(os.path.join(self.tmp.name, "charts")))
+        research_data = {'query': "agent", 'literature': TestColumnarQuality._literature(3), 'data': self.DATA}
+
+        markdown = run_async_test(generator.generate(research_data, ReportConfig(output_format='markdown')))
+        html = run_async_test(generator.generate(research_data, ReportConfig(output_format='html')))
+        text = run_async_test(generator.generate(research_data, ReportConfig(output_format='text')))
+        plain = run_async_test(generator.generate(research_data, ReportConfig(include_charts=False)))
+
+        self.assertEqual(markdown.count("data:image/svg+xml;base64,"), 5)
+        self.assertEqual(html.count("<svg"), 5)
+        self.assertNotIn("<svg", text)
+        self.assertNotIn("数据图表", plain)
+
+class TestModuleRegistry(unittest.TestCase):
+    """模块注册表与按阶段延迟构建测试"""
+
+    def setUp(self):
+        if ResearchAgent is None:
+            self.skipTest("ResearchAgent未正确导入")
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_agents_share_resources(self):
+        """测试模块只在用到时构建，同参数的代理共享执行器和调研记忆"""
+        from modules.registry import registry
+
+        first = ResearchAgent(provider="mock", executor_mode="thread", max_workers=2, memory_dir=self.tmp.name)
+        second = ResearchAgent(provider="mock", executor_mode="thread", max_workers=2, memory_dir=self.tmp.name)
+        self.assertIsNone(first.data_processor)
+
+        first._get_module('report_generator')
+        self.assertIsNone(first.data_processor)
+        second._get_module('quality_checker')
+        self.assertIs(first.stage_executor, second.stage_executor)
+        self.assertIs(first._get_module('memory'), second._get_module('memory'))
+        self.assertIs(first.get_report_store(self.tmp.name), second.get_report_store(self.tmp.name))
+        self.assertIs(registry.module_class('report_generator'), type(first.report_generator))
+
+        run_async_test(second.stage_executor.run(sum, [1, 2]))
+        run_async_test(first.close())
+        self.assertIsNotNone(second.stage_executor._pool)
+        self.assertEqual(run_async_test(second.stage_executor.run(sum, [1, 2])), 3)
+
+    def test_literature_only_run_skips_pandas(self):
+        """测试只做文献调研时不导入 pandas"""
+        import subprocess
+        code = (
+            "import asyncio, sys\n"
+            "from research_agent import ResearchAgent\n"
+            "async def main():\n"
+            "    async with ResearchAgent(provider='mock') as agent:\n"
+            "        result = await agent.conduct_research('agent', include_data=False, include_github=False,\n"
+            f"                                              include_papers=False, reports_dir={self.tmp.name!r})\n"
+            "    print(result.data['status'], 'pandas' in sys.modules)\n"
+            "asyncio.run(main())\n"
+        )
+        project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = {**os.environ, 'RESEARCH_CACHE_DIR': os.path.join(self.tmp.name, "cache"), 'PYTHONPATH': project_dir}
+        output = subprocess.run([sys.executable, "-c", code], cwd=self.tmp.name, env=env,
+                                capture_output=True, text=True, timeout=60)
+        self.assertEqual(output.stdout.strip().splitlines()[-1], "skipped False", output.stderr[-2000:])
+
+class TestResultDedup(unittest.TestCase):
+    """跨来源结果去重测试"""
+
+    def setUp(self):
+        if ResearchAgent is None:
+            self.skipTest("ResearchAgent未正确导入")
+
+    @staticmethod
+    def _result(title, url, description, source, score=5.0):
+        from modules.literature_retriever.literature_retriever import SearchResult
+        from datetime import datetime
+        return SearchResult(title=title, url=url, description=description, source=source,
+                            relevance_score=score, timestamp=datetime.now(), metadata={})
+
+    def test_canonicalize_url(self):
+        """测试URL规范化"""
+        from modules.literature_retriever import canonicalize_url
+
+        self.assertEqual(canonicalize_url("http://www.GitHub.com/Org/Repo/tree/main?utm_source=x#readme"),
+                         "https://github.com/org/repo")
+        self.assertEqual(canonicalize_url("https://arxiv.org/pdf/2401.00001v2.pdf"),
+                         canonicalize_url("http://export.arxiv.org/abs/2401.00001v1"))
+        self.assertNotEqual(canonicalize_url("https://example.com/a?id=1"),
+                            canonicalize_url("https://example.com/a?id=2"))
+
+    def test_merges_across_sources(self):
+        """测试URL相同或文本近似的结果被合并，并保留最高相关性"""
+        from modules.literature_retriever import ResultDeduplicator
+
+        description = "A lightweight framework for building multi agent systems with tool calling and memory"
+        results = [
+            self._result("org/agent-kit", "https://github.com/org/agent-kit", description, "GitHub", 7.0),
+            self._result("org/agent-kit", "https://github.com/Org/agent-kit/", "mirror", "AI推荐", 9.0),
+            self._result("Agent-Kit", "https://arxiv.org/abs/2401.00001",
+                         description, "arXiv", 6.0),
+            self._result("Vector databases survey", "https://arxiv.org/abs/2401.00002",
+                         "A survey of approximate nearest neighbour search for embeddings", "arXiv", 5.0),
+        ]
+
+        deduplicator = ResultDeduplicator()
+        kept = deduplicator.deduplicate(results)
+
+        self.assertEqual([r.url for r in kept], ["https://github.com/org/agent-kit", "https://arxiv.org/abs/2401.00002"])
+        self.assertEqual(kept[0].relevance_score, 9.0)
+        self.assertEqual(kept[0].metadata['sources'], ['GitHub', 'AI推荐', 'arXiv'])
+        self.assertEqual(deduplicator.duplicates, 2)
+
+    def test_search_reports_removed_duplicates(self):
+        """测试检索结果按来源重新分组并记录去重数量"""
+        agent = ResearchAgent(research_domain="去重测试", provider="mock")
+        retriever = LiteratureRetriever(agent)
+        results = {
+            'github_results': [self._result("org/a", "https://github.com/org/a", "agent", "GitHub")],
+            'paper_results': [self._result("Paper", "https://arxiv.org/abs/1", "paper", "arXiv")],
+            'blog_results': [self._result("Blog", "https://github.com/org/a#readme", "blog", "AI推荐", 8.0)],
+        }
+
+        retriever._deduplicate_results(results)
+
+        self.assertEqual(results['duplicates_removed'], 1)
+        self.assertEqual(results['github_results'], [])
+        self.assertEqual([r.source for r in results['blog_results']], ['AI推荐'])
+        self.assertEqual(results['blog_results'][0].metadata['sources'], ['AI推荐', 'GitHub'])
+
+class TestResearchMemory(unittest.TestCase):
+    """历史调研向量索引测试"""
+
+    def setUp(self):
+        if ResearchAgent is None:
+            self.skipTest("ResearchAgent未正确导入")
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    @staticmethod
+    def _result(query, titles, report):
+        from research_agent import ResearchResult
+        from modules.literature_retriever.literature_retriever import SearchResult
+        from datetime import datetime
+        items = [SearchResult(title=t, url=f"https://github.com/org/{i}", description=t, source="GitHub",
+                              relevance_score=5.0, timestamp=datetime.now(), metadata={})
+                 for i, t in enumerate(titles)]
+        return ResearchResult(query=query, literature={'github_results': items}, data={}, analysis={},
+                              report=report, metadata={}, timestamp=datetime.now())
+
+    def test_search_and_reload(self):
+        """测试相似检索，以及重新加载后索引保持一致"""
+        from modules.research_memory import ResearchMemory
+
+        memory = ResearchMemory(self.tmp_dir.name)
+        memory.add_result(self._result("大模型推理加速", ["vLLM 大模型推理引擎"], "# 报告\n## 推理优化\nKV缓存与量化"))
+        memory.add_result(self._result("rust web framework", ["axum web framework"], "## Frameworks\naxum and actix"))
+
+        hit = memory.find_similar_research("大模型推理 加速方案", threshold=0.5)
+        self.assertEqual(hit.query, "大模型推理加速")
+        self.assertIsNone(memory.find_similar_research("量子计算", threshold=0.5))
+
+        sections = memory.search("actix framework", k=1, kind='section')
+        self.assertEqual(sections[0].query, "rust web framework")
+
+        reloaded = ResearchMemory(self.tmp_dir.name)
+        self.assertEqual(reloaded.size, memory.size)
+        self.assertEqual(reloaded.search("axum", k=1)[0].record_id, memory.search("axum", k=1)[0].record_id)
+        self.assertIsNotNone(reloaded.load_record(hit.record_id))
+
+    def test_agent_reuses_similar_research(self):
+        """测试相似查询复用历史调研结果"""
+        agent = ResearchAgent(research_domain="记忆测试", provider="mock", memory_dir=self.tmp_dir.name)
+
+        async def scenario():
+            async with agent:
+                agent._init_modules()
+                agent.memory.add_result(self._result("AI agent frameworks", ["agent-sdk"], "## 结论\n已有调研"))
+                return await agent.conduct_research("ai agent  frameworks", reuse_threshold=0.9, save_to_file=False)
+
+        result = run_async_test(scenario())
+        self.assertEqual(result.metadata['reused_from']['query'], "AI agent frameworks")
+        self.assertEqual(result.report, "## 结论\n已有调研")
+        self.assertEqual(result.literature['github_results'][0].title, "agent-sdk")
+
+class TestColumnarProcessing(unittest.TestCase):
+    """列式数据处理测试"""
+
+    def setUp(self):
+        if ResearchAgent is None:
+            self.skipTest("ResearchAgent未正确导入")
+        self.processor = DataProcessor(AgentSnapshot(research_domain="数据测试"), collectors=[])
+
+    @staticmethod
+    def _records(days_and_counts, metric=None):
+        from datetime import datetime, timedelta
+        now = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+        records = []
+        for days_ago, count in days_and_counts:
+            for i in range(count):
+                records.append({'source': f'src{i % 2}', 'type': 'stats', 'content': f'{days_ago}-{i}',
+                                'timestamp': (now - timedelta(days=days_ago)).isoformat(),
+                                'metrics': {'score': metric(days_ago) if metric else 1.0, 'label': 'High'},
+                                'metadata': {'k': 1}})
+        return records
+
+    def test_cleaning_normalizes_and_deduplicates(self):
+        """测试时间戳标准化、无效记录过滤与去重"""
+        records = self._records([(1, 2)])
+        records += [dict(records[0]), {'source': 'x'}, None,
+                    {'source': 'utc', 'timestamp': '2025-01-01T00:00:00Z'},
+                    {'source': 'bad', 'timestamp': 'not a date', 'type': 't', 'content': 'c'}]
+
+        result = self.processor._process_records(records, "测试")
+
+        self.assertEqual(result['processing_summary']['total_records'], 4)
+        self.assertEqual(result['statistics']['source_distribution'], {'src0': 1, 'src1': 1, 'utc': 1, 'bad': 1})
+        quality = result['processing_summary']['quality_metrics']['quality_distribution']
+        self.assertEqual(sum(quality.values()), 4)
+        self.assertEqual(result['statistics']['date_range']['earliest'], '2025-01-01T00:00:00')
+
+    def test_trends_detected(self):
+        """测试数据量与指标的上升趋势"""
+        records = self._records([(days_ago, 30 - days_ago) for days_ago in range(0, 28)],
+                                metric=lambda days_ago: 100.0 - days_ago * 3)
+
+        trends = self.processor._process_records(records, "测试")['trends']
+
+        self.assertEqual(trends['time_trends']['data_volume_trend'], 'increasing')
+        self.assertEqual(trends['metric_trends']['metrics'], {'score': 'increasing'})
+
+    def test_large_input(self):
+        """测试十万条记录按数据块流式处理，每条记录只转换一次"""
+        records = self._records([(days_ago, 5000) for days_ago in range(20)])
+
+        with patch.object(self.processor, '_to_frame', wraps=self.processor._to_frame) as to_frame:
+            result = self.processor._process_records(records, "测试")
+
+        chunk_size = self.processor.config.chunk_size
+        self.assertEqual(to_frame.call_count, -(-len(records) // chunk_size))
+        self.assertTrue(all(len(call.args[0]) <= chunk_size for call in to_frame.call_args_list))
+        self.assertEqual(sum(len(call.args[0]) for call in to_frame.call_args_list), 100000)
+        self.assertEqual(result['processing_summary']['total_records'], 100000)
+        self.assertEqual(result['statistics']['source_distribution'], {'src0': 50000, 'src1': 50000})
+
+class TestDataCollectors(unittest.TestCase):
+    """数据收集器测试（本地模拟HTTP服务）"""
+
+    def setUp(self):
+        if ResearchAgent is None:
+            self.skipTest("ResearchAgent未正确导入")
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    async def _serve(self, routes):
+        from aiohttp import web
+        app = web.Application()
+        for path, handler in routes.items():
+            app.router.add_get(path, handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        return runner, f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    def test_collectors_fan_out_with_timeout_and_cache(self):
+        """测试收集器并发运行、单源超时互不影响、结果缓存"""
+        from aiohttp import web
+        from modules.data_collectors import (CollectorRunner, GitHubRepoCollector,
+                                             StackExchangeCollector, LocalFileCollector)
+
+        calls = []
+
+        async def github(request):
+            calls.append('github')
+            return web.json_response({'items': [{
+                'full_name': 'org/agent', 'description': 'agent sdk', 'html_url': 'https://github.com/org/agent',
+                'stargazers_count': 120, 'forks_count': 8, 'watchers_count': 120, 'open_issues_count': 3,
+                'language': 'Python', 'pushed_at': '2025-01-02T00:00:00Z', 'created_at': '2024-01-01T00:00:00Z'}]})
+
+        async def stackexchange(request):
+            calls.append('stackexchange')
+            self.assertEqual(request.query['site'], 'stackoverflow')
+            await asyncio.sleep(1.0)  # 超过超时
+            return web.json_response({'items': []})
+
+        csv_path = os.path.join(self.tmp_dir.name, 'survey.csv')
+        with open(csv_path, 'w', encoding='utf-8') as f:
+            f.write("source,type,content,timestamp,satisfaction,note\n"
+                    "Survey,survey_results,agent tools,2025-01-01T00:00:00,4.5,good\n")
+
+        async def scenario():
+            runner, base_url = await self._serve({'/search/repositories': github,
+                                                  '/search/advanced': stackexchange})
+            collectors = [GitHubRepoCollector(base_url, token='t'),
+                          StackExchangeCollector(base_url, timeout=0.2),
+                          LocalFileCollector([csv_path])]
+            collector_runner = CollectorRunner(collectors, cache=SearchCache(self.tmp_dir.name))
+            try:
+                first = await collector_runner.collect('agent')
+                second = await collector_runner.collect('agent')
+            finally:
+                await runner.cleanup()
+            return first, second
+
+        (records, status), (_, second_status) = run_async_test(scenario())
+
+        self.assertEqual(status['GitHub']['status'], 'ok')
+        self.assertEqual(status['StackExchange']['status'], 'timeout')
+        self.assertEqual(status['LocalFile']['count'], 1)
+        self.assertTrue(second_status['GitHub']['cached'])
+        self.assertEqual(calls.count('github'), 1)
+
+        github_record = next(r for r in records if r['source'] == 'GitHub')
+        self.assertEqual(github_record['metrics']['stars'], 120)
+        self.assertEqual(github_record['metadata']['url'], 'https://github.com/org/agent')
+        csv_record = next(r for r in records if r['source'] == 'Survey')
+        self.assertEqual(csv_record['metrics'], {'satisfaction': 4.5})
+
+    def test_stackexchange_records_processed(self):
+        """测试StackExchange记录进入数据处理流程"""
+        from aiohttp import web
+        from modules.data_collectors import StackExchangeCollector
+
+        async def stackexchange(request):
+            return web.json_response({'quota_remaining': 299, 'items': [
+                {'title': f'How to build an agent {i}', 'link': f'https://stackoverflow.com/q/{i}', 'score': i,
+                 'answer_count': 1, 'view_count': 100 * i, 'is_answered': True, 'tags': ['python'],
+                 'creation_date': 1735689600 + i * 86400, 'last_activity_date': 1735689600 + i * 86400}
+                for i in range(6)]})
+
+        async def scenario():
+            runner, base_url = await self._serve({'/search/advanced': stackexchange})
+            processor = DataProcessor(AgentSnapshot(), collectors=[StackExchangeCollector(base_url)])
+            processor.config.use_cache = False
+            try:
+                return await processor.process('agent')
+            finally:
+                await runner.cleanup()
+
+        result = run_async_test(scenario())
+        summary = result['processing_summary']
+        self.assertEqual(summary['collectors']['StackExchange']['count'], 6)
+        self.assertNotIn('Simulated', summary['collectors'])
+        self.assertEqual(result['statistics']['source_distribution'], {'StackExchange': 6})
+
+    def test_stackexchange_is_opt_in(self):
+        """测试默认不启用StackExchange收集器（未配置密钥时需显式开启）"""
+        from modules.data_processor import ProcessingConfig
+
+        with patch.dict(os.environ, {'STACKEXCHANGE_KEY': '', 'GITHUB_TOKEN': '', 'RESEARCH_DATA_FILES': ''}):
+            self.assertEqual(DataProcessor(AgentSnapshot()).collectors, [])
+            enabled = DataProcessor(AgentSnapshot(), config=ProcessingConfig(enable_stackexchange=True))
+        self.assertEqual([c.name for c in enabled.collectors], ['StackExchange'])
+
+    def test_collectors_share_agent_session(self):
+        """测试收集器复用代理的HTTP连接池，而不是另建会话"""
+        from modules.data_collectors import DataCollector
+
+        sessions = []
+
+        class RecordingCollector(DataCollector):
+            name, cacheable = 'Recording', False
+
+            async def fetch(self, query, session):
+                sessions.append(session)
+                yield []
+
+        async def scenario():
+            async with ResearchAgent(research_domain="会话测试", provider="mock") as agent:
+                processor = DataProcessor(agent, collectors=[RecordingCollector()])
+                await processor.process('agent')
+                return await agent.get_http_session()
+
+        shared = run_async_test(scenario())
+        self.assertEqual(sessions, [shared])
+        self.assertTrue(shared.closed)
+
+    def test_local_files_read_in_pages(self):
+        """测试CSV与JSONL逐行读取、按页产出，不整体读入文件"""
+        from pathlib import Path
+        from modules.data_collectors import LocalFileCollector
+
+        csv_path = os.path.join(self.tmp_dir.name, 'rows.csv')
+        jsonl_path = os.path.join(self.tmp_dir.name, 'rows.jsonl')
+        with open(csv_path, 'w', encoding='utf-8') as f:
+            f.write("source,timestamp,score\n" + "".join(f"csv,2025-01-01T00:00:00,{i}\n" for i in range(1500)))
+        with open(jsonl_path, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps({'source': 'jsonl', 'timestamp': '2025-01-01', 'n': i}) + "\n" for i in range(1200))
+
+        async def scenario():
+            collector = LocalFileCollector([csv_path, jsonl_path], page_size=1000)
+            return [page async for page in collector.fetch('agent', None)]
+
+        with patch.object(Path, 'read_text', side_effect=AssertionError("不应整体读入文件")):
+            pages = run_async_test(scenario())
+        self.assertEqual([len(page) for page in pages], [1000, 1000, 700])
+        self.assertEqual(pages[0][0]['metrics'], {'score': 0.0})
+        self.assertEqual(pages[-1][-1]['n'], 1199)
+
+    def test_stream_is_bounded_and_cleans_up(self):
+        """测试调用方较慢时收集器暂停产出；提前停止时收集任务被取消并等待结束、不缓存不完整结果"""
+        from modules.data_collectors import CollectorRunner, DataCollector
+
+        progress = {'produced': 0, 'closed': False}
+
+        class EndlessCollector(DataCollector):
+            name = 'Endless'
+
+            async def fetch(self, query, session):
+                try:
+                    while True:
+                        progress['produced'] += 1
+                        yield [{'source': 'endless', 'timestamp': '2025-01-01', 'n': progress['produced']}]
+                finally:
+                    progress['closed'] = True
+
+        async def scenario():
+            cache = SearchCache(self.tmp_dir.name)
+            runner = CollectorRunner([EndlessCollector()], cache=cache)
+            stream = runner.stream('agent', session=object())
+            lead = []
+            async for _, page in stream:
+                await asyncio.sleep(0.001)
+                lead.append(progress['produced'] - page[0]['n'])
+                if len(lead) == 20:
+                    break
+            await stream.aclose()
+            return lead, progress['closed'], os.listdir(self.tmp_dir.name)
+
+        lead, closed, files = run_async_test(scenario())
+        self.assertLessEqual(max(lead), 2)
+        self.assertTrue(closed)
+        self.assertEqual(files, [])
+
+class TestRecordStream(unittest.TestCase):
+    """流式记录聚合测试"""
+
+    def setUp(self):
+        if ResearchAgent is None:
+            self.skipTest("ResearchAgent未正确导入")
+
+    def test_running_stats_matches_numpy(self):
+        """测试按块合并的Welford统计与整体计算一致"""
+        import numpy as np
+        from modules.record_stream import RunningStats
+
+        values = np.random.default_rng(0).normal(5, 2, 1000)
+        stats = RunningStats()
+        stats.add_many(values[:300])
+        for value in values[300:310]:
+            stats.add(float(value))
+        stats.add_many(values[310:])
+
+        self.assertEqual(stats.count, 1000)
+        self.assertAlmostEqual(stats.mean, values.mean(), places=9)
+        self.assertAlmostEqual(stats.variance, values.var(ddof=1), places=9)
+        self.assertEqual(stats.max, values.max())
+
+    def test_reservoir_is_bounded_and_uniform(self):
+        """测试蓄水池大小固定，且各批次的元素被选中的概率相同"""
+        from modules.record_stream import Reservoir
+
+        hits_first, hits_last = 0, 0
+        for seed in range(200):
+            reservoir = Reservoir(k=10, seed=seed)
+            for batch in range(10):
+                reservoir.add_many(100, lambda i, batch=batch: batch * 100 + i)
+            self.assertEqual(len(reservoir.items), 10)
+            hits_first += sum(1 for item in reservoir.items if item < 100)
+            hits_last += sum(1 for item in reservoir.items if item >= 900)
+
+        # 每批期望被选中 1 个（200 次共约 200 个）
+        self.assertLess(abs(hits_first - hits_last), 80)
+
+    def test_process_streams_chunks_and_deduplicates(self):
+        """测试跨数据源、跨数据块去重，以及流式统计与整体处理一致"""
+        from modules.data_collectors import DataCollector
+
+        records = TestColumnarProcessing._records([(days_ago, 7) for days_ago in range(10)])
+
+        class StaticCollector(DataCollector):
+            def __init__(self, name, items):
+                super().__init__()
+                self.name, self.items, self.cacheable = name, items, False
+
+            async def fetch(self, query, session):
+                yield [dict(item) for item in self.items]
+
+        processor = DataProcessor(AgentSnapshot(), collectors=[StaticCollector('A', records),
+                                                               StaticCollector('B', records[:20])])
+        processor.config.chunk_size = 8
+        result = run_async_test(processor.process('agent'))
+
+        summary = result['processing_summary']
+        self.assertEqual(summary['total_records'], 70)
+        self.assertEqual(summary['duplicates_removed'], 20)
+        self.assertEqual(len(result['samples']), processor.config.sample_size)
+
+        expected = DataProcessor(AgentSnapshot(), collectors=[])._process_records([dict(r) for r in records], 'agent')
+        self.assertEqual(result['statistics']['source_distribution'], expected['statistics']['source_distribution'])
+        self.assertAlmostEqual(result['statistics']['quality_metrics']['average_quality'],
+                               expected['statistics']['quality_metrics']['average_quality'])
+
+    def test_chunk_without_valid_records(self):
+        """测试整块记录都无效（缺少时间戳）时不报错，并回退到模拟数据"""
+        from modules.data_collectors import DataCollector
+
+        class TimestamplessCollector(DataCollector):
+            name, cacheable = 'NoTimestamp', False
+
+            async def fetch(self, query, session):
+                yield [{'source': 'x', 'type': 'issue', 'content': str(i)} for i in range(5)]
+
+        summary = DataProcessor(AgentSnapshot(), collectors=[])._process_records([{'source': 'x'}], 'agent')
+        self.assertEqual(summary['processing_summary']['total_records'], 0)
+
+        processor = DataProcessor(AgentSnapshot(), collectors=[TimestamplessCollector()])
+        result = run_async_test(processor.process('agent'))
+        self.assertEqual(result['status'], 'completed')
+        self.assertIn('Simulated', result['processing_summary']['collectors'])
+        self.assertGreater(result['processing_summary']['total_records'], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,6 +11,7 @@ Research Agent 核心功能测试
 import asyncio
 import sys
 import os
+import tempfile
 import unittest
 from unittest.mock import Mock, patch
 
@@ -18,7 +19,7 @@ from unittest.mock import Mock, patch
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 try:
-    from research_agent import ResearchAgent, ResearchConfig, quick_research
+    from research_agent import ResearchAgent, ResearchConfig, quick_research, PipelineStage, run_stage_graph
 except ImportError as e:
     print(f"导入错误: {e}")
     print("请确保在正确的目录运行测试")
@@ -26,6 +27,21 @@ except ImportError as e:
     ResearchConfig = None
     quick_research = None
 
+_sandbox = {}
+
+def setUpModule():
+    """缓存与默认报告目录都放到临时目录中，测试不在源码树里留下文件"""
+    tmp = tempfile.TemporaryDirectory()
+    env = patch.dict(os.environ, {'RESEARCH_CACHE_DIR': os.path.join(tmp.name, 'cache')})
+    env.start()
+    _sandbox.update(tmp=tmp, env=env, cwd=os.getcwd())
+    os.chdir(tmp.name)
+
+def tearDownModule():
+    os.chdir(_sandbox['cwd'])
+    _sandbox['env'].stop()
+    _sandbox['tmp'].cleanup()
+
 class TestResearchAgent(unittest.TestCase):
     """ResearchAgent测试类"""
 
@@ -214,16 +230,128 @@ class TestAsyncFunctions(unittest.TestCase):
 
     def test_async_literature_search(self):
         """测试异步文献搜索"""
-        result = run_async_test(
-            self.agent._search_literature(
-                query="测试搜索",
-                config=ResearchConfig(max_sources=5)
-            )
-        )
+        async def search():
+            # 直接调用阶段方法不经过 conduct_research，需自行关闭代理的HTTP会话
+            async with self.agent:
+                return await self.agent._search_literature(query="测试搜索", config=ResearchConfig(max_sources=5))
+
+        result = run_async_test(search())
 
         self.assertIsInstance(result, dict)
         self.assertIn('status', result)
 
+class TestStageGraph(unittest.TestCase):
+    """调研流水线阶段图测试"""
+
+    def setUp(self):
+        if ResearchAgent is None:
+            self.skipTest("ResearchAgent未正确导入")
+
+    def test_independent_stages_run_concurrently(self):
+        """测试独立阶段并发执行，依赖阶段在其后执行"""
+        order = []
+
+        def stage(name, delay):
+            async def run(results):
+                order.append(f"{name}:start")
+                await asyncio.sleep(delay)
+                order.append(f"{name}:end")
+                return name
+            return run
+
+        stages = [
+            PipelineStage('a', stage('a', 0.05)),
+            PipelineStage('b', stage('b', 0.05)),
+            PipelineStage('c', stage('c', 0), depends_on=('a', 'b')),
+        ]
+        results, timings = run_async_test(run_stage_graph(stages))
+
+        self.assertEqual(results, {'a': 'a', 'b': 'b', 'c': 'c'})
+        self.assertEqual(order[:2], ['a:start', 'b:start'])
+        self.assertEqual(order[-2:], ['c:start', 'c:end'])
+        self.assertEqual(set(timings), {'a', 'b', 'c'})
+
+    def test_research_records_stage_timings(self):
+        """测试调研结果记录各阶段耗时"""
+        agent = ResearchAgent(research_domain="阶段测试", provider="mock")
+        result = run_async_test(agent.conduct_research("阶段耗时测试", save_to_file=False))
+
+        timings = result.metadata['stage_timings']
+        self.assertEqual(set(timings), {'literature', 'data', 'quality', 'analysis', 'report'})
+        self.assertIn('total_duration', result.metadata)
+
+class TestBatchResearch(unittest.TestCase):
+    """批量调研测试"""
+
+    def setUp(self):
+        if ResearchAgent is None:
+            self.skipTest("ResearchAgent未正确导入")
+        self.agent = ResearchAgent(research_domain="批量测试", provider="mock")
+
+    def test_conduct_research_many(self):
+        """测试批量调研复用模块并写入索引"""
+        import json
+        import tempfile
+
+        queries = ["批量查询A", "批量查询B", "批量查询C"]
+
+        async def collect():
+            results = []
+            async for result in self.agent.conduct_research_many(queries, concurrency=2, reports_dir=tmp_dir):
+                results.append(result)
+            return results
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            results = run_async_test(collect())
+            self.assertEqual(sorted(r.query for r in results), sorted(queries))
+
+            with open(self.agent.last_batch_index_path, encoding='utf-8') as f:
+                index = json.load(f)
+            self.assertEqual(index['total'], 3)
+
+        # 一次性调用不应让对话历史增长
+        self.assertEqual(len(self.agent.conversation_history), 2)
+
+    def test_owned_session_closed_after_research(self):
+        """测试未使用 async with 时调研结束即关闭自有HTTP会话，async with 中则跨调研复用"""
+        options = dict(include_data=False, include_github=False, include_papers=False, save_to_file=False)
+
+        async def plain():
+            session = await self.agent.get_http_session()
+            await self.agent.conduct_research("会话测试", **options)
+            return session
+
+        async def scoped():
+            async with ResearchAgent(research_domain="批量测试", provider="mock") as agent:
+                session = await agent.get_http_session()
+                await agent.conduct_research("会话测试", **options)
+                self.assertFalse(session.closed)
+                self.assertIs(await agent.get_http_session(), session)
+            return session
+
+        self.assertTrue(run_async_test(plain()).closed)
+        self.assertTrue(run_async_test(scoped()).closed)
+
+    def test_chat_calls_run_concurrently(self):
+        """测试并发调研中的LLM调用互不等待，且不写回对话历史"""
+        import threading
+
+        barrier = threading.Barrier(2, timeout=5.0)
+
+        def chat(message):
+            # 两次调用必须同时进行才能通过屏障
+            barrier.wait()
+            return f"回复: {message}"
+
+        self.agent.chat = chat
+        history = list(self.agent.conversation_history)
+
+        async def both():
+            return await asyncio.gather(self.agent.achat("问题一"), self.agent.acomplete("问题二"))
+
+        self.assertEqual(run_async_test(both()), ["回复: 问题一", "回复: 问题二"])
+        self.assertEqual(self.agent.conversation_history, history)
+
 def run_tests():
     """运行所有测试"""
     print("=== Research Agent 测试开始 ===\n")
@@ -236,7 +364,9 @@ def run_tests():
         TestResearchAgent,
         TestQuickResearch,
         TestIntegration,
-        TestAsyncFunctions
+        TestAsyncFunctions,
+        TestStageGraph,
+        TestBatchResearch
     ]
 
     for test_class in test_classes: